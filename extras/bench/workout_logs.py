@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Compares saving workout logs one by one with save_workout_logs
+
+The logs are saved in a transaction that is rolled back afterwards, so the
+script can be run against any database with at least one workout.
+'''
+
+import os
+import sys
+import time
+import django
+import datetime
+import argparse
+
+sys.path.insert(0, os.path.join('..', '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+django.setup()
+
+# Must happen after calling django.setup()
+from django.db import transaction
+from wger.exercises.models import Exercise
+from wger.manager.ingestion import save_workout_logs
+from wger.manager.models import Workout, WorkoutLog
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_logs(workout, exercises, amount):
+    '''
+    Returns a list of unsaved logs
+    '''
+    start = datetime.date.today() - datetime.timedelta(days=amount)
+    return [WorkoutLog(workout=workout,
+                       exercise=exercises[i % len(exercises)],
+                       reps=10,
+                       weight=50,
+                       date=start + datetime.timedelta(days=i))
+            for i in range(amount)]
+
+
+def run(name, function, logs):
+    '''
+    Saves the logs in a transaction that is rolled back and prints the rate
+    '''
+    start = time.time()
+    try:
+        with transaction.atomic():
+            function(logs)
+            elapsed = time.time() - start
+            raise Rollback()
+    except Rollback:
+        pass
+    print('{0:<20} {1:>10.0f} rows/s'.format(name, len(logs) / elapsed))
+
+
+def save_single(logs):
+    for log in logs:
+        log.save()
+
+
+parser = argparse.ArgumentParser(description='Benchmark saving workout logs')
+parser.add_argument('--rows', type=int, default=1000, help='Number of logs to save')
+args = parser.parse_args()
+
+workout = Workout.objects.select_related('user').first()
+if not workout:
+    sys.exit('No workouts in the database, create some with the dummy generator first')
+exercises = list(Exercise.objects.all()[:20])
+
+logs = get_logs(workout, exercises, args.rows)
+for log in logs:
+    log.user = workout.user
+run('WorkoutLog.save', save_single, logs)
+run('save_workout_logs',
+    lambda logs: save_workout_logs(workout.user, logs),
+    get_logs(workout, exercises, args.rows))
@@ -259,13 +259,13 @@ def load_fixtures(context, settings_path=None):
     call_command("loaddata", path + "equipment.json")
     call_command("loaddata", path + "muscles.json")
     call_command("loaddata", path + "categories.json")
-    call_command("loaddata", path + "exercises.json")
+    call_command("bulk-loaddata", path + "exercises.json")
 
     # Nutrition
     path = os.path.join(current_dir, 'wger', 'nutrition', 'fixtures/')
-    call_command("loaddata", path + "ingredients.json")
-    call_command("loaddata", path + "weight_units.json")
-    call_command("loaddata", path + "ingredient_units.json")
+    call_command("bulk-loaddata", path + "ingredients.json")
+    call_command("bulk-loaddata", path + "weight_units.json")
+    call_command("bulk-loaddata", path + "ingredient_units.json")
 
     # Gym
     path = os.path.join(current_dir, 'wger', 'gym', 'fixtures/')
@@ -20,13 +20,12 @@ import logging
 from django.db import models
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
-from django.core.cache import cache
 from wger.core.models import Language, UserProfile
 from wger.gym.helpers import is_any_gym_admin
 from wger.gym.models import Gym, GymUserConfig
 
-from wger.utils.cache import delete_template_fragment_cache
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import reset_exercise_fragments
+from wger.utils.cache import cache_mapper, local_cache
 
 
 logger = logging.getLogger(__name__)
@@ -77,11 +76,10 @@ class LanguageConfig(models.Model):
         super(LanguageConfig, self).save(*args, **kwargs)
 
         # Cached objects
-        cache.delete(cache_mapper.get_language_config_key(self.language, self.item))
+        local_cache.invalidate(cache_mapper.LANGUAGE_CONFIG)
 
         # Cached template fragments
-        delete_template_fragment_cache('muscle-overview', self.language_id)
-        delete_template_fragment_cache('exercise-overview', self.language_id)
+        reset_exercise_fragments()
 
     def delete(self, *args, **kwargs):
         '''
@@ -89,11 +87,10 @@ class LanguageConfig(models.Model):
         '''
 
         # Cached objects
-        cache.delete(cache_mapper.get_language_config_key(self.language, self.item))
+        local_cache.invalidate(cache_mapper.LANGUAGE_CONFIG)
 
         # Cached template fragments
-        delete_template_fragment_cache('muscle-overview', self.language_id)
-        delete_template_fragment_cache('exercise-overview', self.language_id)
+        reset_exercise_fragments()
 
         super(LanguageConfig, self).delete(*args, **kwargs)
 
@@ -23,10 +23,12 @@ from wger.core.models import (
     DaysOfWeek,
     License,
     RepetitionUnit,
-    WeightUnit)
+    WeightUnit,
+    DeletedObject)
+from wger.utils.serializers import WgerModelSerializer
 
 
-class UserprofileSerializer(serializers.ModelSerializer):
+class UserprofileSerializer(WgerModelSerializer):
     '''
     Workout session serializer
     '''
@@ -41,7 +43,7 @@ class UsernameSerializer(serializers.Serializer):
     username = serializers.CharField()
 
 
-class LanguageSerializer(serializers.ModelSerializer):
+class LanguageSerializer(WgerModelSerializer):
     '''
     Language serializer
     '''
@@ -49,7 +51,7 @@ class LanguageSerializer(serializers.ModelSerializer):
         model = Language
 
 
-class DaysOfWeekSerializer(serializers.ModelSerializer):
+class DaysOfWeekSerializer(WgerModelSerializer):
     '''
     DaysOfWeek serializer
     '''
@@ -57,7 +59,7 @@ class DaysOfWeekSerializer(serializers.ModelSerializer):
         model = DaysOfWeek
 
 
-class LicenseSerializer(serializers.ModelSerializer):
+class LicenseSerializer(WgerModelSerializer):
     '''
     License serializer
     '''
@@ -65,7 +67,7 @@ class LicenseSerializer(serializers.ModelSerializer):
         model = License
 
 
-class RepetitionUnitSerializer(serializers.ModelSerializer):
+class RepetitionUnitSerializer(WgerModelSerializer):
     '''
     Repetition unit serializer
     '''
@@ -73,9 +75,20 @@ class RepetitionUnitSerializer(serializers.ModelSerializer):
         model = RepetitionUnit
 
 
-class WeightUnitSerializer(serializers.ModelSerializer):
+class WeightUnitSerializer(WgerModelSerializer):
     '''
     Weight unit serializer
     '''
     class Meta:
         model = WeightUnit
+
+
+class DeletedObjectSerializer(WgerModelSerializer):
+    '''
+    Deleted object serializer
+    '''
+    model = serializers.CharField(source='content_type.model', read_only=True)
+
+    class Meta:
+        model = DeletedObject
+        fields = ('model', 'object_id', 'deleted')
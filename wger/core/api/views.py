@@ -15,10 +15,18 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+
 from django.contrib.auth.models import User
-from rest_framework import viewsets
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from rest_framework import status, viewsets
 from rest_framework.response import Response
-from rest_framework.decorators import detail_route
+from rest_framework.decorators import api_view, detail_route
+
+from wger.core.bundle import decompress, get_compressed_bundle, get_saved_bundle_name
 
 from wger.core.models import (
     UserProfile,
@@ -26,17 +34,20 @@ from wger.core.models import (
     DaysOfWeek,
     License,
     RepetitionUnit,
-    WeightUnit)
+    WeightUnit,
+    DeletedObject)
 from wger.core.api.serializers import (
     UsernameSerializer,
     LanguageSerializer,
     DaysOfWeekSerializer,
     LicenseSerializer,
     RepetitionUnitSerializer,
-    WeightUnitSerializer
+    WeightUnitSerializer,
+    DeletedObjectSerializer
 )
 from wger.core.api.serializers import UserprofileSerializer
 from wger.utils.permissions import UpdateOnlyPermission, WgerPermission
+from wger.utils.viewsets import WgerConditionalMixin
 
 
 class UserProfileViewSet(viewsets.ModelViewSet):
@@ -70,12 +81,13 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         return Response(UsernameSerializer(user).data)
 
 
-class LanguageViewSet(viewsets.ReadOnlyModelViewSet):
+class LanguageViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for workout objects
     '''
     queryset = Language.objects.all()
     serializer_class = LanguageSerializer
+    cache_tables = (Language, )
     ordering_fields = '__all__'
     filter_fields = ('full_name',
                      'short_name')
@@ -91,12 +103,13 @@ class DaysOfWeekViewSet(viewsets.ReadOnlyModelViewSet):
     filter_fields = ('day_of_week', )
 
 
-class LicenseViewSet(viewsets.ReadOnlyModelViewSet):
+class LicenseViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for workout objects
     '''
     queryset = License.objects.all()
     serializer_class = LicenseSerializer
+    cache_tables = (License, )
     ordering_fields = '__all__'
     filter_fields = ('full_name',
                      'short_name',
@@ -121,3 +134,67 @@ class WeightUnitViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = WeightUnitSerializer
     ordering_fields = '__all__'
     filter_fields = ('name', )
+
+
+class DeletedObjectViewSet(viewsets.ReadOnlyModelViewSet):
+    '''
+    API endpoint for the objects deleted by the user
+
+    Use the 'model' parameter to only list the objects of one endpoint, e.g.
+    'workoutlog'.
+    '''
+    serializer_class = DeletedObjectSerializer
+    is_private = True
+    ordering_fields = ('deleted', )
+    modified_since_field = 'deleted'
+
+    def get_queryset(self):
+        '''
+        Only allow access to appropriate objects
+        '''
+        queryset = DeletedObject.objects.filter(user=self.request.user) \
+                                        .select_related('content_type')
+        if self.request.query_params.get('model'):
+            queryset = queryset.filter(content_type__model=self.request.query_params['model'])
+        return queryset
+
+
+@api_view(['GET'])
+def reference_bundle(request, language):
+    '''
+    Output the reference data (exercises, ingredients, units, etc.) of a language
+
+    With ?since=<version> only the sections changed since that version of the
+    bundle are returned, if these were built. The JSON is sent gzip compressed
+    to clients that accept it.
+    '''
+    language = get_object_or_404(Language, short_name=language)
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = int(since)
+        except ValueError:
+            return Response({'since': ['A valid integer is required.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+    name = get_saved_bundle_name(language, since or None)
+    response = None
+    if name is not None:
+        response = get_conditional_response(request, etag=os.path.basename(name))
+    if response is None:
+        name, content = get_compressed_bundle(language, since or None)
+        if name is None:
+            return Response({'detail': 'The reference data was not built yet.'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        response = HttpResponse(content_type='application/json')
+        if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response['Content-Encoding'] = 'gzip'
+            response.content = content
+        else:
+            response.content = decompress(content)
+
+    response['ETag'] = quote_etag(os.path.basename(name))
+    patch_cache_control(response, public=True, max_age=60)
+    patch_vary_headers(response, ('Accept-Encoding', ))
+    return response
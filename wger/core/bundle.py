@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Snapshots of the public reference data for clients
+
+Instead of paging through the exercise, ingredient, unit, etc. endpoints,
+clients download one compressed bundle with all the data shown in a language
+and afterwards only the sections that changed since their version. The
+sections use the same format as the corresponding API endpoints. The bundles
+are built by the build-reference-bundles command and served as they are.
+'''
+
+import gzip
+import logging
+import re
+from collections import OrderedDict
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from rest_framework.renderers import JSONRenderer
+
+from wger.core.api.serializers import (
+    DaysOfWeekSerializer,
+    LanguageSerializer,
+    LicenseSerializer,
+    RepetitionUnitSerializer,
+    WeightUnitSerializer
+)
+from wger.core.models import DaysOfWeek, Language, License, RepetitionUnit, WeightUnit
+from wger.exercises.api.serializers import (
+    EquipmentSerializer,
+    ExerciseCategorySerializer,
+    ExerciseCommentSerializer,
+    ExerciseImageSerializer,
+    ExerciseSerializer,
+    MuscleSerializer
+)
+from wger.exercises.models import (
+    Equipment,
+    Exercise,
+    ExerciseCategory,
+    ExerciseComment,
+    ExerciseImage,
+    Muscle
+)
+from wger.nutrition.api.serializers import (
+    IngredientSerializer,
+    IngredientWeightUnitSerializer,
+    WeightUnitSerializer as IngredientUnitSerializer
+)
+from wger.nutrition.models import (
+    Ingredient,
+    IngredientWeightUnit,
+    WeightUnit as IngredientUnit
+)
+from wger.utils.cache import get_table_versions
+
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FOLDER = 'reference-bundles'
+'''Folder in the media storage with the bundles'''
+
+SAVED_VERSIONS = 10
+'''Number of older versions whose changes are saved as bundles'''
+
+REFERENCE_TABLES = (Language,
+                    License,
+                    DaysOfWeek,
+                    RepetitionUnit,
+                    WeightUnit,
+                    ExerciseCategory,
+                    Equipment,
+                    Muscle,
+                    Exercise,
+                    ExerciseImage,
+                    ExerciseComment,
+                    IngredientUnit,
+                    Ingredient,
+                    IngredientWeightUnit)
+'''Models whose data is contained in the bundles'''
+
+
+def get_sections(language):
+    '''
+    Returns the sections of a language's bundle
+
+    :return: an ordered dictionary with the name of the API endpoint as key and
+             a tuple with the models the section depends on, the queryset and
+             the serializer class as value
+    '''
+    exercises = Exercise.objects.accepted().filter(language=language)
+    ingredients = Ingredient.objects.filter(language=language,
+                                            status__in=Ingredient.INGREDIENT_STATUS_OK)
+    return OrderedDict([
+        ('language', ((Language, ), Language.objects.all(), LanguageSerializer)),
+        ('license', ((License, ), License.objects.all(), LicenseSerializer)),
+        ('daysofweek', ((DaysOfWeek, ), DaysOfWeek.objects.all(), DaysOfWeekSerializer)),
+        ('setting-repetitionunit',
+         ((RepetitionUnit, ), RepetitionUnit.objects.all(), RepetitionUnitSerializer)),
+        ('setting-weightunit', ((WeightUnit, ), WeightUnit.objects.all(), WeightUnitSerializer)),
+        ('exercisecategory',
+         ((ExerciseCategory, ), ExerciseCategory.objects.all(), ExerciseCategorySerializer)),
+        ('equipment', ((Equipment, ), Equipment.objects.all(), EquipmentSerializer)),
+        ('muscle', ((Muscle, ), Muscle.objects.all(), MuscleSerializer)),
+        ('exercise',
+         ((Exercise, ),
+          exercises.prefetch_related('muscles', 'muscles_secondary', 'equipment'),
+          ExerciseSerializer)),
+        ('exerciseimage',
+         ((ExerciseImage, Exercise),
+          ExerciseImage.objects.accepted().filter(exercise__in=exercises),
+          ExerciseImageSerializer)),
+        ('exercisecomment',
+         ((ExerciseComment, Exercise),
+          ExerciseComment.objects.filter(exercise__in=exercises),
+          ExerciseCommentSerializer)),
+        ('weightunit',
+         ((IngredientUnit, ),
+          IngredientUnit.objects.filter(language=language),
+          IngredientUnitSerializer)),
+        ('ingredient', ((Ingredient, ), ingredients, IngredientSerializer)),
+        ('ingredientweightunit',
+         ((IngredientWeightUnit, Ingredient),
+          IngredientWeightUnit.objects.filter(ingredient__in=ingredients),
+          IngredientWeightUnitSerializer)),
+    ])
+
+
+def get_section_versions(sections):
+    '''
+    Returns the versions of the sections of a bundle
+
+    The version of a section is the time of the last change to any of the
+    tables it depends on, in microseconds.
+    '''
+    versions = get_table_versions(REFERENCE_TABLES)
+    return OrderedDict([(name, int(max([versions[model] for model in section[0]]) * 1000000))
+                        for name, section in sections.items()])
+
+
+def get_bundle_version(language):
+    '''
+    Returns the current version of a language's bundle
+    '''
+    return max(get_section_versions(get_sections(language)).values())
+
+
+def get_bundle(language, since=None):
+    '''
+    Returns the reference data shown in a language
+
+    :param since: the version of a bundle the client already has, only the
+                  sections changed afterwards are included. These contain
+                  all their objects and replace the old ones completely.
+    '''
+    sections = get_sections(language)
+    versions = get_section_versions(sections)
+    data = OrderedDict()
+    for name, (models, queryset, serializer_class) in sections.items():
+        if since is None or versions[name] > since:
+            data[name] = serializer_class(queryset, many=True).data
+
+    return OrderedDict([('version', max(versions.values())),
+                        ('since', since),
+                        ('language', language.short_name),
+                        ('versions', versions),
+                        ('sections', data)])
+
+
+def compress(content):
+    '''
+    Returns the gzip compressed content
+    '''
+    output = BytesIO()
+    with gzip.GzipFile(fileobj=output, mode='wb', mtime=0) as gzip_file:
+        gzip_file.write(content)
+    return output.getvalue()
+
+
+def decompress(content):
+    '''
+    Returns the content of gzip compressed data
+    '''
+    with gzip.GzipFile(fileobj=BytesIO(content), mode='rb') as gzip_file:
+        return gzip_file.read()
+
+
+def get_bundle_name(language, version, since=None):
+    '''
+    Returns the name of a bundle in the media storage
+
+    :param since: the version the bundle contains the changes since, None for
+                  complete bundles
+    '''
+    if since is None:
+        return '{0}/{1}-{2}.json.gz'.format(BUNDLE_FOLDER, language.short_name, version)
+    return '{0}/{1}-{2}-{3}.json.gz'.format(BUNDLE_FOLDER, language.short_name, version, since)
+
+
+def get_saved_bundles(language):
+    '''
+    Returns the bundles of a language in the media storage
+
+    :return: a list of (version, since, name) tuples, since is None for
+             complete bundles
+    '''
+    if not default_storage.exists(BUNDLE_FOLDER):
+        return []
+
+    pattern = re.compile(r'^{0}-(\d+)(?:-(\d+))?\.json\.gz$'
+                         .format(re.escape(language.short_name)))
+    bundles = []
+    for filename in default_storage.listdir(BUNDLE_FOLDER)[1]:
+        match = pattern.match(filename)
+        if match:
+            since = int(match.group(2)) if match.group(2) else None
+            bundles.append((int(match.group(1)),
+                            since,
+                            '{0}/{1}'.format(BUNDLE_FOLDER, filename)))
+    return bundles
+
+
+def get_saved_bundle_name(language, since=None):
+    '''
+    Returns the name of the newest saved bundle of a language
+
+    If a bundle with the changes since the given version was saved, it is
+    used, otherwise the complete one.
+
+    :return: the name or None if no bundles were built yet
+    '''
+    bundles = get_saved_bundles(language)
+    if not bundles:
+        return None
+
+    version = max([bundle[0] for bundle in bundles])
+    names = dict([(bundle[1], bundle[2]) for bundle in bundles if bundle[0] == version])
+    return names.get(since, names.get(None))
+
+
+def get_compressed_bundle(language, since=None):
+    '''
+    Returns the newest saved bundle of a language as compressed JSON
+
+    Only the bundles saved by save_bundles are read, these can also be served
+    directly from the media storage, e.g. by a CDN.
+
+    :return: a tuple with the bundle's name and content or (None, None) if no
+             bundles were built yet
+    '''
+    # A newer bundle could have been built and this one deleted in the meantime
+    for attempt in range(2):
+        name = get_saved_bundle_name(language, since)
+        if name is None:
+            return None, None
+        try:
+            with default_storage.open(name) as bundle_file:
+                return name, bundle_file.read()
+        except (IOError, OSError):
+            if attempt:
+                raise
+
+
+def save_bundle(name, bundle):
+    '''
+    Saves a bundle to the media storage if it isn't there yet
+    '''
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(compress(JSONRenderer().render(bundle))))
+        logger.info('Saved reference bundle %s', name)
+
+
+def save_bundles(language):
+    '''
+    Saves the current bundles of a language to the media storage
+
+    Besides the complete bundle, the changes since each of the last
+    SAVED_VERSIONS saved versions are saved, so that clients can update their
+    data with a small download.
+
+    :return: the current version
+    '''
+    version = get_bundle_version(language)
+    if not default_storage.exists(get_bundle_name(language, version)):
+        bundle = get_bundle(language)
+        version = bundle['version']
+        save_bundle(get_bundle_name(language, version), bundle)
+
+    bundles = get_saved_bundles(language)
+    versions = set([bundle[0] for bundle in bundles] + [bundle[1] for bundle in bundles])
+    versions.discard(None)
+    for since in sorted(versions, reverse=True)[:SAVED_VERSIONS]:
+        if since <= version:
+            name = get_bundle_name(language, version, since)
+            if not default_storage.exists(name):
+                save_bundle(name, get_bundle(language, since))
+    return version
+
+
+def delete_old_bundles(language, version):
+    '''
+    Deletes the bundles of a language other than the ones of the given version
+    '''
+    for bundle_version, since, name in get_saved_bundles(language):
+        if bundle_version != version:
+            default_storage.delete(name)
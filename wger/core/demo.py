@@ -24,6 +24,7 @@ from django.contrib.auth import authenticate
 from django.utils.translation import ugettext as _
 
 from wger.weight.models import WeightEntry
+from wger.weight.helpers import update_last_weight_entries
 from wger.exercises.models import Exercise
 from wger.core.models import DaysOfWeek
 from wger.manager.models import (
@@ -43,6 +44,7 @@ from wger.nutrition.models import (
     IngredientWeightUnit
 )
 
+from wger.utils.cache import reset_weight_rollups
 from wger.utils.language import load_language
 
 logger = logging.getLogger(__name__)
@@ -201,6 +203,8 @@ def create_demo_entries(user):
                                 date=creation_date)
             temp.append(entry)
     WeightEntry.objects.bulk_create(temp)
+    update_last_weight_entries([user])
+    reset_weight_rollups([user.pk])
 
     #
     # Nutritional plan
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wger.core.bundle import delete_old_bundles, save_bundles
+from wger.core.models import Language
+
+
+class Command(BaseCommand):
+    '''
+    Builds the compressed bundles with the reference data
+    '''
+
+    option_list = BaseCommand.option_list + (
+        make_option('--language',
+                    action='store',
+                    dest='language',
+                    default=None,
+                    help='Only build the bundle for this language, e.g. "de"'),
+
+        make_option('--keep-old',
+                    action='store_true',
+                    dest='keep_old',
+                    default=False,
+                    help='Keep the bundles of older versions'),
+    )
+
+    help = 'Builds the bundles with the reference data (exercises, ingredients, ' \
+           'units, etc.) of each language in the media folder, together with the ' \
+           'changes since the last versions. Only bundles whose data changed are ' \
+           'built again and the ones of older versions are deleted.'
+
+    def handle(self, **options):
+        '''
+        Process the options
+        '''
+        languages = Language.objects.all()
+        if options['language']:
+            languages = languages.filter(short_name=options['language'])
+            if not languages.exists():
+                raise CommandError('Language "{0}" not found'.format(options['language']))
+
+        for language in languages:
+            version = save_bundles(language)
+            if not options['keep_old']:
+                delete_old_bundles(language, version)
+
+            if int(options['verbosity']) >= 2:
+                self.stdout.write('*** {0}: {1}'.format(language.short_name, version))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wger.utils.fixtures import CHUNK_SIZE, load_fixture
+
+
+class Command(BaseCommand):
+    '''
+    Loads large JSON fixtures in chunks
+    '''
+
+    option_list = BaseCommand.option_list + (
+        make_option('--chunk-size',
+                    action='store',
+                    dest='chunk_size',
+                    type='int',
+                    default=CHUNK_SIZE,
+                    help='Number of objects saved at once'),
+    )
+
+    args = '<fixture fixture ...>'
+    help = 'Loads JSON fixtures like loaddata, but reads them incrementally, inserts ' \
+           'the objects in chunks and skips the ones that did not change. Only ' \
+           'paths to JSON files are supported.'
+
+    def handle(self, *args, **options):
+        '''
+        Process the options
+        '''
+        if not args:
+            raise CommandError('Please pass the path of at least one fixture')
+
+        for path in args:
+            try:
+                counts = load_fixture(path, chunk_size=options['chunk_size'])
+            except (IOError, ValueError) as e:
+                raise CommandError('Error loading {0}: {1}'.format(path, e))
+
+            if int(options['verbosity']) >= 1:
+                self.stdout.write('*** {0}: {1} created, {2} updated, {3} unchanged'.format(
+                    path, counts['created'], counts['updated'], counts['unchanged']))
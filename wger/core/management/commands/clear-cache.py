@@ -16,17 +16,13 @@
 
 from optparse import make_option
 
-from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand, CommandError
 from django.core.cache import cache
 
-from wger.core.models import Language
-from wger.manager.models import Workout, WorkoutLog
-from wger.exercises.models import Exercise
 from wger.utils.cache import (
-    reset_workout_canonical_form,
-    reset_workout_log,
-    delete_template_fragment_cache
+    cache_mapper,
+    local_cache,
+    reset_exercise_fragments
 )
 
 
@@ -73,39 +69,17 @@ class Command(BaseCommand):
             if int(options['verbosity']) >= 2:
                 self.stdout.write("*** Clearing templates")
 
-            for user in User.objects.all():
-                if int(options['verbosity']) >= 2:
-                    self.stdout.write("* Processing user {0}".format(user.username))
-
-                for entry in WorkoutLog.objects.filter(user=user).dates('date', 'year'):
-
-                    if int(options['verbosity']) >= 3:
-                        self.stdout.write("  Year {0}".format(entry.year))
-                    for month in WorkoutLog.objects.filter(user=user,
-                                                           date__year=entry.year).dates('date',
-                                                                                        'month'):
-                        if int(options['verbosity']) >= 3:
-                            self.stdout.write("    Month {0}".format(entry.month))
-                        reset_workout_log(user.id, entry.year, entry.month)
-                        for day in WorkoutLog.objects.filter(user=user,
-                                                             date__year=entry.year,
-                                                             date__month=month.month).dates('date',
-                                                                                            'day'):
-                            if int(options['verbosity']) >= 3:
-                                self.stdout.write("      Day {0}".format(day.day))
-                            reset_workout_log(user.id, entry.year, entry.month, day)
-
-            for language in Language.objects.all():
-                delete_template_fragment_cache('muscle-overview', language.id)
-                delete_template_fragment_cache('exercise-overview', language.id)
-                delete_template_fragment_cache('exercise-overview-mobile', language.id)
-                delete_template_fragment_cache('equipment-overview', language.id)
+            # Workout logs, all users at once
+            cache_mapper.invalidate_namespace(cache_mapper.WORKOUT_LOG_LIST)
+
+            # Exercise fragments, all languages at once
+            reset_exercise_fragments()
 
         # Workout canonical form
         if options['clear_workout']:
-            for w in Workout.objects.all():
-                reset_workout_canonical_form(w.pk)
+            cache_mapper.invalidate_namespace(cache_mapper.WORKOUT_CANONICAL)
 
         # Nuclear option, clear all
         if options['clear_all']:
             cache.clear()
+            local_cache.clear()
@@ -18,6 +18,7 @@ from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
 
 from wger.gym.helpers import get_user_last_activity
+from wger.weight.helpers import update_last_weight_entries
 
 
 class Command(BaseCommand):
@@ -38,3 +39,6 @@ class Command(BaseCommand):
         for user in User.objects.all():
             user.usercache.last_activity = get_user_last_activity(user)
             user.usercache.save()
+
+        print('** Updating last weight entry')
+        update_last_weight_entries()
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Max
+import django.db.models.deletion
+
+
+def insert_data(apps, schema_editor):
+    '''
+    Saves the users' last weight entries in the cache table
+    '''
+    UserCache = apps.get_model('core', 'UserCache')
+    WeightEntry = apps.get_model('weight', 'WeightEntry')
+
+    last_dates = WeightEntry.objects.values('user').annotate(last_date=Max('date'))
+    for row in last_dates:
+        entry = WeightEntry.objects.get(user_id=row['user'], date=row['last_date'])
+        UserCache.objects.filter(user_id=row['user']).update(last_weight_entry=entry)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weight', '0003_auto_20160416_1030'),
+        ('core', '0009_auto_20160303_2340'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usercache',
+            name='last_weight_entry',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='weight.WeightEntry'),
+        ),
+        migrations.RunPython(insert_data, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_deletedobject'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='deletedobject',
+            options={'ordering': ['deleted', 'id']},
+        ),
+    ]
@@ -20,14 +20,18 @@ import decimal
 from django.db import models
 from django.db.models import IntegerField
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
 from django.core.urlresolvers import reverse
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 from wger.gym.models import Gym
 
+from wger.utils.cache import cache_mapper, local_cache, reset_table_version
 from wger.utils.constants import TWOPLACES
+from wger.utils.helpers import memoize, reset_memoized
 from wger.utils.units import AbstractWeight
 
 from wger.weight.models import WeightEntry
@@ -68,6 +72,22 @@ class Language(models.Model):
         '''
         return reverse('core:language:view', kwargs={'pk': self.id})
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset all cached infos
+        '''
+        super(Language, self).save(*args, **kwargs)
+        local_cache.invalidate(cache_mapper.LANGUAGE)
+        reset_table_version(Language)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset all cached infos
+        '''
+        local_cache.invalidate(cache_mapper.LANGUAGE)
+        super(Language, self).delete(*args, **kwargs)
+        reset_table_version(Language)
+
     #
     # Own methods
     #
@@ -319,11 +339,28 @@ by the US Department of Agriculture. It is extremely complete, with around
         Returns the last weight entry, done here to make the behaviour
         more consistent with the other settings (age, height, etc.)
         '''
+        entry = self.get_latest_weight_entry()
+        return entry.weight if entry else 0
+
+    @memoize
+    def get_latest_weight_entry(self):
+        '''
+        Returns the user's last weight entry or None
+
+        This is remembered until the profile or one of the user's weight entries
+        is saved, so the metrics calculated with it only need one query.
+        '''
         try:
-            weight = WeightEntry.objects.filter(user=self.user).latest().weight
-        except WeightEntry.DoesNotExist:
-            weight = 0
-        return weight
+            return UserCache.objects.select_related('last_weight_entry') \
+                .get(user=self.user).last_weight_entry
+        except UserCache.DoesNotExist:
+            return WeightEntry.objects.filter(user=self.user).order_by('date').last()
+
+    def reset_metrics(self):
+        '''
+        Forgets the remembered weight entry
+        '''
+        reset_memoized(self)
 
     @property
     def address(self):
@@ -357,6 +394,13 @@ by the US Department of Agriculture. It is extremely complete, with around
         '''
         return u"Profile for user {0}".format(self.user)
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset the remembered weight entry
+        '''
+        self.reset_metrics()
+        super(UserProfile, self).save(*args, **kwargs)
+
     @property
     def use_metric(self):
         '''
@@ -449,10 +493,8 @@ by the US Department of Agriculture. It is extremely complete, with around
         '''
         Create a new weight entry as needed
         '''
-        if (not WeightEntry.objects.filter(user=self.user).exists()
-            or (datetime.date.today()
-                - WeightEntry.objects.filter(user=self.user).latest().date
-                > datetime.timedelta(days=3))):
+        entry = self.get_latest_weight_entry()
+        if not entry or datetime.date.today() - entry.date > datetime.timedelta(days=3):
             entry = WeightEntry()
             entry.weight = weight
             entry.user = self.user
@@ -461,11 +503,12 @@ by the US Department of Agriculture. It is extremely complete, with around
 
         # Update the last entry
         else:
-            entry = WeightEntry.objects.filter(user=self.user).latest()
             entry.weight = weight
             entry.save()
         return entry
 
+    owner_field = 'user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -492,6 +535,18 @@ class UserCache(models.Model):
     get_user_last_activity helper function.
     '''
 
+    last_weight_entry = models.ForeignKey(WeightEntry,
+                                          null=True,
+                                          editable=False,
+                                          on_delete=models.SET_NULL,
+                                          related_name='+')
+    '''
+    The user's last (body) weight entry.
+
+    Values for this entry are saved by signals, entries created with bulk_create
+    need to call the update_last_weight_entries helper function.
+    '''
+
     def __str__(self):
         '''
         Return a more human-readable representation
@@ -522,6 +577,22 @@ class DaysOfWeek(models.Model):
         '''
         return self.day_of_week
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset all cached infos
+        '''
+        super(DaysOfWeek, self).save(*args, **kwargs)
+        local_cache.invalidate(cache_mapper.DAYS_OF_WEEK)
+        reset_table_version(DaysOfWeek)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset all cached infos
+        '''
+        local_cache.invalidate(cache_mapper.DAYS_OF_WEEK)
+        super(DaysOfWeek, self).delete(*args, **kwargs)
+        reset_table_version(DaysOfWeek)
+
 
 @python_2_unicode_compatible
 class License(models.Model):
@@ -561,6 +632,20 @@ class License(models.Model):
         '''
         return u"{0} ({1})".format(self.full_name, self.short_name)
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(License, self).save(*args, **kwargs)
+        reset_table_version(License)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(License, self).delete(*args, **kwargs)
+        reset_table_version(License)
+
     #
     # Own methods
     #
@@ -591,6 +676,22 @@ class RepetitionUnit(models.Model):
         '''
         return self.name
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset all cached infos
+        '''
+        super(RepetitionUnit, self).save(*args, **kwargs)
+        local_cache.invalidate(cache_mapper.REPETITION_UNITS)
+        reset_table_version(RepetitionUnit)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset all cached infos
+        '''
+        local_cache.invalidate(cache_mapper.REPETITION_UNITS)
+        super(RepetitionUnit, self).delete(*args, **kwargs)
+        reset_table_version(RepetitionUnit)
+
     #
     # Own methods
     #
@@ -630,6 +731,22 @@ class WeightUnit(models.Model):
         '''
         return self.name
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset all cached infos
+        '''
+        super(WeightUnit, self).save(*args, **kwargs)
+        local_cache.invalidate(cache_mapper.WEIGHT_UNITS)
+        reset_table_version(WeightUnit)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset all cached infos
+        '''
+        local_cache.invalidate(cache_mapper.WEIGHT_UNITS)
+        super(WeightUnit, self).delete(*args, **kwargs)
+        reset_table_version(WeightUnit)
+
     #
     # Own methods
     #
@@ -647,3 +764,65 @@ class WeightUnit(models.Model):
         This is done basically to not litter the code with magic IDs
         '''
         return self.id in (1, 2)
+
+
+@python_2_unicode_compatible
+class DeletedObject(models.Model):
+    '''
+    Tombstone for a deleted object of a user
+
+    See wger.utils.models.AbstractChangeTrackingModel
+    '''
+
+    user = models.ForeignKey(User,
+                             editable=False)
+    content_type = models.ForeignKey(ContentType,
+                                     editable=False)
+    object_id = models.PositiveIntegerField(editable=False)
+    deleted = models.DateTimeField(default=timezone.now,
+                                   editable=False)
+
+    class Meta:
+        '''
+        Set other properties
+        '''
+        ordering = ["deleted", "id"]
+        index_together = ("user", "deleted")
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"{0} {1} deleted on {2}".format(self.content_type.model,
+                                                self.object_id,
+                                                self.deleted)
+
+    owner_field = 'user'
+
+    def get_owner_object(self):
+        '''
+        Returns the object that has owner information
+        '''
+        return self
+
+
+@python_2_unicode_compatible
+class TableVersion(models.Model):
+    '''
+    Time of the last change to the data of a table
+
+    See wger.utils.cache.reset_table_version, the versions are kept in the
+    database so that all processes agree on them, also after the cache was
+    cleared.
+    '''
+
+    table = models.CharField(max_length=100,
+                             unique=True,
+                             editable=False)
+    version = models.FloatField(editable=False)
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"{0} {1}".format(self.table, self.version)
@@ -15,11 +15,19 @@
 # You should have received a copy of the GNU Affero General Public License
 
 
+import threading
+
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save, pre_delete, post_delete
 
-from wger.core.models import UserProfile, UserCache
+from wger.core.models import DeletedObject, UserProfile, UserCache
 from wger.utils.helpers import disable_for_loaddata
+from wger.utils.models import AbstractChangeTrackingModel
+
+
+_deleted_users = threading.local()
+'''IDs of the users being deleted in the current thread'''
 
 
 @disable_for_loaddata
@@ -40,5 +48,60 @@ def create_user_cache(sender, instance, created, **kwargs):
         UserCache.objects.create(user=instance)
 
 
+def get_deleted_users():
+    '''
+    Returns the set of IDs of the users being deleted in the current thread
+    '''
+    if not hasattr(_deleted_users, 'ids'):
+        _deleted_users.ids = set()
+    return _deleted_users.ids
+
+
+def remember_tombstone_owner(sender, instance, **kwargs):
+    '''
+    Remember the owner of a change tracked object before it is deleted
+
+    The owner is looked up here, as objects deleted in cascade might need
+    the other deleted objects to find it.
+    '''
+    if issubclass(sender, AbstractChangeTrackingModel):
+        instance._tombstone_user_id = instance.get_owner_object().user_id
+
+
+def create_tombstone(sender, instance, **kwargs):
+    '''
+    Leave a tombstone for a deleted change tracked object
+
+    This also happens for objects deleted in cascade or with delete() on a
+    queryset, but not if their user is deleted as well.
+    '''
+    if not issubclass(sender, AbstractChangeTrackingModel):
+        return
+
+    user_id = getattr(instance, '_tombstone_user_id', None)
+    if user_id is not None and user_id not in get_deleted_users():
+        DeletedObject.objects.create(user_id=user_id,
+                                     content_type=ContentType.objects.get_for_model(sender),
+                                     object_id=instance.pk)
+
+
+def remember_deleted_user(sender, instance, **kwargs):
+    '''
+    Remember that a user is being deleted, their objects need no tombstones
+    '''
+    get_deleted_users().add(instance.pk)
+
+
+def forget_deleted_user(sender, instance, **kwargs):
+    '''
+    Forget a user once they were deleted
+    '''
+    get_deleted_users().discard(instance.pk)
+
+
 post_save.connect(create_user_profile, sender=User)
 post_save.connect(create_user_cache, sender=User)
+pre_delete.connect(remember_deleted_user, sender=User)
+post_delete.connect(forget_deleted_user, sender=User)
+pre_delete.connect(remember_tombstone_owner)
+post_delete.connect(create_tombstone)
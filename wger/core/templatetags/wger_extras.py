@@ -26,6 +26,7 @@ from django.utils.translation import (
     pgettext
 )
 
+from wger.exercises.thumbnails import get_thumbnails
 from wger.utils.constants import (
     PAGINATION_MAX_TOTAL_PAGES,
     PAGINATION_PAGES_AROUND_CURRENT
@@ -132,6 +133,14 @@ def get_item(dictionary, key):
     return dictionary.get(key)
 
 
+@register.filter
+def exercise_thumbnail_url(image, alias):
+    '''
+    Returns the URL of an exercise image's thumbnail without rendering it
+    '''
+    return get_thumbnails(image)[alias]['url']
+
+
 @register.simple_tag
 def auto_link_css(flavour='full', css=''):
     '''
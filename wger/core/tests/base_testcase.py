@@ -25,6 +25,7 @@ from django.core.cache import cache
 from django.conf import settings
 from django.test import TestCase
 from wger.utils.constants import TWOPLACES
+from wger.utils.cache import local_cache
 
 
 STATUS_CODES_FAIL = (302, 403, 404)
@@ -136,12 +137,17 @@ class BaseTestCase(object):
         self.media_root = tempfile.mkdtemp()
         settings.MEDIA_ROOT = self.media_root
 
+        # Render the PDFs in the request, the worker threads would not see the
+        # test's transaction
+        settings.WGER_SETTINGS['PDF_BACKGROUND_RENDERING'] = False
+
     def tearDown(self):
         '''
         Reset settings
         '''
         del os.environ['RECAPTCHA_TESTING']
         cache.clear()
+        local_cache.clear()
 
         # Clear MEDIA_ROOT folder
         shutil.rmtree(self.media_root)
@@ -0,0 +1,150 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import json
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+
+from wger.core.bundle import (
+    BUNDLE_FOLDER,
+    decompress,
+    get_bundle,
+    get_bundle_name,
+    get_bundle_version
+)
+from wger.core.models import Language
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise, Muscle
+
+
+class ReferenceBundleTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the bundles with the reference data
+    '''
+
+    def setUp(self):
+        super(ReferenceBundleTestCase, self).setUp()
+        self.language = Language.objects.get(short_name='en')
+
+    def tearDown(self):
+        super(ReferenceBundleTestCase, self).tearDown()
+        if default_storage.exists(BUNDLE_FOLDER):
+            for filename in default_storage.listdir(BUNDLE_FOLDER)[1]:
+                default_storage.delete('{0}/{1}'.format(BUNDLE_FOLDER, filename))
+
+    def test_bundle(self):
+        '''
+        Test that the bundle contains the accepted data of the language
+        '''
+        bundle = get_bundle(self.language)
+        self.assertEqual(bundle['version'], max(bundle['versions'].values()))
+        self.assertEqual(len(bundle['sections']), 14)
+        self.assertEqual(sorted([i['id'] for i in bundle['sections']['exercise']]),
+                         sorted(Exercise.objects.accepted()
+                                                .filter(language=self.language)
+                                                .values_list('id', flat=True)))
+        self.assertEqual(len(bundle['sections']['muscle']), Muscle.objects.count())
+
+    def test_changes(self):
+        '''
+        Test that only the changed sections are returned
+        '''
+        version = get_bundle(self.language)['version']
+        self.assertFalse(get_bundle(self.language, version)['sections'])
+
+        muscle = Muscle.objects.get(pk=1)
+        muscle.name = 'Biceps'
+        muscle.save()
+        bundle = get_bundle(self.language, version)
+        self.assertEqual(list(bundle['sections'].keys()), ['muscle'])
+        self.assertTrue(bundle['version'] > version)
+
+        Exercise.objects.get(pk=1).save()
+        bundle = get_bundle(self.language, bundle['version'])
+        self.assertEqual(list(bundle['sections'].keys()),
+                         ['exercise', 'exerciseimage', 'exercisecomment'])
+
+    def test_version(self):
+        '''
+        Test that the version is kept after the cache was cleared
+        '''
+        version = get_bundle_version(self.language)
+        cache.clear()
+        self.assertEqual(get_bundle_version(self.language), version)
+
+        Muscle.objects.get(pk=1).save()
+        cache.clear()
+        self.assertTrue(get_bundle_version(self.language) > version)
+
+    def test_api(self):
+        '''
+        Test the endpoint, with and without compression
+        '''
+        url = reverse('reference-bundle', kwargs={'language': 'en'})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        call_command('build-reference-bundles', language='en')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        bundle = json.loads(decompress(response.content).decode('utf-8'))
+        self.assertIn('ingredient', bundle['sections'])
+        self.assertTrue(default_storage.exists(get_bundle_name(self.language,
+                                                               bundle['version'])))
+
+        response = self.client.get(url, {'since': bundle['version']})
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['sections'], {})
+
+        response = self.client.get(url,
+                                   {'since': bundle['version']},
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        # Unknown versions get the complete bundle
+        response = self.client.get(url, {'since': 1})
+        self.assertIsNone(json.loads(response.content.decode('utf-8'))['since'])
+
+        self.assertEqual(self.client.get(url, {'since': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('reference-bundle',
+                                                 kwargs={'language': 'xx'})).status_code, 404)
+
+    def test_command(self):
+        '''
+        Test that the command only keeps the current bundles
+        '''
+        call_command('build-reference-bundles', language='en')
+        version = get_bundle_version(self.language)
+        self.assertEqual(sorted(default_storage.listdir(BUNDLE_FOLDER)[1]),
+                         ['en-{0}-{0}.json.gz'.format(version),
+                          'en-{0}.json.gz'.format(version)])
+
+        # Nothing changed
+        call_command('build-reference-bundles', language='en')
+        self.assertEqual(len(default_storage.listdir(BUNDLE_FOLDER)[1]), 2)
+
+        Muscle.objects.get(pk=1).save()
+        call_command('build-reference-bundles', language='en')
+        new_version = get_bundle_version(self.language)
+        self.assertEqual(sorted(default_storage.listdir(BUNDLE_FOLDER)[1]),
+                         sorted(['en-{0}-{0}.json.gz'.format(new_version),
+                                 'en-{0}-{1}.json.gz'.format(new_version, version),
+                                 'en-{0}.json.gz'.format(new_version)]))
+
+        with default_storage.open(get_bundle_name(self.language, new_version, version)) as f:
+            bundle = json.loads(decompress(f.read()).decode('utf-8'))
+        self.assertEqual(list(bundle['sections'].keys()), ['muscle'])
@@ -220,6 +220,44 @@ class PreferencesCalculationsTestCase(WorkoutManagerTestCase):
         WeightEntry.objects.filter(user=user).delete()
         self.assertEqual(user.userprofile.weight, 0)
 
+    def test_metrics_queries(self):
+        '''
+        Tests that the metrics only need one query for the weight
+        '''
+        user = User.objects.get(pk=2)
+        profile = user.userprofile
+        with self.assertNumQueries(1):
+            profile.weight
+            profile.calculate_bmi()
+            profile.calculate_basal_metabolic_rate()
+
+    def test_metrics_reset(self):
+        '''
+        Tests that the remembered weight is reset when an entry is saved
+        '''
+        user = User.objects.get(pk=2)
+        profile = user.userprofile
+        entry = profile.get_latest_weight_entry()
+        bmi = profile.calculate_bmi()
+
+        # Entries saved with the same user object reset its loaded profile
+        new_entry = WeightEntry.objects.create(user=user,
+                                               date=entry.date + datetime.timedelta(days=1),
+                                               weight=entry.weight + 10)
+        self.assertEqual(profile.get_latest_weight_entry().pk, new_entry.pk)
+        self.assertEqual(profile.weight, new_entry.weight)
+        self.assertGreater(profile.calculate_bmi(), bmi)
+
+        new_entry.delete()
+        self.assertEqual(profile.get_latest_weight_entry().pk, entry.pk)
+
+        # Other profiles read the new weight when they are loaded
+        entry = WeightEntry.objects.get(pk=entry.pk)
+        entry.weight = entry.weight + 5
+        entry.save()
+        self.assertIsNot(entry.user, user)
+        self.assertEqual(User.objects.get(pk=2).userprofile.weight, entry.weight)
+
     def test_bmi(self):
         '''
         Tests the BMI calculator
@@ -36,8 +36,8 @@ from wger.core.demo import create_demo_entries, create_temporary_user
 from wger.core.models import DaysOfWeek
 from wger.manager.models import Schedule
 from wger.nutrition.models import NutritionPlan
-from wger.weight.models import WeightEntry
 from wger.weight.helpers import get_last_entries
+from wger.utils.cache import cache_mapper, local_cache
 
 
 logger = logging.getLogger(__name__)
@@ -104,11 +104,7 @@ def dashboard(request):
     template_data['plan'] = plan
 
     # Load the last logged weight entry, if one exists
-    try:
-        weight = WeightEntry.objects.filter(user=request.user).latest('date')
-    except ObjectDoesNotExist:
-        weight = False
-    template_data['weight'] = weight
+    template_data['weight'] = request.user.userprofile.get_latest_weight_entry() or False
     template_data['last_weight_entries'] = get_last_entries(request.user)
 
     # Format a bit the days so it doesn't have to be done in the template
@@ -119,7 +115,10 @@ def dashboard(request):
                 used_days[day_of_week.id] = day.description
 
     week_day_result = []
-    for week in DaysOfWeek.objects.all():
+    days_of_week = local_cache.get_or_set(cache_mapper.DAYS_OF_WEEK,
+                                          'all',
+                                          lambda: list(DaysOfWeek.objects.all()))
+    for week in days_of_week:
         day_has_workout = False
 
         if week.id in used_days:
@@ -14,7 +14,7 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
-from rest_framework import serializers
+from wger.core.api.serializers import LanguageSerializer, LicenseSerializer
 from wger.exercises.models import (
     Muscle,
     Exercise,
@@ -23,17 +23,10 @@ from wger.exercises.models import (
     Equipment,
     ExerciseComment
 )
+from wger.utils.serializers import WgerModelSerializer
 
 
-class ExerciseSerializer(serializers.ModelSerializer):
-    '''
-    Exercise serializer
-    '''
-    class Meta:
-        model = Exercise
-
-
-class EquipmentSerializer(serializers.ModelSerializer):
+class EquipmentSerializer(WgerModelSerializer):
     '''
     Equipment serializer
     '''
@@ -41,7 +34,7 @@ class EquipmentSerializer(serializers.ModelSerializer):
         model = Equipment
 
 
-class ExerciseCategorySerializer(serializers.ModelSerializer):
+class ExerciseCategorySerializer(WgerModelSerializer):
     '''
     ExerciseCategory serializer
     '''
@@ -49,7 +42,7 @@ class ExerciseCategorySerializer(serializers.ModelSerializer):
         model = ExerciseCategory
 
 
-class ExerciseImageSerializer(serializers.ModelSerializer):
+class ExerciseImageSerializer(WgerModelSerializer):
     '''
     ExerciseImage serializer
     '''
@@ -57,7 +50,7 @@ class ExerciseImageSerializer(serializers.ModelSerializer):
         model = ExerciseImage
 
 
-class ExerciseCommentSerializer(serializers.ModelSerializer):
+class ExerciseCommentSerializer(WgerModelSerializer):
     '''
     ExerciseComment serializer
     '''
@@ -65,9 +58,28 @@ class ExerciseCommentSerializer(serializers.ModelSerializer):
         model = ExerciseComment
 
 
-class MuscleSerializer(serializers.ModelSerializer):
+class MuscleSerializer(WgerModelSerializer):
     '''
     Muscle serializer
     '''
     class Meta:
         model = Muscle
+
+
+class ExerciseSerializer(WgerModelSerializer):
+    '''
+    Exercise serializer
+    '''
+    class Meta:
+        model = Exercise
+        expandable_fields = {
+            'category': (ExerciseCategorySerializer, {}),
+            'muscles': (MuscleSerializer, {'many': True}),
+            'muscles_secondary': (MuscleSerializer, {'many': True}),
+            'equipment': (EquipmentSerializer, {'many': True}),
+            'language': (LanguageSerializer, {}),
+            'license': (LicenseSerializer, {}),
+            'images': (ExerciseImageSerializer, {'many': True, 'source': 'exerciseimage_set'}),
+            'comments': (ExerciseCommentSerializer, {'many': True,
+                                                     'source': 'exercisecomment_set'}),
+        }
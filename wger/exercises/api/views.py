@@ -20,9 +20,6 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.decorators import detail_route, api_view
 
-from easy_thumbnails.alias import aliases
-from easy_thumbnails.files import get_thumbnailer
-
 from django.utils.translation import ugettext as _
 
 from wger.config.models import LanguageConfig
@@ -35,6 +32,7 @@ from wger.exercises.api.serializers import (
     ExerciseCommentSerializer
 )
 from wger.exercises.models import (
+    EXERCISE_TABLES,
     Exercise,
     Equipment,
     ExerciseCategory,
@@ -42,16 +40,19 @@ from wger.exercises.models import (
     ExerciseComment,
     Muscle
 )
+from wger.exercises.thumbnails import get_thumbnails
 from wger.utils.language import load_item_languages, load_language
 from wger.utils.permissions import CreateOnlyPermission
+from wger.utils.viewsets import WgerConditionalMixin
 
 
-class ExerciseViewSet(viewsets.ModelViewSet):
+class ExerciseViewSet(WgerConditionalMixin, viewsets.ModelViewSet):
     '''
     API endpoint for exercise objects
     '''
     queryset = Exercise.objects.all()
     serializer_class = ExerciseSerializer
+    cache_tables = EXERCISE_TABLES
     permission_classes = (IsAuthenticatedOrReadOnly, CreateOnlyPermission)
     ordering_fields = '__all__'
     filter_fields = ('category',
@@ -101,8 +102,7 @@ def search(request):
             if exercise.main_image:
                 image_obj = exercise.main_image
                 image = image_obj.image.url
-                t = get_thumbnailer(image_obj.image)
-                thumbnail = t.get_thumbnail(aliases.get('micro_cropped')).url
+                thumbnail = get_thumbnails(image_obj)['micro_cropped']['url']
             else:
                 image = None
                 thumbnail = None
@@ -123,32 +123,35 @@ def search(request):
     return Response(json_response)
 
 
-class EquipmentViewSet(viewsets.ReadOnlyModelViewSet):
+class EquipmentViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for equipment objects
     '''
     queryset = Equipment.objects.all()
     serializer_class = EquipmentSerializer
+    cache_tables = (Equipment, )
     ordering_fields = '__all__'
     filter_fields = ('name',)
 
 
-class ExerciseCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ExerciseCategoryViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for exercise categories objects
     '''
     queryset = ExerciseCategory.objects.all()
     serializer_class = ExerciseCategorySerializer
+    cache_tables = (ExerciseCategory, )
     ordering_fields = '__all__'
     filter_fields = ('name',)
 
 
-class ExerciseImageViewSet(viewsets.ModelViewSet):
+class ExerciseImageViewSet(WgerConditionalMixin, viewsets.ModelViewSet):
     '''
     API endpoint for exercise image objects
     '''
     queryset = ExerciseImage.objects.all()
     serializer_class = ExerciseImageSerializer
+    cache_tables = EXERCISE_TABLES
     permission_classes = (IsAuthenticatedOrReadOnly, CreateOnlyPermission)
     ordering_fields = '__all__'
     filter_fields = ('is_main',
@@ -167,13 +170,7 @@ class ExerciseImageViewSet(viewsets.ModelViewSet):
         except ExerciseImage.DoesNotExist:
             return Response([])
 
-        thumbnails = {}
-        for alias in aliases.all():
-            t = get_thumbnailer(image.image)
-            thumbnails[alias] = {
-                'url': t.get_thumbnail(aliases.get(alias)).url,
-                'settings': aliases.get(alias)
-            }
+        thumbnails = dict(get_thumbnails(image))
         thumbnails['original'] = image.image.url
         return Response(thumbnails)
 
@@ -187,23 +184,25 @@ class ExerciseImageViewSet(viewsets.ModelViewSet):
         obj.save()
 
 
-class ExerciseCommentViewSet(viewsets.ReadOnlyModelViewSet):
+class ExerciseCommentViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for exercise comment objects
     '''
     queryset = ExerciseComment.objects.all()
     serializer_class = ExerciseCommentSerializer
+    cache_tables = EXERCISE_TABLES
     ordering_fields = '__all__'
     filter_fields = ('comment',
                      'exercise')
 
 
-class MuscleViewSet(viewsets.ReadOnlyModelViewSet):
+class MuscleViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for muscle objects
     '''
     queryset = Muscle.objects.all()
     serializer_class = MuscleSerializer
+    cache_tables = (Muscle, )
     ordering_fields = '__all__'
     filter_fields = ('name',
                      'is_front')
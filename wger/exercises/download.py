@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Downloading of exercise images from another wger installation
+
+The remote exercises and images are listed once, page by page, and matched
+to the local exercises by their UUID. The images missing locally are then
+downloaded in parallel through one pooled HTTP session and saved one after
+the other. The progress is written to a checkpoint file, so an interrupted
+download can be resumed without listing the remote images again.
+'''
+
+import json
+import logging
+import os
+from multiprocessing.pool import ThreadPool
+
+import requests
+from django.core.files.base import ContentFile
+from requests.adapters import HTTPAdapter
+from requests.utils import default_user_agent
+from six.moves.urllib.parse import urljoin, urlparse
+
+from wger import get_version
+from wger.exercises.models import Exercise, ExerciseImage
+
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_WORKERS = 8
+'''Maximum number of images downloaded at the same time'''
+
+PAGE_SIZE = 100
+'''Number of objects requested per page of the remote API'''
+
+REQUEST_TIMEOUT = 30
+'''Seconds to wait for the remote server'''
+
+CHECKPOINT_INTERVAL = 20
+'''Number of saved images after which the checkpoint is written'''
+
+
+def get_session(workers=DOWNLOAD_WORKERS):
+    '''
+    Returns a HTTP session whose connections can be used by all the workers
+    '''
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=3)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-agent'] = default_user_agent('wger/{0} + requests'.format(get_version()))
+    return session
+
+
+def iter_remote_objects(session, url):
+    '''
+    Yields the objects of a paginated endpoint of the remote API
+    '''
+    while url:
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        for obj in data['results']:
+            yield obj
+        url = data.get('next')
+
+
+def get_remote_images(session, remote_url):
+    '''
+    Returns the images of the remote installation
+
+    :return: a list of dictionaries with the image's ID, the UUID of its
+             exercise, its URL and its main and status flags
+    '''
+    exercise_uuids = dict([(exercise['id'], exercise['uuid']) for exercise in iter_remote_objects(
+        session,
+        '{0}/api/v2/exercise/?limit={1}&fields=id,uuid'.format(remote_url, PAGE_SIZE))])
+
+    return [{'id': image['id'],
+             'exercise_uuid': exercise_uuids.get(image['exercise']),
+             'url': urljoin(remote_url + '/', image['image']),
+             'is_main': image['is_main'],
+             'status': image['status']}
+            for image in iter_remote_objects(
+                session,
+                '{0}/api/v2/exerciseimage/?limit={1}'.format(remote_url, PAGE_SIZE))]
+
+
+def load_checkpoint(path, remote_url):
+    '''
+    Returns the state of an interrupted download from the same remote URL
+    '''
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path) as checkpoint:
+            state = json.load(checkpoint)
+    except ValueError:
+        logger.warning('Ignoring invalid checkpoint %s', path)
+        return None
+    return state if state.get('remote_url') == remote_url else None
+
+
+def save_checkpoint(path, state):
+    '''
+    Writes the state of the download, replacing the old one at once
+    '''
+    if not path:
+        return
+
+    temp_path = '{0}.tmp'.format(path)
+    with open(temp_path, 'w') as checkpoint:
+        json.dump(state, checkpoint)
+    os.rename(temp_path, path)
+
+
+def fetch_image(session, image):
+    '''
+    Downloads an image, in a worker thread
+
+    :return: a tuple with the image and its content, or None on errors
+    '''
+    try:
+        response = session.get(image['url'], timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return image, response.content
+    except requests.RequestException as e:
+        logger.warning('Could not download image %s: %s', image['url'], e)
+        return image, None
+
+
+def download_images(remote_url, workers=DOWNLOAD_WORKERS, checkpoint_path=None):
+    '''
+    Downloads the images of the remote exercises that are missing locally
+
+    Images whose ID already exists locally are skipped, as well as the ones
+    of exercises that don't exist locally.
+
+    :param checkpoint_path: the file to write the progress to, a download
+                            with the same remote URL continues from there.
+                            It is deleted once all images are downloaded.
+    :return: a dictionary with the number of 'downloaded', 'skipped' and
+             'failed' images
+    '''
+    session = get_session(workers)
+    state = load_checkpoint(checkpoint_path, remote_url)
+    if state is None:
+        state = {'remote_url': remote_url,
+                 'images': get_remote_images(session, remote_url),
+                 'done': []}
+        save_checkpoint(checkpoint_path, state)
+
+    exercises = dict([(exercise.uuid, exercise) for exercise in Exercise.objects.all()])
+    existing_ids = set(ExerciseImage.objects.values_list('pk', flat=True))
+    done = set(state['done'])
+    pending = [image for image in state['images']
+               if image['id'] not in done
+               and image['id'] not in existing_ids
+               and image['exercise_uuid'] in exercises]
+    counts = {'downloaded': 0, 'skipped': len(state['images']) - len(pending), 'failed': 0}
+
+    pool = ThreadPool(workers)
+    try:
+        for image, content in pool.imap_unordered(lambda image: fetch_image(session, image),
+                                                  pending):
+            if content is None:
+                counts['failed'] += 1
+                continue
+
+            image_obj = ExerciseImage(pk=image['id'],
+                                      exercise=exercises[image['exercise_uuid']],
+                                      is_main=image['is_main'],
+                                      status=image['status'])
+            image_obj.image.save(os.path.basename(urlparse(image['url']).path),
+                                 ContentFile(content),
+                                 save=False)
+            image_obj.save()
+            logger.info('Saved image %s for exercise %s', image['id'], image_obj.exercise_id)
+
+            counts['downloaded'] += 1
+            done.add(image['id'])
+            if counts['downloaded'] % CHECKPOINT_INTERVAL == 0:
+                state['done'] = sorted(done)
+                save_checkpoint(checkpoint_path, state)
+    finally:
+        pool.terminate()
+        session.close()
+
+    if counts['failed']:
+        state['done'] = sorted(done)
+        save_checkpoint(checkpoint_path, state)
+    elif checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return counts
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wger.exercises.models import ExerciseImage
+from wger.exercises.thumbnails import generate_all_thumbnails
+
+
+class Command(BaseCommand):
+    '''
+    Renders the thumbnails of all exercise images
+
+    Thumbnails that already exist are not rendered again, so this is also a
+    cheap way to check that all images have their thumbnails, e.g. after
+    importing images or changing THUMBNAIL_ALIASES.
+    '''
+
+    option_list = BaseCommand.option_list + (
+        make_option('--processes',
+                    action='store',
+                    type='int',
+                    dest='processes',
+                    default=None,
+                    help='Number of processes rendering the thumbnails '
+                         '(default: number of CPUs)'),
+    )
+
+    help = 'Renders the missing thumbnails of all exercise images'
+
+    def handle(self, **options):
+
+        if options['processes'] is not None and options['processes'] < 1:
+            raise CommandError('Please use at least one process')
+
+        images = ExerciseImage.objects.all()
+        failed = generate_all_thumbnails(images, options['processes'])
+
+        if options['verbosity'] > 0:
+            self.stdout.write('Generated the thumbnails of {0} images, {1} failed'
+                              .format(images.count() - failed, failed))
@@ -30,18 +30,19 @@ from django.utils.encoding import python_2_unicode_compatible
 from django.utils import translation
 from django.core.urlresolvers import reverse
 from django.core import mail
-from django.core.cache import cache
 from django.core.validators import MinLengthValidator
 from django.conf import settings
 
-from wger.core.models import Language
+from wger.core.models import Language, License
 from wger.utils.helpers import smart_capitalize
 from wger.utils.managers import SubmissionManager
 from wger.utils.models import AbstractLicenseModel, AbstractSubmissionModel
 from wger.utils.cache import (
-    delete_template_fragment_cache,
-    reset_workout_canonical_form,
-    cache_mapper
+    reset_exercise_fragments,
+    reset_workout_canonical_forms,
+    reset_table_version,
+    cache_mapper,
+    local_cache
 )
 
 
@@ -71,6 +72,20 @@ class Muscle(models.Model):
         '''
         return self.name
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(Muscle, self).save(*args, **kwargs)
+        reset_table_version(Muscle)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(Muscle, self).delete(*args, **kwargs)
+        reset_table_version(Muscle)
+
     def get_owner_object(self):
         '''
         Muscle has no owner information
@@ -99,6 +114,20 @@ class Equipment(models.Model):
         '''
         return self.name
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(Equipment, self).save(*args, **kwargs)
+        reset_table_version(Equipment)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(Equipment, self).delete(*args, **kwargs)
+        reset_table_version(Equipment)
+
     def get_owner_object(self):
         '''
         Equipment has no owner information
@@ -139,19 +168,19 @@ class ExerciseCategory(models.Model):
         super(ExerciseCategory, self).save(*args, **kwargs)
 
         # Cached template fragments
-        for language in Language.objects.all():
-            delete_template_fragment_cache('exercise-overview', language.id)
-            delete_template_fragment_cache('exercise-overview-mobile', language.id)
+        reset_exercise_fragments()
+
+        # Conditional requests
+        reset_table_version(ExerciseCategory)
 
     def delete(self, *args, **kwargs):
         '''
         Reset all cached infos
         '''
-        for language in Language.objects.all():
-            delete_template_fragment_cache('exercise-overview', language.id)
-            delete_template_fragment_cache('exercise-overview-mobile', language.id)
+        reset_exercise_fragments()
 
         super(ExerciseCategory, self).delete(*args, **kwargs)
+        reset_table_version(ExerciseCategory)
 
 
 @python_2_unicode_compatible
@@ -233,18 +262,16 @@ class Exercise(AbstractSubmissionModel, AbstractLicenseModel, models.Model):
         super(Exercise, self).save(*args, **kwargs)
 
         # Cached objects
-        cache.delete(cache_mapper.get_exercise_muscle_bg_key(self))
+        local_cache.invalidate(cache_mapper.EXERCISE_MUSCLE_BG)
 
         # Cached template fragments
-        for language in Language.objects.all():
-            delete_template_fragment_cache('muscle-overview', language.id)
-            delete_template_fragment_cache('exercise-overview', language.id)
-            delete_template_fragment_cache('exercise-overview-mobile', language.id)
-            delete_template_fragment_cache('equipment-overview', language.id)
+        reset_exercise_fragments()
 
         # Cached workouts
-        for set in self.set_set.all():
-            reset_workout_canonical_form(set.exerciseday.training_id)
+        reset_workout_canonical_forms(self.get_workout_ids())
+
+        # Conditional requests
+        reset_table_version(Exercise)
 
     def delete(self, *args, **kwargs):
         '''
@@ -252,20 +279,16 @@ class Exercise(AbstractSubmissionModel, AbstractLicenseModel, models.Model):
         '''
 
         # Cached objects
-        cache.delete(cache_mapper.get_exercise_muscle_bg_key(self))
+        local_cache.invalidate(cache_mapper.EXERCISE_MUSCLE_BG)
 
         # Cached template fragments
-        for language in Language.objects.all():
-            delete_template_fragment_cache('muscle-overview', language.id)
-            delete_template_fragment_cache('exercise-overview', language.id)
-            delete_template_fragment_cache('exercise-overview-mobile', language.id)
-            delete_template_fragment_cache('equipment-overview', language.id)
+        reset_exercise_fragments()
 
         # Cached workouts
-        for set in self.set_set.all():
-            reset_workout_canonical_form(set.exerciseday.training.pk)
+        reset_workout_canonical_forms(self.get_workout_ids())
 
         super(Exercise, self).delete(*args, **kwargs)
+        reset_table_version(Exercise)
 
     def __str__(self):
         '''
@@ -297,6 +320,14 @@ class Exercise(AbstractSubmissionModel, AbstractLicenseModel, models.Model):
         '''
         return False
 
+    def get_workout_ids(self):
+        '''
+        Return the IDs of the workouts that use this exercise, with one query
+        '''
+        return self.set_set.order_by() \
+                           .values_list('exerciseday__training_id', flat=True) \
+                           .distinct()
+
     def send_email(self, request):
         '''
         Sends an email after being successfully added to the database (for user
@@ -399,14 +430,12 @@ class ExerciseImage(AbstractSubmissionModel, AbstractLicenseModel, models.Model)
         #
         # Reset all cached infos
         #
-        for language in Language.objects.all():
-            delete_template_fragment_cache('muscle-overview', language.id)
-            delete_template_fragment_cache('exercise-overview', language.id)
-            delete_template_fragment_cache('exercise-overview-mobile', language.id)
-            delete_template_fragment_cache('equipment-overview', language.id)
+        reset_exercise_fragments()
+        reset_workout_canonical_forms(self.exercise.get_workout_ids())
 
         # And go on
         super(ExerciseImage, self).save(*args, **kwargs)
+        reset_table_version(ExerciseImage)
 
     def delete(self, *args, **kwargs):
         '''
@@ -414,11 +443,9 @@ class ExerciseImage(AbstractSubmissionModel, AbstractLicenseModel, models.Model)
         '''
         super(ExerciseImage, self).delete(*args, **kwargs)
 
-        for language in Language.objects.all():
-            delete_template_fragment_cache('muscle-overview', language.id)
-            delete_template_fragment_cache('exercise-overview', language.id)
-            delete_template_fragment_cache('exercise-overview-mobile', language.id)
-            delete_template_fragment_cache('equipment-overview', language.id)
+        reset_exercise_fragments()
+        reset_table_version(ExerciseImage)
+        reset_workout_canonical_forms(self.exercise.get_workout_ids())
 
         # Make sure there is always a main image
         if not ExerciseImage.objects.accepted() \
@@ -486,22 +513,33 @@ class ExerciseComment(models.Model):
         '''
         Reset cached workouts
         '''
-        for set in self.exercise.set_set.all():
-            reset_workout_canonical_form(set.exerciseday.training_id)
+        reset_workout_canonical_forms(self.exercise.get_workout_ids())
 
         super(ExerciseComment, self).save(*args, **kwargs)
+        reset_table_version(ExerciseComment)
 
     def delete(self, *args, **kwargs):
         '''
         Reset cached workouts
         '''
-        for set in self.exercise.set_set.all():
-            reset_workout_canonical_form(set.exerciseday.training.pk)
+        reset_workout_canonical_forms(self.exercise.get_workout_ids())
 
         super(ExerciseComment, self).delete(*args, **kwargs)
+        reset_table_version(ExerciseComment)
 
     def get_owner_object(self):
         '''
         Comment has no owner information
         '''
         return False
+
+
+EXERCISE_TABLES = (Exercise,
+                   ExerciseCategory,
+                   ExerciseImage,
+                   ExerciseComment,
+                   Equipment,
+                   Muscle,
+                   Language,
+                   License)
+'''Models whose data is shown by the exercise pages and API endpoints'''
@@ -17,12 +17,13 @@
 
 from django.db.models.signals import pre_save
 from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
 from django.dispatch import receiver
-from easy_thumbnails.files import get_thumbnailer
 from easy_thumbnails.signal_handlers import generate_aliases
 from easy_thumbnails.signals import saved_file
 
 from wger.exercises.models import ExerciseImage
+from wger.exercises.thumbnails import delete_thumbnails, generate_thumbnails
 
 
 @receiver(post_delete, sender=ExerciseImage)
@@ -31,8 +32,7 @@ def delete_exercise_image_on_delete(sender, instance, **kwargs):
     Delete the image, along with its thumbnails, from the disk
     '''
 
-    thumbnailer = get_thumbnailer(instance.image)
-    thumbnailer.delete_thumbnails()
+    delete_thumbnails(instance)
     instance.image.delete(save=False)
 
 
@@ -52,10 +52,20 @@ def delete_exercise_image_on_update(sender, instance, **kwargs):
 
     new_file = instance.image
     if not old_file == new_file:
-        thumbnailer = get_thumbnailer(instance.image)
-        thumbnailer.delete_thumbnails()
+        delete_thumbnails(instance)
         instance.image.delete(save=False)
 
 
+@receiver(post_save, sender=ExerciseImage)
+def generate_exercise_image_thumbnails(sender, instance, raw, **kwargs):
+    '''
+    Render the thumbnails of a saved image, so that views don't have to
+    '''
+    if raw or not instance.image:
+        return
+
+    generate_thumbnails(instance)
+
+
 # Generate thumbnails when uploading a new image
 saved_file.connect(generate_aliases)
@@ -23,7 +23,7 @@ from wger.core.tests.base_testcase import (
     WorkoutManagerAddTestCase,
     WorkoutManagerAccessTestCase)
 from wger.exercises.models import ExerciseCategory
-from wger.utils.cache import get_template_cache_name
+from wger.utils.cache import get_fragment_cache_name
 
 
 class ExerciseCategoryRepresentationTestCase(WorkoutManagerTestCase):
@@ -105,23 +105,23 @@ class ExerciseCategoryCacheTestCase(WorkoutManagerTestCase):
         self.client.get(reverse('exercise:exercise:overview'))
         self.client.get(reverse('exercise:exercise:view', kwargs={'id': 2}))
 
-        old_exercise_overview = cache.get(get_template_cache_name('exercise-overview', 2))
-        old_exercise_overview_mobile = cache.get(get_template_cache_name('exercise-overview-mobile',
+        old_exercise_overview = cache.get(get_fragment_cache_name('exercise-overview', 2))
+        old_exercise_overview_mobile = cache.get(get_fragment_cache_name('exercise-overview-mobile',
                                                                          2))
 
         category = ExerciseCategory.objects.get(pk=2)
         category.name = 'Cool category'
         category.save()
 
-        self.assertFalse(cache.get(get_template_cache_name('exercise-overview', 2)))
-        self.assertFalse(cache.get(get_template_cache_name('exercise-overview-mobile', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('exercise-overview', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('exercise-overview-mobile', 2)))
 
         self.client.get(reverse('exercise:exercise:overview'))
         self.client.get(reverse('exercise:muscle:overview'))
         self.client.get(reverse('exercise:exercise:view', kwargs={'id': 2}))
 
-        new_exercise_overview = cache.get(get_template_cache_name('exercise-overview', 2))
-        new_exercise_overview_mobile = cache.get(get_template_cache_name('exercise-overview-mobile',
+        new_exercise_overview = cache.get(get_fragment_cache_name('exercise-overview', 2))
+        new_exercise_overview_mobile = cache.get(get_fragment_cache_name('exercise-overview-mobile',
                                                                          2))
 
         if not self.is_mobile:
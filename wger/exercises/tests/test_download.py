@@ -0,0 +1,172 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.core.management import call_command
+from six import StringIO
+from six.moves import BaseHTTPServer
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises import download
+from wger.exercises.models import Exercise, ExerciseImage
+
+
+IMAGE_PATH = os.path.join(os.path.dirname(__file__), 'protestschwein.jpg')
+
+
+class RemoteHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    '''
+    Stand-in for the API of a remote installation
+    '''
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        page = int(parse_qs(url.query).get('page', ['1'])[0])
+        self.server.requests.append(url.path)
+
+        if url.path == '/api/v2/exercise/':
+            results = self.server.exercises
+        elif url.path == '/api/v2/exerciseimage/':
+            results = self.server.images
+        elif url.path.startswith('/media/') and url.path != '/media/missing.jpg':
+            with open(IMAGE_PATH, 'rb') as image:
+                return self.respond(image.read(), 'image/jpeg')
+        else:
+            return self.respond(b'', 'text/plain', 404)
+
+        # Two objects per page
+        next_url = None
+        if len(results) > page * 2:
+            next_url = 'http://{0}:{1}{2}?page={3}'.format(self.server.server_address[0],
+                                                           self.server.server_address[1],
+                                                           url.path,
+                                                           page + 1)
+        data = {'count': len(results),
+                'next': next_url,
+                'results': results[(page - 1) * 2:page * 2]}
+        self.respond(json.dumps(data).encode('utf-8'), 'application/json')
+
+    def respond(self, content, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class DownloadImagesTestCase(WorkoutManagerTestCase):
+    '''
+    Tests downloading the exercise images from a remote installation
+    '''
+
+    def setUp(self):
+        super(DownloadImagesTestCase, self).setUp()
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), RemoteHandler)
+        self.server.requests = []
+        self.server.exercises = [{'id': 81, 'uuid': Exercise.objects.get(pk=1).uuid},
+                                 {'id': 82, 'uuid': Exercise.objects.get(pk=2).uuid},
+                                 {'id': 83, 'uuid': 'not-a-local-uuid'}]
+        self.server.images = [self.get_image(1001, 81, 'a.jpg'),
+                              self.get_image(1002, 81, 'b.jpg'),
+                              self.get_image(1003, 82, 'c.jpg'),
+                              self.get_image(1004, 83, 'd.jpg')]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        self.remote_url = 'http://127.0.0.1:{0}'.format(self.server.server_address[1])
+        self.checkpoint = os.path.join(settings.MEDIA_ROOT, 'download.json')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super(DownloadImagesTestCase, self).tearDown()
+
+    def get_image(self, pk, exercise, filename):
+        return {'id': pk,
+                'exercise': exercise,
+                'image': '/media/exercise-images/{0}/{1}'.format(exercise, filename),
+                'is_main': filename == 'a.jpg',
+                'status': ExerciseImage.STATUS_ACCEPTED}
+
+    def test_download(self):
+        '''
+        Test that the missing images are saved to the matching exercises
+        '''
+        counts = download.download_images(self.remote_url, 2, self.checkpoint)
+        self.assertEqual(counts, {'downloaded': 3, 'skipped': 1, 'failed': 0})
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+        image = ExerciseImage.objects.get(pk=1001)
+        self.assertEqual(image.exercise_id, 1)
+        self.assertTrue(image.is_main)
+        self.assertTrue(image.image.name.startswith('exercise-images/1/a'))
+        with open(IMAGE_PATH, 'rb') as original:
+            self.assertEqual(image.image.read(), original.read())
+        self.assertEqual(ExerciseImage.objects.get(pk=1003).exercise_id, 2)
+        self.assertFalse(ExerciseImage.objects.filter(pk=1004).exists())
+
+        # The remote exercises and images are listed once, page by page
+        self.assertEqual(self.server.requests.count('/api/v2/exercise/'), 2)
+        self.assertEqual(self.server.requests.count('/api/v2/exerciseimage/'), 2)
+
+        # Images present locally are not downloaded again
+        del self.server.requests[:]
+        counts = download.download_images(self.remote_url, 2, self.checkpoint)
+        self.assertEqual(counts, {'downloaded': 0, 'skipped': 4, 'failed': 0})
+        self.assertFalse([i for i in self.server.requests if i.startswith('/media/')])
+
+    def test_resume(self):
+        '''
+        Test that a download with failed images continues from the checkpoint
+        '''
+        self.server.images[1]['image'] = '/media/missing.jpg'
+        counts = download.download_images(self.remote_url, 2, self.checkpoint)
+        self.assertEqual(counts, {'downloaded': 2, 'skipped': 1, 'failed': 1})
+        with open(self.checkpoint) as checkpoint:
+            self.assertEqual(json.load(checkpoint)['done'], [1001, 1003])
+
+        # The remote API is not listed again
+        del self.server.requests[:]
+        self.server.images[1]['image'] = '/media/exercise-images/81/b.jpg'
+        counts = download.download_images(self.remote_url, 2, self.checkpoint)
+        self.assertEqual(counts, {'downloaded': 0, 'skipped': 3, 'failed': 1})
+        self.assertEqual(self.server.requests, ['/media/missing.jpg'])
+
+        # A checkpoint for another server is ignored
+        with open(self.checkpoint) as checkpoint:
+            state = json.load(checkpoint)
+        state['remote_url'] = 'https://example.com'
+        download.save_checkpoint(self.checkpoint, state)
+        counts = download.download_images(self.remote_url, 2, self.checkpoint)
+        self.assertEqual(counts, {'downloaded': 1, 'skipped': 3, 'failed': 0})
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_command(self):
+        '''
+        Test the management command
+        '''
+        call_command('download-exercise-images',
+                     remote_url=self.remote_url,
+                     workers=2,
+                     stdout=StringIO())
+        self.assertEqual(ExerciseImage.objects.filter(pk__in=(1001, 1002, 1003)).count(), 3)
@@ -28,7 +28,7 @@ from wger.exercises.models import (
     Muscle,
     ExerciseCategory,
 )
-from wger.utils.cache import get_template_cache_name, cache_mapper
+from wger.utils.cache import get_fragment_cache_name, cache_mapper, reset_table_version
 
 
 class ExerciseRepresentationTestCase(WorkoutManagerTestCase):
@@ -414,13 +414,13 @@ class ExercisesCacheTestCase(WorkoutManagerTestCase):
         Test the exercise overview cache is correctly generated on visit
         '''
         if self.is_mobile:
-            self.assertFalse(cache.get(get_template_cache_name('exercise-overview-mobile', 2)))
+            self.assertFalse(cache.get(get_fragment_cache_name('exercise-overview-mobile', 2)))
             self.client.get(reverse('exercise:exercise:overview'))
-            self.assertTrue(cache.get(get_template_cache_name('exercise-overview-mobile', 2)))
+            self.assertTrue(cache.get(get_fragment_cache_name('exercise-overview-mobile', 2)))
         else:
-            self.assertFalse(cache.get(get_template_cache_name('exercise-overview', 2)))
+            self.assertFalse(cache.get(get_fragment_cache_name('exercise-overview', 2)))
             self.client.get(reverse('exercise:exercise:overview'))
-            self.assertTrue(cache.get(get_template_cache_name('exercise-overview', 2)))
+            self.assertTrue(cache.get(get_fragment_cache_name('exercise-overview', 2)))
 
     def test_exercise_detail(self):
         '''
@@ -433,18 +433,18 @@ class ExercisesCacheTestCase(WorkoutManagerTestCase):
         performing certain operations
         '''
         self.assertFalse(cache.get(cache_mapper.get_exercise_muscle_bg_key(2)))
-        self.assertFalse(cache.get(get_template_cache_name('muscle-overview', 2)))
-        self.assertFalse(cache.get(get_template_cache_name('muscle-overview-mobile', 2)))
-        self.assertFalse(cache.get(get_template_cache_name('muscle-overview-search', 2)))
-        self.assertFalse(cache.get(get_template_cache_name('exercise-overview', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('muscle-overview', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('muscle-overview-mobile', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('muscle-overview-search', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('exercise-overview', 2)))
 
         self.client.get(reverse('exercise:exercise:overview'))
         self.client.get(reverse('exercise:exercise:view', kwargs={'id': 2}))
 
         old_exercise_bg = cache.get(cache_mapper.get_exercise_muscle_bg_key(2))
-        old_muscle_overview = cache.get(get_template_cache_name('muscle-overview', 2))
-        old_exercise_overview = cache.get(get_template_cache_name('exercise-overview', 2))
-        old_exercise_overview_mobile = cache.get(get_template_cache_name('exercise-overview-mobile',
+        old_muscle_overview = cache.get(get_fragment_cache_name('muscle-overview', 2))
+        old_exercise_overview = cache.get(get_fragment_cache_name('exercise-overview', 2))
+        old_exercise_overview_mobile = cache.get(get_fragment_cache_name('exercise-overview-mobile',
                                                                          2))
 
         exercise = Exercise.objects.get(pk=2)
@@ -454,18 +454,18 @@ class ExercisesCacheTestCase(WorkoutManagerTestCase):
         exercise.save()
 
         self.assertFalse(cache.get(cache_mapper.get_exercise_muscle_bg_key(2)))
-        self.assertFalse(cache.get(get_template_cache_name('muscle-overview', 2)))
-        self.assertFalse(cache.get(get_template_cache_name('exercise-overview', 2)))
-        self.assertFalse(cache.get(get_template_cache_name('exercise-overview-mobile', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('muscle-overview', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('exercise-overview', 2)))
+        self.assertFalse(cache.get(get_fragment_cache_name('exercise-overview-mobile', 2)))
 
         self.client.get(reverse('exercise:exercise:overview'))
         self.client.get(reverse('exercise:muscle:overview'))
         self.client.get(reverse('exercise:exercise:view', kwargs={'id': 2}))
 
         new_exercise_bg = cache.get(cache_mapper.get_exercise_muscle_bg_key(2))
-        new_muscle_overview = cache.get(get_template_cache_name('muscle-overview', 2))
-        new_exercise_overview = cache.get(get_template_cache_name('exercise-overview', 2))
-        new_exercise_overview_mobile = cache.get(get_template_cache_name('exercise-overview-mobile',
+        new_muscle_overview = cache.get(get_fragment_cache_name('muscle-overview', 2))
+        new_exercise_overview = cache.get(get_fragment_cache_name('exercise-overview', 2))
+        new_exercise_overview_mobile = cache.get(get_fragment_cache_name('exercise-overview-mobile',
                                                                          2))
 
         if not self.is_mobile:
@@ -511,6 +511,31 @@ class WorkoutCacheTestCase(WorkoutManagerTestCase):
         for workout_id in workout_ids:
             self.assertFalse(cache.get(cache_mapper.get_workout_canonical(workout_id)))
 
+    def test_workout_ids(self):
+        '''
+        Tests that the workouts using an exercise are found with one query
+        '''
+        exercise = Exercise.objects.get(pk=2)
+        workout_ids = set([s.exerciseday.training_id for s in exercise.set_set.all()])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(sorted(exercise.get_workout_ids()), sorted(workout_ids))
+
+    def test_fragments_reset(self):
+        '''
+        Tests that the template fragments of all languages are reset at once
+        '''
+        self.client.get(reverse('exercise:muscle:overview'))
+        self.assertTrue(cache.get(get_fragment_cache_name('muscle-overview', 2)))
+        old_key = get_fragment_cache_name('muscle-overview', 2)
+
+        exercise = Exercise.objects.get(pk=2)
+        reset_table_version(Exercise)
+        with self.assertNumQueries(3):
+            exercise.save()
+        self.assertNotEqual(old_key, get_fragment_cache_name('muscle-overview', 2))
+        self.assertFalse(cache.get(get_fragment_cache_name('muscle-overview', 2)))
+
 
 # TODO: fix test, all registered users can upload exercises
 # class ExerciseApiTestCase(api_base_test.ApiBaseResourceTestCase):
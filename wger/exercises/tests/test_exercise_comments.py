@@ -23,7 +23,7 @@ from wger.core.tests.base_testcase import (
     WorkoutManagerAddTestCase
 )
 from wger.exercises.models import Exercise, ExerciseComment
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import cache_mapper, reset_table_version
 
 
 class ExerciseCommentRepresentationTestCase(WorkoutManagerTestCase):
@@ -149,6 +149,18 @@ class WorkoutCacheTestCase(WorkoutManagerTestCase):
         for workout_id in workout_ids:
             self.assertFalse(cache.get(cache_mapper.get_workout_canonical(workout_id)))
 
+    def test_canonical_form_cache_queries(self):
+        '''
+        Tests that the number of queries doesn't depend on the number of sets
+        '''
+        comment = ExerciseComment.objects.get(pk=1)
+        comment.exercise
+        reset_table_version(ExerciseComment)
+
+        # Select the workout IDs, update the comment and the table's version
+        with self.assertNumQueries(3):
+            comment.save()
+
 
 class ExerciseCommentApiTestCase(api_base_test.ApiBaseResourceTestCase):
     '''
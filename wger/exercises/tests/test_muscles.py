@@ -24,7 +24,7 @@ from wger.core.tests.base_testcase import (
     WorkoutManagerAddTestCase,
     WorkoutManagerAccessTestCase)
 from wger.exercises.models import Muscle
-from wger.utils.cache import get_template_cache_name
+from wger.utils.cache import get_fragment_cache_name
 
 
 class MuscleRepresentationTestCase(WorkoutManagerTestCase):
@@ -123,9 +123,9 @@ class MuscleCacheTestCase(WorkoutManagerTestCase):
         '''
 
         if not self.is_mobile:
-            self.assertFalse(cache.get(get_template_cache_name('muscle-overview', 2)))
+            self.assertFalse(cache.get(get_fragment_cache_name('muscle-overview', 2)))
             self.client.get(reverse('exercise:muscle:overview'))
-            self.assertTrue(cache.get(get_template_cache_name('muscle-overview', 2)))
+            self.assertTrue(cache.get(get_fragment_cache_name('muscle-overview', 2)))
 
 
 class MuscleOverviewTestCase(WorkoutManagerAccessTestCase):
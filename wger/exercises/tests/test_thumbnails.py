@@ -0,0 +1,89 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import json
+
+from django.core.cache import cache
+from django.core.files import File
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import get_thumbnailer
+from six import StringIO
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise, ExerciseImage
+from wger.exercises.thumbnails import delete_thumbnails, get_thumbnails
+from wger.utils.cache import cache_mapper
+
+
+class ThumbnailsTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the pre-generation of the exercise image thumbnails
+    '''
+
+    def save_image(self):
+        image = ExerciseImage()
+        image.exercise = Exercise.objects.get(pk=2)
+        image.status = ExerciseImage.STATUS_ACCEPTED
+        with open('wger/exercises/tests/protestschwein.jpg', 'rb') as image_file:
+            image.image.save('protestschwein.jpg', File(image_file), save=False)
+        image.save()
+        return image
+
+    def assertRendered(self, image):
+        thumbnailer = get_thumbnailer(image.image)
+        for options in aliases.all().values():
+            self.assertTrue(thumbnailer.get_existing_thumbnail(options))
+
+    def test_save(self):
+        '''
+        Test that the thumbnails are rendered when saving an image
+        '''
+        image = self.save_image()
+        self.assertRendered(image)
+
+        thumbnails = cache.get(cache_mapper.get_exercise_image_thumbnails_key(image))
+        self.assertEqual(sorted(thumbnails.keys()), sorted(aliases.all().keys()))
+        self.assertNotEqual(thumbnails['small']['url'], image.image.url)
+        self.assertEqual(get_thumbnails(image), thumbnails)
+
+        response = self.client.get(reverse('exerciseimage-thumbnails', kwargs={'pk': image.pk}))
+        result = json.loads(response.content.decode('utf8'))
+        self.assertEqual(result['micro_cropped']['url'], thumbnails['micro_cropped']['url'])
+        self.assertEqual(result['original'], image.image.url)
+
+    def test_missing(self):
+        '''
+        Test that reading the thumbnails doesn't render the missing ones
+        '''
+        image = self.save_image()
+        delete_thumbnails(image)
+
+        thumbnails = get_thumbnails(image)
+        self.assertEqual(thumbnails['small']['url'], image.image.url)
+        self.assertFalse(get_thumbnailer(image.image).get_existing_thumbnail(
+            aliases.get('small')))
+        self.assertIsNone(cache.get(cache_mapper.get_exercise_image_thumbnails_key(image)))
+
+    def test_command(self):
+        '''
+        Test that the command renders the missing thumbnails
+        '''
+        image = self.save_image()
+        delete_thumbnails(image)
+
+        call_command('generate-exercise-thumbnails', processes=1, stdout=StringIO())
+        self.assertRendered(image)
+        self.assertNotEqual(get_thumbnails(image)['small']['url'], image.image.url)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Pre-generation of the exercise image thumbnails
+
+The thumbnails of all the aliases in THUMBNAIL_ALIASES are rendered when an
+image is saved (or in bulk with the generate-exercise-thumbnails command) and
+their URLs are saved to the cache. Views only read the existing thumbnails and
+never resize images themselves.
+'''
+
+import logging
+import multiprocessing
+
+from django.core.cache import cache
+from django.db import connections
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import get_thumbnailer
+
+from wger.utils.cache import cache_mapper
+
+
+logger = logging.getLogger(__name__)
+
+
+def generate_thumbnails(image):
+    '''
+    Renders the missing thumbnails of an exercise image and saves their URLs
+
+    :return: the thumbnails' URLs and settings, by alias, or None if the
+             image file could not be processed
+    '''
+    thumbnailer = get_thumbnailer(image.image)
+    thumbnails = {}
+    try:
+        for alias, options in aliases.all().items():
+            thumbnails[alias] = {'url': thumbnailer.get_thumbnail(options).url,
+                                 'settings': options}
+    except Exception as e:
+        logger.warning('Could not generate the thumbnails of image %s: %s', image.pk, e)
+        return None
+
+    cache.set(cache_mapper.get_exercise_image_thumbnails_key(image), thumbnails)
+    return thumbnails
+
+
+def get_thumbnails(image):
+    '''
+    Returns the URLs and settings of an exercise image's thumbnails, by alias
+
+    Only already rendered thumbnails are used, the original image's URL takes
+    the place of the ones still missing.
+    '''
+    thumbnails = cache.get(cache_mapper.get_exercise_image_thumbnails_key(image))
+    if thumbnails is not None:
+        return thumbnails
+
+    thumbnailer = get_thumbnailer(image.image)
+    thumbnails = {}
+    complete = True
+    for alias, options in aliases.all().items():
+        thumbnail = thumbnailer.get_thumbnail(options, generate=False)
+        complete = complete and thumbnail is not None
+        thumbnails[alias] = {'url': thumbnail.url if thumbnail else image.image.url,
+                             'settings': options}
+
+    if complete:
+        cache.set(cache_mapper.get_exercise_image_thumbnails_key(image), thumbnails)
+    return thumbnails
+
+
+def delete_thumbnails(image):
+    '''
+    Deletes the thumbnails of an exercise image, along with their URLs
+    '''
+    get_thumbnailer(image.image).delete_thumbnails()
+    cache.delete(cache_mapper.get_exercise_image_thumbnails_key(image))
+
+
+def generate_image_thumbnails(pk):
+    '''
+    Renders the thumbnails of the exercise image with the given ID, used by
+    the processes of generate_all_thumbnails
+
+    :return: a tuple with the ID and the thumbnails or None
+    '''
+    from wger.exercises.models import ExerciseImage
+
+    try:
+        return pk, generate_thumbnails(ExerciseImage.objects.get(pk=pk))
+    except ExerciseImage.DoesNotExist:
+        return pk, None
+
+
+def generate_all_thumbnails(queryset, processes=None):
+    '''
+    Renders the missing thumbnails of several exercise images in a pool of
+    processes
+
+    :param processes: the number of processes, defaults to the number of
+                      CPUs. With one process, the thumbnails are rendered in
+                      the current one.
+    :return: the number of images whose thumbnails could not be generated
+    '''
+    pks = list(queryset.values_list('pk', flat=True))
+    if processes == 1:
+        results = [generate_image_thumbnails(pk) for pk in pks]
+    else:
+        # The processes must not share the database connections
+        connections.close_all()
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(generate_image_thumbnails, pks)
+        finally:
+            pool.close()
+            pool.join()
+
+    # Save the URLs again, in case the processes use a local memory cache
+    failed = 0
+    for pk, thumbnails in results:
+        if thumbnails is None:
+            failed += 1
+        else:
+            cache.set(cache_mapper.get_exercise_image_thumbnails_key(pk), thumbnails)
+    return failed
@@ -25,7 +25,6 @@ from django.forms import (
     ModelChoiceField,
     ModelMultipleChoiceField
 )
-from django.core.cache import cache
 from django.core.urlresolvers import reverse, reverse_lazy
 from django.contrib.auth.mixins import PermissionRequiredMixin, LoginRequiredMixin
 from django.contrib.auth.decorators import permission_required
@@ -42,6 +41,7 @@ from django.views.generic import (
 
 from wger.manager.models import WorkoutLog
 from wger.exercises.models import (
+    EXERCISE_TABLES,
     Exercise,
     Muscle,
     ExerciseCategory
@@ -51,7 +51,7 @@ from wger.utils.generic_views import (
     WgerDeleteMixin
 )
 from wger.utils.language import load_language, load_item_languages
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import cache_mapper, condition_on_tables, local_cache
 from wger.utils.widgets import (
     TranslatedSelect,
     TranslatedSelectMultiple,
@@ -92,9 +92,13 @@ class ExerciseListView(ListView):
         return context
 
 
+@condition_on_tables(EXERCISE_TABLES, anonymous_only=True)
 def view(request, id, slug=None):
     '''
     Detail view for an exercise
+
+    Logged in users also see their logs, so only the pages for anonymous
+    users are answered with 304 Not Modified.
     '''
 
     template_data = {}
@@ -106,7 +110,7 @@ def view(request, id, slug=None):
     template_data['exercise'] = exercise
 
     # Create the backgrounds that show what muscles the exercise works on
-    backgrounds = cache.get(cache_mapper.get_exercise_muscle_bg_key(int(id)))
+    backgrounds = local_cache.get(cache_mapper.EXERCISE_MUSCLE_BG, int(id))
     if not backgrounds:
         backgrounds_back = []
         backgrounds_front = []
@@ -129,8 +133,7 @@ def view(request, id, slug=None):
         backgrounds_back.append('images/muscles/muscular_system_back.svg')
         backgrounds = (backgrounds_front, backgrounds_back)
 
-        cache.set(cache_mapper.get_exercise_muscle_bg_key(int(id)),
-                  (backgrounds_front, backgrounds_back))
+        local_cache.set(cache_mapper.EXERCISE_MUSCLE_BG, int(id), backgrounds)
 
     template_data['muscle_backgrounds_front'] = backgrounds[0]
     template_data['muscle_backgrounds_back'] = backgrounds[1]
@@ -188,6 +188,8 @@ class GymAdminConfig(AbstractGymUserConfigModel, m.Model):
     Reminder of inactive members
     '''
 
+    owner_field = 'user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
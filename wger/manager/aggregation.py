@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Aggregation of the workout logs into the statistic tables
+
+When logs are saved or deleted only the affected days and weeks are
+calculated again and updated in place. The personal records are compared with the new logs and
+only looked up again in the logs when the log holding a record changes.
+rebuild_log_statistics calculates everything for a user at once.
+'''
+
+import datetime
+import decimal
+import operator
+from functools import reduce
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from wger.exercises.models import Exercise
+from wger.manager.models import (
+    WorkoutLog,
+    ExerciseDayStatistics,
+    MuscleWeekStatistics,
+    PersonalRecord
+)
+
+
+REPETITIONS = 1
+'''Only logs with this repetition unit are aggregated'''
+
+KG = 1
+LB = 2
+KG_PER_LB = decimal.Decimal('0.45359237')
+
+TWO_PLACES = decimal.Decimal('0.01')
+
+LOG_FIELDS = ('exercise_id', 'date', 'reps', 'weight', 'weight_unit_id')
+
+
+def get_week(date):
+    '''
+    Returns the monday of the date's week
+    '''
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def get_weight_kg(weight, unit_id):
+    '''
+    Converts a logged weight to kg
+    '''
+    if unit_id == LB:
+        weight = weight * KG_PER_LB
+    return decimal.Decimal(weight).quantize(TWO_PLACES)
+
+
+def estimate_one_rep_max(weight, reps):
+    '''
+    Estimates the one repetition maximum with Epley's formula
+    '''
+    if reps <= 1:
+        return weight
+    return (weight * (1 + decimal.Decimal(reps) / 30)).quantize(TWO_PLACES)
+
+
+def get_log_values(log):
+    '''
+    Returns the values of a log used for the statistics
+
+    :return: a (exercise_id, date, reps, weight, weight_unit_id) tuple, or
+             None if the log is not counted
+    '''
+    if log.repetition_unit_id != REPETITIONS \
+            or log.weight_unit_id not in (KG, LB) \
+            or (log.reps or 0) <= 0:
+        return None
+
+    return (log.exercise_id,
+            WorkoutLog._meta.get_field('date').to_python(log.date),
+            log.reps,
+            WorkoutLog._meta.get_field('weight').to_python(log.weight),
+            log.weight_unit_id)
+
+
+def get_counted_logs(user_id):
+    '''
+    Returns the logs of a user that are used for the statistics
+    '''
+    return WorkoutLog.objects.filter(user_id=user_id,
+                                     repetition_unit_id=REPETITIONS,
+                                     weight_unit_id__in=(KG, LB),
+                                     reps__gt=0)
+
+
+def get_exercise_muscles(exercise_ids=None, muscle_ids=None):
+    '''
+    Returns a dictionary with the primary muscles of exercises
+    '''
+    query = Exercise.muscles.through.objects.all()
+    if exercise_ids is not None:
+        query = query.filter(exercise_id__in=exercise_ids)
+    if muscle_ids is not None:
+        query = query.filter(muscle_id__in=muscle_ids)
+
+    muscles = {}
+    for exercise_id, muscle_id in query.values_list('exercise_id', 'muscle_id'):
+        muscles.setdefault(exercise_id, []).append(muscle_id)
+    return muscles
+
+
+def calculate_day_statistics(user_id, logs):
+    '''
+    Aggregates logs per exercise and day
+
+    :param logs: (exercise_id, date, reps, weight, weight_unit_id) tuples
+    :return: a list of unsaved ExerciseDayStatistics objects
+    '''
+    statistics = {}
+    for exercise_id, date, reps, weight, unit_id in logs:
+        weight = get_weight_kg(weight, unit_id)
+        entry = statistics.get((exercise_id, date))
+        if entry is None:
+            entry = ExerciseDayStatistics(user_id=user_id,
+                                          exercise_id=exercise_id,
+                                          date=date,
+                                          sets=0,
+                                          reps=0,
+                                          volume=decimal.Decimal(0),
+                                          max_weight=weight,
+                                          estimated_1rm=0)
+            statistics[(exercise_id, date)] = entry
+        entry.sets += 1
+        entry.reps += reps
+        entry.volume += reps * weight
+        entry.max_weight = max(entry.max_weight, weight)
+        entry.estimated_1rm = max(entry.estimated_1rm, estimate_one_rep_max(weight, reps))
+    return list(statistics.values())
+
+
+def calculate_week_statistics(user_id, day_statistics, exercise_muscles):
+    '''
+    Aggregates day statistics per muscle and week
+
+    :param exercise_muscles: dictionary as returned by get_exercise_muscles
+    :return: a list of unsaved MuscleWeekStatistics objects
+    '''
+    statistics = {}
+    for day in day_statistics:
+        week = get_week(day.date)
+        for muscle_id in exercise_muscles.get(day.exercise_id, ()):
+            entry = statistics.get((muscle_id, week))
+            if entry is None:
+                entry = MuscleWeekStatistics(user_id=user_id,
+                                             muscle_id=muscle_id,
+                                             week=week,
+                                             sets=0,
+                                             reps=0,
+                                             volume=decimal.Decimal(0))
+                statistics[(muscle_id, week)] = entry
+            entry.sets += day.sets
+            entry.reps += day.reps
+            entry.volume += day.volume
+    return list(statistics.values())
+
+
+def calculate_records(user_id, logs):
+    '''
+    Finds the heaviest weight per exercise and number of repetitions
+
+    :param logs: (exercise_id, date, reps, weight, weight_unit_id) tuples,
+                 ordered by date
+    :return: a list of unsaved PersonalRecord objects
+    '''
+    records = {}
+    for exercise_id, date, reps, weight, unit_id in logs:
+        weight = get_weight_kg(weight, unit_id)
+        record = records.get((exercise_id, reps))
+        if weight > 0 and (record is None or weight > record.weight):
+            records[(exercise_id, reps)] = PersonalRecord(user_id=user_id,
+                                                          exercise_id=exercise_id,
+                                                          reps=reps,
+                                                          weight=weight,
+                                                          date=date)
+    return list(records.values())
+
+
+def get_value_fields(model, key_fields):
+    '''
+    Returns the fields of a statistics model that are calculated
+    '''
+    return [field.attname for field in model._meta.concrete_fields
+            if not field.primary_key and field.attname not in key_fields + ('user_id', )]
+
+
+def create_statistics(model, key_fields, statistics):
+    '''
+    Saves new statistics rows
+
+    If a concurrent request created some of the rows in the meantime, these
+    are updated instead of raising an IntegrityError.
+
+    :param key_fields: the fields identifying a row besides the user
+    :param statistics: unsaved objects
+    '''
+    if not statistics:
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(statistics)
+    except IntegrityError:
+        value_fields = get_value_fields(model, key_fields)
+        for entry in statistics:
+            model.objects.update_or_create(
+                defaults=dict([(name, getattr(entry, name)) for name in value_fields]),
+                user_id=entry.user_id,
+                **dict([(name, getattr(entry, name)) for name in key_fields]))
+
+
+def save_statistics(queryset, key_fields, keys, statistics):
+    '''
+    Saves calculated statistics in place of the old ones
+
+    The old rows of the keys are locked and updated, the ones without data
+    anymore are deleted and new ones are created with create_statistics.
+
+    :param queryset: the user's statistics, containing at least the keys
+    :param key_fields: the fields identifying a row besides the user
+    :param keys: the keys that were calculated again
+    :param statistics: unsaved objects, the ones of other keys are ignored
+    '''
+    model = queryset.model
+    value_fields = get_value_fields(model, key_fields)
+
+    def get_key(entry):
+        return tuple([getattr(entry, name) for name in key_fields])
+
+    old = dict([(get_key(entry), entry) for entry in queryset.select_for_update()
+                if get_key(entry) in keys])
+    new = []
+    for entry in statistics:
+        key = get_key(entry)
+        if key not in keys:
+            continue
+
+        current = old.pop(key, None)
+        if current is None:
+            new.append(entry)
+        elif any([getattr(current, name) != getattr(entry, name) for name in value_fields]):
+            model.objects.filter(pk=current.pk) \
+                         .update(**dict([(name, getattr(entry, name)) for name in value_fields]))
+
+    if old:
+        model.objects.filter(pk__in=[entry.pk for entry in old.values()]).delete()
+    create_statistics(model, key_fields, new)
+
+
+def update_week_statistics(user_id, exercise_ids, weeks):
+    '''
+    Calculates the week statistics of the muscles of some exercises again
+
+    :param weeks: the mondays of the changed weeks
+    '''
+    muscle_ids = set()
+    for muscles in get_exercise_muscles(exercise_ids=exercise_ids).values():
+        muscle_ids.update(muscles)
+    if not muscle_ids or not weeks:
+        return
+
+    exercise_muscles = get_exercise_muscles(muscle_ids=muscle_ids)
+    periods = [Q(date__range=(week, week + datetime.timedelta(days=6))) for week in weeks]
+    days = ExerciseDayStatistics.objects.filter(reduce(operator.or_, periods),
+                                                user_id=user_id,
+                                                exercise_id__in=list(exercise_muscles.keys()))
+    save_statistics(MuscleWeekStatistics.objects.filter(user_id=user_id,
+                                                        muscle_id__in=muscle_ids,
+                                                        week__in=weeks),
+                    ('muscle_id', 'week'),
+                    set([(muscle_id, week) for muscle_id in muscle_ids for week in weeks]),
+                    calculate_week_statistics(user_id, days, exercise_muscles))
+
+
+def update_records(user_id, added=(), removed=()):
+    '''
+    Updates the personal records after workout logs were saved or deleted
+
+    The added logs are compared with the current records. The records are only
+    looked up again in the logs when a removed log had the record's weight.
+
+    :param added: the values of the new logs, as returned by get_log_values
+    :param removed: the old values of the changed or deleted logs
+    '''
+    exercise_ids = set([values[0] for values in added] + [values[0] for values in removed])
+    if not exercise_ids:
+        return
+
+    records = PersonalRecord.objects.select_for_update().filter(user_id=user_id,
+                                                                exercise_id__in=exercise_ids)
+    records = dict([((record.exercise_id, record.reps), record) for record in records])
+
+    # The removed log held the record, the next best one is only in the logs
+    lost = set()
+    for exercise_id, date, reps, weight, unit_id in removed:
+        record = records.get((exercise_id, reps))
+        if record is not None and get_weight_kg(weight, unit_id) >= record.weight:
+            lost.add((exercise_id, reps))
+
+    new = []
+    if lost:
+        PersonalRecord.objects.filter(pk__in=[records.pop(key).pk for key in lost]).delete()
+        logs = get_counted_logs(user_id) \
+            .filter(exercise_id__in=set([key[0] for key in lost]),
+                    reps__in=set([key[1] for key in lost])) \
+            .order_by('date') \
+            .values_list(*LOG_FIELDS)
+        new = [record for record in calculate_records(user_id, logs)
+               if (record.exercise_id, record.reps) in lost]
+
+    for candidate in calculate_records(user_id, sorted(added, key=lambda values: values[1])):
+        key = (candidate.exercise_id, candidate.reps)
+        record = records.get(key)
+        if key in lost:
+            continue
+        elif record is None:
+            new.append(candidate)
+        elif candidate.weight > record.weight \
+                or (candidate.weight == record.weight and candidate.date < record.date):
+            record.weight = candidate.weight
+            record.date = candidate.date
+            record.save()
+
+    create_statistics(PersonalRecord, ('exercise_id', 'reps'), new)
+
+
+def update_log_statistics(user_id, added=(), removed=()):
+    '''
+    Updates the statistics after workout logs were saved or deleted
+
+    Only the days of the logs' exercises and dates are calculated again,
+    followed by the weeks of these dates for the exercises' muscles and their
+    personal records. The rows are updated in place, see save_statistics.
+
+    :param user_id: the user the logs belong to
+    :param added: the values of the new logs, as returned by get_log_values
+    :param removed: the old values of the changed or deleted logs
+    '''
+    keys = set([(values[0], values[1]) for values in added] +
+               [(values[0], values[1]) for values in removed])
+    if not keys:
+        return
+
+    exercise_ids = set([exercise_id for exercise_id, date in keys])
+    dates = set([date for exercise_id, date in keys])
+
+    with transaction.atomic():
+        logs = get_counted_logs(user_id).filter(exercise_id__in=exercise_ids, date__in=dates) \
+                                        .values_list(*LOG_FIELDS)
+        save_statistics(ExerciseDayStatistics.objects.filter(user_id=user_id,
+                                                             exercise_id__in=exercise_ids,
+                                                             date__in=dates),
+                        ('exercise_id', 'date'),
+                        keys,
+                        calculate_day_statistics(user_id, logs))
+
+        update_week_statistics(user_id, exercise_ids, set([get_week(date) for date in dates]))
+        update_records(user_id, added, removed)
+
+
+def rebuild_log_statistics(user_id):
+    '''
+    Calculates all statistics of a user from scratch
+    '''
+    logs = list(get_counted_logs(user_id).order_by('date').values_list(*LOG_FIELDS))
+    days = calculate_day_statistics(user_id, logs)
+    exercise_muscles = get_exercise_muscles(exercise_ids=set([log[0] for log in logs]))
+
+    with transaction.atomic():
+        ExerciseDayStatistics.objects.filter(user_id=user_id).delete()
+        MuscleWeekStatistics.objects.filter(user_id=user_id).delete()
+        PersonalRecord.objects.filter(user_id=user_id).delete()
+
+        ExerciseDayStatistics.objects.bulk_create(days)
+        MuscleWeekStatistics.objects.bulk_create(calculate_week_statistics(user_id,
+                                                                           days,
+                                                                           exercise_muscles))
+        PersonalRecord.objects.bulk_create(calculate_records(user_id, logs))
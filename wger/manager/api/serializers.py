@@ -22,7 +22,7 @@ from wger.core.api.serializers import (
     RepetitionUnitSerializer,
     WeightUnitSerializer
 )
-from wger.exercises.api.serializers import ExerciseSerializer
+from wger.exercises.api.serializers import ExerciseSerializer, MuscleSerializer
 
 from wger.manager.models import (
     Workout,
@@ -32,11 +32,15 @@ from wger.manager.models import (
     Set,
     Schedule,
     WorkoutLog,
-    WorkoutSession
+    WorkoutSession,
+    ExerciseDayStatistics,
+    MuscleWeekStatistics,
+    PersonalRecord
 )
+from wger.utils.serializers import WgerModelSerializer
 
 
-class WorkoutSerializer(serializers.ModelSerializer):
+class WorkoutSerializer(WgerModelSerializer):
     '''
     Workout serializer
     '''
@@ -46,7 +50,7 @@ class WorkoutSerializer(serializers.ModelSerializer):
         exclude = ('user',)
 
 
-class WorkoutSessionSerializer(serializers.ModelSerializer):
+class WorkoutSessionSerializer(WgerModelSerializer):
     '''
     Workout session serializer
     '''
@@ -55,24 +59,58 @@ class WorkoutSessionSerializer(serializers.ModelSerializer):
         exclude = ('user',)
 
 
-class WorkoutLogSerializer(serializers.ModelSerializer):
+class WorkoutLogSerializer(WgerModelSerializer):
     '''
     Workout session serializer
     '''
     class Meta:
         model = WorkoutLog
         exclude = ('user',)
+        expandable_fields = {'exercise': (ExerciseSerializer, {}),
+                             'repetition_unit': (RepetitionUnitSerializer, {}),
+                             'weight_unit': (WeightUnitSerializer, {})}
 
 
-class ScheduleStepSerializer(serializers.ModelSerializer):
+class ExerciseDayStatisticsSerializer(WgerModelSerializer):
+    '''
+    Exercise day statistics serializer
+    '''
+    class Meta:
+        model = ExerciseDayStatistics
+        exclude = ('user',)
+        expandable_fields = {'exercise': (ExerciseSerializer, {})}
+
+
+class MuscleWeekStatisticsSerializer(WgerModelSerializer):
+    '''
+    Muscle week statistics serializer
+    '''
+    class Meta:
+        model = MuscleWeekStatistics
+        exclude = ('user',)
+        expandable_fields = {'muscle': (MuscleSerializer, {})}
+
+
+class PersonalRecordSerializer(WgerModelSerializer):
+    '''
+    Personal record serializer
+    '''
+    class Meta:
+        model = PersonalRecord
+        exclude = ('user',)
+        expandable_fields = {'exercise': (ExerciseSerializer, {})}
+
+
+class ScheduleStepSerializer(WgerModelSerializer):
     '''
     ScheduleStep serializer
     '''
     class Meta:
         model = ScheduleStep
+        expandable_fields = {'workout': (WorkoutSerializer, {})}
 
 
-class ScheduleSerializer(serializers.ModelSerializer):
+class ScheduleSerializer(WgerModelSerializer):
     '''
     Schedule serializer
     '''
@@ -81,30 +119,35 @@ class ScheduleSerializer(serializers.ModelSerializer):
         exclude = ('user',)
 
 
-class DaySerializer(serializers.ModelSerializer):
+class DaySerializer(WgerModelSerializer):
     '''
     Workout day serializer
     '''
 
     class Meta:
         model = Day
+        expandable_fields = {'day': (DaysOfWeekSerializer, {'many': True})}
 
 
-class SetSerializer(serializers.ModelSerializer):
+class SetSerializer(WgerModelSerializer):
     '''
     Workout setting serializer
     '''
 
     class Meta:
         model = Set
+        expandable_fields = {'exercises': (ExerciseSerializer, {'many': True})}
 
 
-class SettingSerializer(serializers.ModelSerializer):
+class SettingSerializer(WgerModelSerializer):
     '''
     Workout setting serializer
     '''
     class Meta:
         model = Setting
+        expandable_fields = {'exercise': (ExerciseSerializer, {}),
+                             'repetition_unit': (RepetitionUnitSerializer, {}),
+                             'weight_unit': (WeightUnitSerializer, {})}
 
 
 #
@@ -17,10 +17,19 @@
 
 import datetime
 
-from rest_framework import viewsets
+import six
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from rest_framework import exceptions, status, viewsets
 from rest_framework.response import Response
-from rest_framework.decorators import detail_route
+from rest_framework.decorators import detail_route, list_route
 
+from wger.core.models import DeletedObject
 from wger.manager.api.serializers import (
     WorkoutSerializer,
     ScheduleStepSerializer,
@@ -30,8 +39,14 @@ from wger.manager.api.serializers import (
     SetSerializer,
     ScheduleSerializer,
     WorkoutLogSerializer,
-    WorkoutSessionSerializer
+    WorkoutSessionSerializer,
+    ExerciseDayStatisticsSerializer,
+    MuscleWeekStatisticsSerializer,
+    PersonalRecordSerializer
 )
+from wger.manager.gym_mode import get_bundle, get_bundle_version
+from wger.manager.ingestion import save_workout_logs
+from wger.manager.structure import save_sets, update_settings
 from wger.manager.models import (
     Workout,
     Set,
@@ -40,11 +55,32 @@ from wger.manager.models import (
     Day,
     Setting,
     WorkoutLog,
-    WorkoutSession
+    WorkoutSession,
+    WorkoutSessionUpload,
+    ExerciseDayStatistics,
+    MuscleWeekStatistics,
+    PersonalRecord
 )
+from wger.utils.helpers import make_sync_cursor, parse_sync_cursor
+from wger.utils.pagination import WgerCursorPagination
+from wger.utils.renderers import get_compact_renderers
 from wger.utils.viewsets import WgerOwnerObjectModelViewSet
 
 
+SYNC_PAGE_SIZE = 5000
+'''Maximum number of logs returned by one sync request'''
+
+SYNC_COLUMNS = ('id',
+                'date',
+                'exercise',
+                'workout',
+                'reps',
+                'repetition_unit',
+                'weight',
+                'weight_unit')
+'''Columns of the workout logs returned by the sync endpoint'''
+
+
 class WorkoutViewSet(viewsets.ModelViewSet):
     '''
     API endpoint for workout objects
@@ -112,6 +148,87 @@ class WorkoutSessionViewSet(WgerOwnerObjectModelViewSet):
         '''
         return [(Workout, 'workout')]
 
+    @list_route(methods=['post'])
+    def upload(self, request):
+        '''
+        Save a finished session together with all its logs
+
+        Used by clients that log the gym mode offline. The session of the day
+        is created or updated and the logs are saved in one transaction, so
+        either everything or nothing is saved. Clients can send an
+        'upload_id', uploads with an ID that was already saved are not saved
+        again.
+        '''
+        upload_id = request.data.get('upload_id')
+        if upload_id is not None:
+            if not isinstance(upload_id, six.string_types) or not 0 < len(upload_id) <= 64:
+                raise exceptions.ValidationError({'upload_id': ['Expected a text of up to 64 '
+                                                                'characters.']})
+            upload = self.get_upload(upload_id)
+            if upload:
+                return upload
+
+        try:
+            date = WorkoutSession._meta.get_field('date').to_python(request.data.get('date'))
+        except ValidationError as e:
+            raise exceptions.ValidationError({'date': e.messages})
+        instance = WorkoutSession.objects.filter(user=request.user, date=date).first()
+        serializer = WorkoutSessionSerializer(instance, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        workout = serializer.validated_data['workout']
+        if workout.user_id != request.user.pk:
+            raise exceptions.PermissionDenied()
+
+        rows = request.data.get('logs', [])
+        if not isinstance(rows, list):
+            raise exceptions.ValidationError({'logs': ['Expected a list of logs.']})
+        logs = [WorkoutLog(date=serializer.validated_data['date'],
+                           workout=workout,
+                           exercise_id=row.get('exercise'),
+                           reps=row.get('reps'),
+                           repetition_unit_id=row.get('repetition_unit', 1),
+                           weight=row.get('weight'),
+                           weight_unit_id=row.get('weight_unit', 1))
+                for row in rows if isinstance(row, dict)]
+        if len(logs) != len(rows):
+            raise exceptions.ValidationError({'logs': ['Expected a list of logs.']})
+
+        try:
+            with transaction.atomic():
+                session = serializer.save(user=request.user)
+                save_workout_logs(request.user, logs)
+                if upload_id is not None:
+                    WorkoutSessionUpload.objects.create(user=request.user,
+                                                        upload_id=upload_id,
+                                                        session=session,
+                                                        logs=len(logs))
+        except ValidationError as e:
+            raise exceptions.ValidationError({'logs': e.message_dict})
+        except IntegrityError:
+            # The same upload was saved at the same time by another request
+            upload = self.get_upload(upload_id) if upload_id is not None else None
+            if not upload:
+                raise
+            return upload
+
+        return Response({'session': WorkoutSessionSerializer(session).data,
+                         'logs': len(logs)},
+                        status=status.HTTP_201_CREATED)
+
+    def get_upload(self, upload_id):
+        '''
+        Returns the response of an already saved upload, or None
+        '''
+        upload = WorkoutSessionUpload.objects.filter(user=self.request.user,
+                                                     upload_id=upload_id) \
+                                             .select_related('session') \
+                                             .first()
+        if upload is None:
+            return None
+        return Response({'session': WorkoutSessionSerializer(upload.session).data,
+                         'logs': upload.logs},
+                        status=status.HTTP_200_OK)
+
 
 class ScheduleStepViewSet(WgerOwnerObjectModelViewSet):
     '''
@@ -187,6 +304,26 @@ class DayViewSet(WgerOwnerObjectModelViewSet):
         '''
         return [(Workout, 'training')]
 
+    @detail_route()
+    def gym_mode(self, request, pk):
+        '''
+        Output everything the gym mode needs to work offline for this day
+
+        The bundle's version is sent as ETag, clients that already have the
+        current version get an empty 304 response.
+        '''
+        day = self.get_object()
+        version = get_bundle_version(day, request.user)
+        etag = '"{0}"'.format(version)
+
+        if etag in [i.strip() for i in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(get_bundle(day, request.user, version))
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
 
 class SetViewSet(WgerOwnerObjectModelViewSet):
     '''
@@ -212,6 +349,37 @@ class SetViewSet(WgerOwnerObjectModelViewSet):
         '''
         return [(Day, 'exerciseday')]
 
+    @list_route(methods=['post'])
+    def bulk(self, request):
+        '''
+        Create several sets together with their exercises and settings
+
+        Expects a list of sets, the settings of each set are passed as a list
+        under 'settings'. Either all sets are saved or none.
+        '''
+        rows = request.data
+        if not isinstance(rows, list) or not all(
+                isinstance(row, dict)
+                and isinstance(row.get('exercises', []), list)
+                and isinstance(row.get('settings', []), list)
+                and all(isinstance(setting, dict) for setting in row.get('settings', []))
+                for row in rows):
+            raise exceptions.ValidationError(['Expected a list of sets.'])
+
+        try:
+            sets = save_sets(request.user, rows)
+        except ValidationError as e:
+            raise exceptions.ValidationError(e.message_dict)
+
+        out = []
+        for set_obj in Set.objects.filter(pk__in=[i.pk for i in sets]) \
+                                  .prefetch_related('exercises', 'setting_set') \
+                                  .order_by('pk'):
+            data = SetSerializer(set_obj).data
+            data['settings'] = SettingSerializer(set_obj.setting_set.all(), many=True).data
+            out.append(data)
+        return Response(out, status=status.HTTP_201_CREATED)
+
 
 class SettingViewSet(WgerOwnerObjectModelViewSet):
     '''
@@ -245,6 +413,24 @@ class SettingViewSet(WgerOwnerObjectModelViewSet):
         '''
         return [(Set, 'set')]
 
+    @list_route(methods=['patch'])
+    def bulk(self, request):
+        '''
+        Update several settings at once
+
+        Expects a list of settings with their ID and the fields to change.
+        Either all settings are saved or none.
+        '''
+        rows = request.data
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise exceptions.ValidationError(['Expected a list of settings.'])
+
+        try:
+            settings = update_settings(request.user, rows)
+        except ValidationError as e:
+            raise exceptions.ValidationError(e.message_dict)
+        return Response(SettingSerializer(settings, many=True).data)
+
 
 class WorkoutLogViewSet(WgerOwnerObjectModelViewSet):
     '''
@@ -252,7 +438,10 @@ class WorkoutLogViewSet(WgerOwnerObjectModelViewSet):
     '''
     serializer_class = WorkoutLogSerializer
     is_private = True
-    ordering_fields = '__all__'
+    pagination_class = WgerCursorPagination
+    ordering = 'id'
+    ordering_fields = ('id',
+                       'updated')
     filter_fields = ('date',
                      'exercise',
                      'reps',
@@ -277,3 +466,102 @@ class WorkoutLogViewSet(WgerOwnerObjectModelViewSet):
         Return objects to check for ownership permission
         '''
         return [(Workout, 'workout')]
+
+    @list_route(renderer_classes=get_compact_renderers())
+    @method_decorator(gzip_page)
+    def sync(self, request):
+        '''
+        Returns the user's logs as one list per column, ordered by the time
+        of their last modification
+
+        Pass the returned cursor as 'since' to only fetch the logs changed
+        afterwards, 'deleted' then lists the IDs of the logs deleted since.
+        If 'more' is true, more logs are available with the new cursor.
+        '''
+        logs = WorkoutLog.objects.filter(user=request.user).order_by('updated', 'id')
+        deleted = []
+        cursor = request.query_params.get('since')
+        if cursor:
+            try:
+                updated, pk = parse_sync_cursor(cursor)
+            except ValueError:
+                raise exceptions.ParseError('Invalid cursor')
+            logs = logs.filter(Q(updated__gt=updated) | Q(updated=updated, id__gt=pk))
+            deleted = DeletedObject.objects.filter(
+                user=request.user,
+                content_type=ContentType.objects.get_for_model(WorkoutLog),
+                deleted__gte=updated).values_list('object_id', flat=True)
+
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', SYNC_PAGE_SIZE)),
+                               SYNC_PAGE_SIZE))
+        except ValueError:
+            limit = SYNC_PAGE_SIZE
+        rows = list(logs.values_list('updated', *SYNC_COLUMNS)[:limit + 1])
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            cursor = make_sync_cursor(rows[-1][0], rows[-1][1])
+
+        columns = list(zip(*rows))[1:] if rows else [()] * len(SYNC_COLUMNS)
+        data = dict(zip(SYNC_COLUMNS, [list(column) for column in columns]))
+        data['date'] = [date.isoformat() for date in data['date']]
+        data['weight'] = [float(weight) for weight in data['weight']]
+
+        return Response({'count': len(rows),
+                         'more': more,
+                         'cursor': cursor,
+                         'logs': data,
+                         'deleted': list(deleted)})
+
+
+class ExerciseDayStatisticsViewSet(viewsets.ReadOnlyModelViewSet):
+    '''
+    API endpoint for the aggregated logs per exercise and day
+    '''
+    serializer_class = ExerciseDayStatisticsSerializer
+    is_private = True
+    ordering_fields = '__all__'
+    filter_fields = ('exercise',
+                     'date')
+
+    def get_queryset(self):
+        '''
+        Only allow access to appropriate objects
+        '''
+        return ExerciseDayStatistics.objects.filter(user=self.request.user)
+
+
+class MuscleWeekStatisticsViewSet(viewsets.ReadOnlyModelViewSet):
+    '''
+    API endpoint for the aggregated logs per muscle and week
+    '''
+    serializer_class = MuscleWeekStatisticsSerializer
+    is_private = True
+    ordering_fields = '__all__'
+    filter_fields = ('muscle',
+                     'week')
+
+    def get_queryset(self):
+        '''
+        Only allow access to appropriate objects
+        '''
+        return MuscleWeekStatistics.objects.filter(user=self.request.user)
+
+
+class PersonalRecordViewSet(viewsets.ReadOnlyModelViewSet):
+    '''
+    API endpoint for the personal records
+    '''
+    serializer_class = PersonalRecordSerializer
+    is_private = True
+    ordering_fields = '__all__'
+    filter_fields = ('exercise',
+                     'reps',
+                     'date')
+
+    def get_queryset(self):
+        '''
+        Only allow access to appropriate objects
+        '''
+        return PersonalRecord.objects.filter(user=self.request.user)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+The steps of a workout day as used by the gym mode
+'''
+
+import hashlib
+import operator
+from functools import reduce
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.utils.encoding import force_bytes
+
+from wger.core.models import DeletedObject, RepetitionUnit, WeightUnit
+from wger.manager.models import WorkoutLog
+from wger.utils.cache import cache_mapper, get_tables_version, local_cache
+
+
+class LastWeightHelper(object):
+    '''
+    Small helper class to retrieve the weight of the last workout log for a
+    certain user, exercise and repetition combination.
+
+    The weights for all exercises and repetitions of a workout day are read
+    with two queries, so that only the last logs are transferred. The helper
+    lives only as long as the request, so new logs are always taken into
+    account.
+    '''
+
+    def __init__(self, user, canonical_day):
+        self.user = user
+        self.exercise_ids = set()
+        self.reps = set()
+        for set_dict in canonical_day['set_list']:
+            for exercise_dict in set_dict['exercise_list']:
+                self.exercise_ids.add(exercise_dict['obj'].pk)
+                self.reps.update(exercise_dict['reps_list'])
+        self.last_weights = None
+
+    def load(self):
+        '''
+        Read the last weight of all exercises and repetitions of the day
+
+        The date of the last log is grouped by exercise and repetitions, then
+        only the logs of these dates are read. Of several logs on the same
+        date, the last one saved is used.
+        '''
+        self.last_weights = {}
+        logs = WorkoutLog.objects.filter(user=self.user,
+                                         exercise_id__in=self.exercise_ids,
+                                         reps__in=self.reps)
+        last_dates = logs.order_by() \
+                         .values('exercise_id', 'reps') \
+                         .annotate(last_date=Max('date'))
+        query = [Q(exercise_id=i['exercise_id'], reps=i['reps'], date=i['last_date'])
+                 for i in last_dates]
+        if not query:
+            return
+
+        logs = logs.filter(reduce(operator.or_, query)) \
+                   .order_by('id') \
+                   .values_list('exercise_id', 'reps', 'weight')
+        for exercise_id, reps, weight in logs:
+            self.last_weights[(exercise_id, reps)] = weight
+
+    def get_last_weight(self, exercise, reps, default_weight):
+        '''
+        Returns the weight of the last log or the default weight
+
+        :param exercise: the exercise
+        :param reps: the number of repetitions
+        :param default_weight: the weight used if there is no log, if this is
+                               None an empty string is returned
+        :return: the weight
+        '''
+        if self.last_weights is None:
+            self.load()
+
+        default_weight = '' if default_weight is None else default_weight
+        return self.last_weights.get((exercise.pk, reps), default_weight)
+
+
+def get_steps(canonical_day, user):
+    '''
+    Returns the steps of a workout day
+
+    Exercise steps are dictionaries with the keys 'exercise', 'reps',
+    'rep_unit', 'weight' and 'weight_unit', pauses have the pause 'time' in
+    seconds. Both have their 'type'.
+    '''
+    steps = []
+    last_log = LastWeightHelper(user, canonical_day)
+    profile = user.userprofile
+
+    for set_dict in canonical_day['set_list']:
+
+        if not set_dict['is_superset']:
+            for exercise_dict in set_dict['exercise_list']:
+                for key, reps in enumerate(exercise_dict['reps_list']):
+                    steps.append({'type': 'exercise',
+                                  'exercise': exercise_dict['obj'],
+                                  'reps': reps,
+                                  'rep_unit': exercise_dict['repetition_units'][key],
+                                  'weight_unit': exercise_dict['weight_units'][key],
+                                  'weight': last_log.get_last_weight(
+                                      exercise_dict['obj'],
+                                      reps,
+                                      exercise_dict['weight_list'][key])})
+                    if profile.timer_active:
+                        steps.append({'type': 'pause',
+                                      'time': profile.timer_pause})
+
+        # Supersets need extra work to group the exercises and reps together
+        else:
+            total_reps = len(set_dict['exercise_list'][0]['reps_list'])
+            for i in range(0, total_reps):
+                for exercise_dict in set_dict['exercise_list']:
+                    reps = exercise_dict['reps_list'][i]
+                    steps.append({'type': 'exercise',
+                                  'exercise': exercise_dict['obj'],
+                                  'reps': reps,
+                                  'rep_unit': exercise_dict['repetition_units'][i],
+                                  'weight_unit': exercise_dict['weight_units'][i],
+                                  'weight': last_log.get_last_weight(
+                                      exercise_dict['obj'],
+                                      reps,
+                                      exercise_dict['weight_list'][i])})
+
+                if profile.timer_active:
+                    steps.append({'type': 'pause',
+                                  'time': 90})
+
+    # Remove the last pause step as it is not needed. If the list is empty,
+    # because the user didn't add any repetitions to any exercise, do nothing
+    try:
+        steps.pop()
+    except IndexError:
+        pass
+
+    return steps
+
+
+def get_bundle_version(day, user):
+    '''
+    Returns a version for the gym mode bundle of a day
+
+    It changes when the workout, the user's timer settings, the repetition or
+    weight units or any of the user's logs change, or when one of the logs is
+    deleted.
+    '''
+    last_log = WorkoutLog.objects.filter(user=user).aggregate(updated=Max('updated'))['updated']
+    last_deleted = DeletedObject.objects \
+        .filter(user=user, content_type=ContentType.objects.get_for_model(WorkoutLog)) \
+        .aggregate(deleted=Max('deleted'))['deleted']
+    key = u':'.join([day.training.canonical_representation['version'],
+                     str(day.pk),
+                     str(user.userprofile.timer_active),
+                     str(user.userprofile.timer_pause),
+                     repr(get_tables_version((RepetitionUnit, WeightUnit))),
+                     last_log.isoformat() if last_log else '',
+                     last_deleted.isoformat() if last_deleted else ''])
+    return hashlib.md5(force_bytes(key)).hexdigest()
+
+
+def get_bundle(day, user, version=None):
+    '''
+    Returns everything the gym mode needs for a workout day
+
+    The bundle only contains simple types, so it can be cached and sent to
+    clients as it is. Weights are strings, as in the rest of the API.
+
+    :param version: the bundle's version, if already known
+    '''
+    if version is None:
+        version = get_bundle_version(day, user)
+    key = cache_mapper.get_gym_mode_key(day.pk, version)
+    bundle = cache.get(key)
+    if bundle is None:
+        steps = []
+        exercises = {}
+        for step in get_steps(day.canonical_representation, user):
+            if step['type'] == 'exercise':
+                exercise = step['exercise']
+                exercises[str(exercise.pk)] = exercise.name
+                steps.append({'type': 'exercise',
+                              'exercise': exercise.pk,
+                              'reps': step['reps'],
+                              'repetition_unit': step['rep_unit'].pk,
+                              'weight': str(step['weight']) if step['weight'] != '' else None,
+                              'weight_unit': step['weight_unit'].pk})
+            else:
+                steps.append(step)
+
+        repetition_units = local_cache.get_or_set(cache_mapper.REPETITION_UNITS,
+                                                  'all',
+                                                  lambda: list(RepetitionUnit.objects.all()))
+        weight_units = local_cache.get_or_set(cache_mapper.WEIGHT_UNITS,
+                                              'all',
+                                              lambda: list(WeightUnit.objects.all()))
+        bundle = {'version': version,
+                  'day': day.pk,
+                  'workout': day.training_id,
+                  'steps': steps,
+                  'exercises': exercises,
+                  'repetition_units': [{'id': unit.pk, 'name': unit.name}
+                                       for unit in repetition_units],
+                  'weight_units': [{'id': unit.pk, 'name': unit.name}
+                                   for unit in weight_units]}
+        cache.set(key, bundle)
+    return bundle
@@ -36,7 +36,35 @@ from wger.utils.helpers import normalize_decimal
 from wger.utils.pdf import styleSheet
 
 
-def render_workout_day(day, nr_of_weeks=7, images=False, comments=False, only_table=False):
+def get_main_images(day_list):
+    '''
+    Returns the paths of the main images of all exercises in the given days
+
+    :param day_list: the days of a workout's canonical representation
+    :return: a dictionary with the exercise ID as key and the image path as value
+    '''
+    # Local import to avoid circular imports
+    from wger.exercises.models import ExerciseImage
+
+    exercise_ids = set()
+    for day in day_list:
+        for set_obj in day['set_list']:
+            for exercise in set_obj['exercise_list']:
+                exercise_ids.add(exercise['obj'].id)
+
+    images = {}
+    for image in ExerciseImage.objects.accepted().filter(exercise_id__in=exercise_ids,
+                                                         is_main=True):
+        images[image.exercise_id] = image.image.path
+    return images
+
+
+def render_workout_day(day,
+                       nr_of_weeks=7,
+                       images=False,
+                       comments=False,
+                       only_table=False,
+                       main_images=None):
     '''
     Render a table with reportlab with the contents of the training day
 
@@ -48,7 +76,11 @@ def render_workout_day(day, nr_of_weeks=7, images=False, comments=False, only_ta
            be rendered as well
     :param only_table: boolean indicating whether to draw a table with space
            for weight logs or just a list of the exercises
+    :param main_images: the exercises' main images, as returned by get_main_images.
+           If not given, they are loaded here when needed
     '''
+    if images and main_images is None:
+        main_images = get_main_images([day])
 
     # If rendering only the table, reset the nr of weeks, since these columns
     # will not be rendered anyway.
@@ -110,7 +142,7 @@ def render_workout_day(day, nr_of_weeks=7, images=False, comments=False, only_ta
             # Add the exercise's main image
             image = Paragraph('', styleSheet["Small"])
             if images:
-                if exercise['obj'].main_image:
+                if exercise['obj'].id in main_images:
 
                     # Make the images somewhat larger when printing only the workout and not
                     # also the columns for weight logs
@@ -119,7 +151,7 @@ def render_workout_day(day, nr_of_weeks=7, images=False, comments=False, only_ta
                     else:
                         image_size = 1.5
 
-                    image = Image(exercise['obj'].main_image.image)
+                    image = Image(main_images[exercise['obj'].id])
                     image.drawHeight = image_size * cm * image.drawHeight / image.drawWidth
                     image.drawWidth = image_size * cm
 
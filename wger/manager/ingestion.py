@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Saving of many workout logs at once
+
+WorkoutLog.save resets the log caches and sends the signal that updates the
+user's last activity for every single row. The functions here validate all
+rows first and save them with bulk_create, the caches are then reset once per
+date and the last activity and the statistics are updated once per batch.
+'''
+
+import logging
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from wger.core.models import RepetitionUnit, WeightUnit
+from wger.exercises.models import Exercise
+from wger.gym.helpers import get_user_last_activity
+from wger.manager.aggregation import get_log_values, update_log_statistics
+from wger.manager.models import Workout, WorkoutLog
+from wger.utils.cache import cache_mapper, local_cache, reset_workout_logs
+from wger.utils.helpers import validate_instances
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+'''Number of logs inserted per query'''
+
+
+def get_repetition_unit_ids(ids):
+    '''
+    Returns the IDs of the existing repetition units
+    '''
+    return [unit.pk for unit in local_cache.get_or_set(cache_mapper.REPETITION_UNITS,
+                                                       'all',
+                                                       lambda: list(RepetitionUnit.objects.all()))]
+
+
+def get_weight_unit_ids(ids):
+    '''
+    Returns the IDs of the existing weight units
+    '''
+    return [unit.pk for unit in local_cache.get_or_set(cache_mapper.WEIGHT_UNITS,
+                                                       'all',
+                                                       lambda: list(WeightUnit.objects.all()))]
+
+
+def validate_workout_logs(user, logs):
+    '''
+    Validates workout logs without saving them
+
+    The foreign keys are checked with one query per model for all logs, the
+    workouts must belong to the user.
+
+    :param user: the user the logs belong to
+    :param logs: a list of unsaved WorkoutLog objects
+    :return: a dictionary with the position of the invalid logs in the list as
+             key and the validation errors (as a dictionary) as value
+    '''
+    return validate_instances(logs, {
+        'exercise': lambda ids: Exercise.objects.filter(pk__in=ids)
+                                                .values_list('pk', flat=True),
+        'workout': lambda ids: Workout.objects.filter(user=user, pk__in=ids)
+                                              .values_list('pk', flat=True),
+        'repetition_unit': get_repetition_unit_ids,
+        'weight_unit': get_weight_unit_ids,
+    }, exclude=('user',))
+
+
+def save_workout_logs(user, logs, validate=True):
+    '''
+    Validates and saves many workout logs of a user at once
+
+    :param user: the user the logs belong to
+    :param logs: a list of unsaved WorkoutLog objects, e.g. from a formset or
+                 created with WorkoutLog(exercise_id=1, workout_id=2, ...)
+    :param validate: set to False if the logs were already validated, e.g. by
+                     a form or a serializer
+    :raise ValidationError: if any of the logs is invalid, nothing is saved.
+                            The error's dictionary uses the position of the
+                            invalid logs in the list as key, the values are
+                            the messages prefixed with the field name. Use
+                            validate_workout_logs for the individual fields.
+    :return: the list of saved logs. They are saved with bulk_create, so
+             except on PostgreSQL their primary key is not set, look them up
+             again if the IDs are needed.
+    '''
+    now = timezone.now()
+    for log in logs:
+        log.user = user
+        log.updated = now
+        log.apply_repetition_unit()
+
+    if validate:
+        errors = validate_workout_logs(user, logs)
+        if errors:
+            raise ValidationError(dict([(i, [u'{0}: {1}'.format(field, message)
+                                             for field in errors[i]
+                                             for message in errors[i][field]])
+                                        for i in errors]))
+
+    if not logs:
+        return logs
+
+    with transaction.atomic():
+        WorkoutLog.objects.bulk_create(logs, batch_size=BATCH_SIZE)
+
+    # Reset the caches once for the whole batch
+    reset_workout_logs(user.pk, set([log.date for log in logs]))
+    user.usercache.last_activity = get_user_last_activity(user)
+    user.usercache.save()
+    update_log_statistics(user.pk,
+                          added=[values for values in [get_log_values(log) for log in logs]
+                                 if values])
+
+    logger.debug('Saved %s workout logs for user %s', len(logs), user.pk)
+    return logs
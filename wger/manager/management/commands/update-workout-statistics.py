@@ -0,0 +1,50 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from django.core.management.base import BaseCommand
+
+from wger.manager.aggregation import rebuild_log_statistics
+from wger.manager.models import WorkoutLog
+
+
+class Command(BaseCommand):
+    '''
+    Rebuilds the workout statistic tables
+    '''
+
+    help = 'Calculate the training volume and personal records of all users ' \
+           'from their workout logs again.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user',
+                            action='append',
+                            dest='users',
+                            type=int,
+                            help='Only rebuild the statistics of the user with this ID, '
+                                 'can be used more than once')
+
+    def handle(self, **options):
+        '''
+        Process the options
+        '''
+        users = options['users']
+        if not users:
+            users = WorkoutLog.objects.order_by().values_list('user_id', flat=True).distinct()
+
+        for user_id in users:
+            if int(options['verbosity']) >= 2:
+                self.stdout.write('* Processing user {0}'.format(user_id))
+            rebuild_log_statistics(user_id)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0003_auto_20160921_2000'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('manager', '0007_auto_20160311_2258'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExerciseDayStatistics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(editable=False, verbose_name='Date')),
+                ('sets', models.PositiveIntegerField(editable=False, verbose_name='Sets')),
+                ('reps', models.PositiveIntegerField(editable=False, verbose_name='Repetitions')),
+                ('volume', models.DecimalField(decimal_places=2, editable=False, max_digits=12, verbose_name='Volume')),
+                ('max_weight', models.DecimalField(decimal_places=2, editable=False, max_digits=7, verbose_name='Max. weight')),
+                ('estimated_1rm', models.DecimalField(decimal_places=2, editable=False, max_digits=7, verbose_name='Estimated 1RM')),
+                ('exercise', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='exercises.Exercise', verbose_name='Exercise')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MuscleWeekStatistics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField(editable=False, verbose_name='Week')),
+                ('sets', models.PositiveIntegerField(editable=False, verbose_name='Sets')),
+                ('reps', models.PositiveIntegerField(editable=False, verbose_name='Repetitions')),
+                ('volume', models.DecimalField(decimal_places=2, editable=False, max_digits=12, verbose_name='Volume')),
+                ('muscle', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='exercises.Muscle', verbose_name='Muscle')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'ordering': ['week'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PersonalRecord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reps', models.PositiveIntegerField(editable=False, verbose_name='Repetitions')),
+                ('weight', models.DecimalField(decimal_places=2, editable=False, max_digits=7, verbose_name='Weight')),
+                ('date', models.DateField(editable=False, verbose_name='Date')),
+                ('exercise', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='exercises.Exercise', verbose_name='Exercise')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'ordering': ['exercise', 'reps'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='personalrecord',
+            unique_together=set([('user', 'exercise', 'reps')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='muscleweekstatistics',
+            unique_together=set([('user', 'muscle', 'week')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='exercisedaystatistics',
+            unique_together=set([('user', 'exercise', 'date')]),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0008_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workoutlog',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Last update', editable=False),
+        ),
+        migrations.AlterIndexTogether(
+            name='workoutlog',
+            index_together=set([('user', 'updated')]),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0009_workoutlog_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='day',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='schedulestep',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='set',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='setting',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='workout',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='workoutsession',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('manager', '0010_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutSessionUpload',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upload_id', models.CharField(editable=False, max_length=64, verbose_name='Upload ID')),
+                ('logs', models.PositiveIntegerField(editable=False, verbose_name='Logs')),
+                ('session', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='manager.WorkoutSession', verbose_name='Workout Session')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='workoutsessionupload',
+            unique_together=set([('user', 'upload_id')]),
+        ),
+    ]
@@ -29,17 +29,20 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.core.exceptions import ValidationError
 from django.core.cache import cache
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from sortedm2m.fields import SortedManyToManyField
 
 from wger.core.models import DaysOfWeek, RepetitionUnit, WeightUnit
-from wger.exercises.models import Exercise
+from wger.exercises.models import Exercise, Muscle
 from wger.manager.helpers import reps_smart_text
 from wger.utils.cache import (
     cache_mapper,
+    get_workout_version,
     reset_workout_canonical_form,
     reset_workout_log
 )
 from wger.utils.fields import Html5DateField
+from wger.utils.models import AbstractChangeTrackingModel
 
 
 logger = logging.getLogger(__name__)
@@ -49,7 +52,7 @@ logger = logging.getLogger(__name__)
 # Classes
 #
 @python_2_unicode_compatible
-class Workout(models.Model):
+class Workout(AbstractChangeTrackingModel, models.Model):
     '''
     Model for a training schedule
     '''
@@ -97,6 +100,8 @@ class Workout(models.Model):
         reset_workout_canonical_form(self.id)
         super(Workout, self).delete(*args, **kwargs)
 
+    owner_field = 'user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -111,9 +116,13 @@ class Workout(models.Model):
         This form makes it easier to cache and use everywhere where all or part
         of a workout structure is needed. As an additional benefit, the template
         caches are not needed anymore.
+
+        The 'version' only changes when the workout is changed and can be used
+        to key derived caches, e.g. the rendered PDFs.
         '''
         workout_canonical_form = cache.get(cache_mapper.get_workout_canonical(self.pk))
         if not workout_canonical_form:
+            version = get_workout_version(self.pk)
             day_canonical_repr = []
             muscles_front = []
             muscles_back = []
@@ -148,7 +157,8 @@ class Workout(models.Model):
                                                   'back': muscles_back,
                                                   'frontsecondary': muscles_front_secondary,
                                                   'backsecondary': muscles_back_secondary},
-                                      'day_list': day_canonical_repr}
+                                      'day_list': day_canonical_repr,
+                                      'version': version}
             # Save to cache
             cache.set(cache_mapper.get_workout_canonical(self.pk), workout_canonical_form)
 
@@ -197,7 +207,7 @@ class ScheduleManager(models.Manager):
 
 
 @python_2_unicode_compatible
-class Schedule(models.Model):
+class Schedule(AbstractChangeTrackingModel, models.Model):
     '''
     Model for a workout schedule.
 
@@ -250,6 +260,8 @@ class Schedule(models.Model):
     def get_absolute_url(self):
         return reverse('manager:schedule:view', kwargs={'pk': self.id})
 
+    owner_field = 'user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -261,7 +273,8 @@ class Schedule(models.Model):
         Only one schedule can be marked as active at a time
         '''
         if self.is_active:
-            Schedule.objects.filter(user=self.user).update(is_active=False)
+            Schedule.objects.filter(user=self.user, is_active=True).update(is_active=False,
+                                                                           updated=timezone.now())
             self.is_active = True
 
         super(Schedule, self).save(*args, **kwargs)
@@ -302,7 +315,7 @@ class Schedule(models.Model):
 
 
 @python_2_unicode_compatible
-class ScheduleStep(models.Model):
+class ScheduleStep(AbstractChangeTrackingModel, models.Model):
     '''
     Model for a step in a workout schedule.
 
@@ -332,6 +345,8 @@ class ScheduleStep(models.Model):
     order = models.IntegerField(verbose_name=_('Order'),
                                 default=1)
 
+    owner_field = 'workout__user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -366,7 +381,7 @@ class ScheduleStep(models.Model):
 
 
 @python_2_unicode_compatible
-class Day(models.Model):
+class Day(AbstractChangeTrackingModel, models.Model):
     '''
     Model for a training day
     '''
@@ -387,6 +402,8 @@ class Day(models.Model):
         '''
         return self.description
 
+    owner_field = 'training__user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -542,7 +559,7 @@ class Day(models.Model):
 
 
 @python_2_unicode_compatible
-class Set(models.Model):
+class Set(AbstractChangeTrackingModel, models.Model):
     '''
     Model for a set of exercises
     '''
@@ -570,6 +587,8 @@ class Set(models.Model):
         '''
         return u"Set-ID {0}".format(self.id)
 
+    owner_field = 'exerciseday__training__user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -594,7 +613,7 @@ class Set(models.Model):
 
 
 @python_2_unicode_compatible
-class Setting(models.Model):
+class Setting(AbstractChangeTrackingModel, models.Model):
     '''
     Settings for an exercise (weight, reps, etc.)
     '''
@@ -669,6 +688,8 @@ class Setting(models.Model):
         reset_workout_canonical_form(self.set.exerciseday.training_id)
         super(Setting, self).delete(*args, **kwargs)
 
+    owner_field = 'set__exerciseday__training__user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -677,7 +698,7 @@ class Setting(models.Model):
 
 
 @python_2_unicode_compatible
-class WorkoutLog(models.Model):
+class WorkoutLog(AbstractChangeTrackingModel, models.Model):
     '''
     A log entry for an exercise
     '''
@@ -723,6 +744,7 @@ class WorkoutLog(models.Model):
     # Metaclass to set some other properties
     class Meta:
         ordering = ["date", "reps"]
+        index_together = ("user", "updated")
 
     def __str__(self):
         '''
@@ -732,6 +754,18 @@ class WorkoutLog(models.Model):
                                                         self.weight,
                                                         self.date)
 
+    owner_field = 'user'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        '''
+        Remember the loaded values, the statistics of the old exercise, date
+        and weight need to be updated when the log is changed
+        '''
+        instance = super(WorkoutLog, cls).from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -752,16 +786,21 @@ class WorkoutLog(models.Model):
         except WorkoutSession.DoesNotExist:
             return None
 
+    def apply_repetition_unit(self):
+        '''
+        If the user selected "Until Failure", do only 1 "repetition",
+        everything else doesn't make sense.
+        '''
+        if self.repetition_unit_id == 2:
+            self.reps = 1
+
     def save(self, *args, **kwargs):
         '''
         Reset cache
         '''
         reset_workout_log(self.user_id, self.date.year, self.date.month, self.date.day)
 
-        # If the user selected "Until Failure", do only 1 "repetition",
-        # everythin else doesn't make sense.
-        if self.repetition_unit == 2:
-            self.reps = 1
+        self.apply_repetition_unit()
         super(WorkoutLog, self).save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
@@ -773,7 +812,7 @@ class WorkoutLog(models.Model):
 
 
 @python_2_unicode_compatible
-class WorkoutSession(models.Model):
+class WorkoutSession(AbstractChangeTrackingModel, models.Model):
     '''
     Model for a workout session
     '''
@@ -865,6 +904,8 @@ class WorkoutSession(models.Model):
         if self.time_end and self.time_start and self.time_start > self.time_end:
             raise ValidationError(_("The start time cannot be after the end time."))
 
+    owner_field = 'user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -884,3 +925,221 @@ class WorkoutSession(models.Model):
         '''
         reset_workout_log(self.user_id, self.date.year, self.date.month)
         super(WorkoutSession, self).delete(*args, **kwargs)
+
+
+@python_2_unicode_compatible
+class ExerciseDayStatistics(models.Model):
+    '''
+    Aggregated workout logs of an exercise on one day
+
+    Only logs with repetitions as unit and kg or lb as weight unit are
+    counted, all weights are converted to kg. The entries are kept up to
+    date by the functions in wger.manager.aggregation.
+    '''
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+    exercise = models.ForeignKey(Exercise,
+                                 verbose_name=_('Exercise'),
+                                 editable=False)
+    date = models.DateField(verbose_name=_('Date'),
+                            editable=False)
+
+    sets = models.PositiveIntegerField(verbose_name=_('Sets'),
+                                       editable=False)
+    '''
+    Number of logged sets
+    '''
+
+    reps = models.PositiveIntegerField(verbose_name=_('Repetitions'),
+                                       editable=False)
+    '''
+    Total number of repetitions
+    '''
+
+    volume = models.DecimalField(verbose_name=_('Volume'),
+                                 decimal_places=2,
+                                 max_digits=12,
+                                 editable=False)
+    '''
+    Sum of repetitions times weight of all sets
+    '''
+
+    max_weight = models.DecimalField(verbose_name=_('Max. weight'),
+                                     decimal_places=2,
+                                     max_digits=7,
+                                     editable=False)
+
+    estimated_1rm = models.DecimalField(verbose_name=_('Estimated 1RM'),
+                                        decimal_places=2,
+                                        max_digits=7,
+                                        editable=False)
+    '''
+    Best one repetition maximum of the day, estimated with Epley's formula
+    '''
+
+    class Meta:
+        '''
+        Set other properties
+        '''
+        ordering = ["date", ]
+        unique_together = ("user", "exercise", "date")
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"{0} - {1}: {2}".format(self.date, self.exercise_id, self.volume)
+
+    owner_field = 'user'
+
+    def get_owner_object(self):
+        '''
+        Returns the object that has owner information
+        '''
+        return self
+
+
+@python_2_unicode_compatible
+class MuscleWeekStatistics(models.Model):
+    '''
+    Aggregated workout logs of all exercises of a muscle in one week
+
+    The exercises are assigned to their primary muscles.
+    '''
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+    muscle = models.ForeignKey(Muscle,
+                               verbose_name=_('Muscle'),
+                               editable=False)
+    week = models.DateField(verbose_name=_('Week'),
+                            editable=False)
+    '''
+    The monday the week starts with
+    '''
+
+    sets = models.PositiveIntegerField(verbose_name=_('Sets'),
+                                       editable=False)
+    reps = models.PositiveIntegerField(verbose_name=_('Repetitions'),
+                                       editable=False)
+    volume = models.DecimalField(verbose_name=_('Volume'),
+                                 decimal_places=2,
+                                 max_digits=12,
+                                 editable=False)
+
+    class Meta:
+        '''
+        Set other properties
+        '''
+        ordering = ["week", ]
+        unique_together = ("user", "muscle", "week")
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"{0} - {1}: {2}".format(self.week, self.muscle_id, self.volume)
+
+    owner_field = 'user'
+
+    def get_owner_object(self):
+        '''
+        Returns the object that has owner information
+        '''
+        return self
+
+
+@python_2_unicode_compatible
+class PersonalRecord(models.Model):
+    '''
+    The heaviest weight (in kg) ever logged for an exercise and a number of
+    repetitions
+    '''
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+    exercise = models.ForeignKey(Exercise,
+                                 verbose_name=_('Exercise'),
+                                 editable=False)
+    reps = models.PositiveIntegerField(verbose_name=_('Repetitions'),
+                                       editable=False)
+    weight = models.DecimalField(verbose_name=_('Weight'),
+                                 decimal_places=2,
+                                 max_digits=7,
+                                 editable=False)
+    date = models.DateField(verbose_name=_('Date'),
+                            editable=False)
+    '''
+    The first day the weight was reached
+    '''
+
+    class Meta:
+        '''
+        Set other properties
+        '''
+        ordering = ["exercise", "reps"]
+        unique_together = ("user", "exercise", "reps")
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"{0} x {1} kg on {2}".format(self.reps, self.weight, self.date)
+
+    owner_field = 'user'
+
+    def get_owner_object(self):
+        '''
+        Returns the object that has owner information
+        '''
+        return self
+
+
+@python_2_unicode_compatible
+class WorkoutSessionUpload(models.Model):
+    '''
+    A session uploaded together with its logs, see the session's upload API
+    endpoint
+
+    Clients send an ID of their own with each upload, so uploads that are sent
+    again, e.g. because the response was lost, are only saved once.
+    '''
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+    upload_id = models.CharField(verbose_name=_('Upload ID'),
+                                 max_length=64,
+                                 editable=False)
+    session = models.ForeignKey(WorkoutSession,
+                                verbose_name=_('Workout Session'),
+                                editable=False)
+    logs = models.PositiveIntegerField(verbose_name=_('Logs'),
+                                       editable=False)
+    '''
+    The number of saved logs
+    '''
+
+    class Meta:
+        '''
+        Set other properties
+        '''
+        unique_together = ("user", "upload_id")
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"Upload {0}".format(self.upload_id)
+
+    owner_field = 'user'
+
+    def get_owner_object(self):
+        '''
+        Returns the object that has owner information
+        '''
+        return self
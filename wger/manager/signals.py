@@ -15,13 +15,19 @@
 # You should have received a copy of the GNU Affero General Public License
 
 
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 
 from wger.gym.helpers import get_user_last_activity
+from wger.manager.aggregation import get_log_values, update_log_statistics
 from wger.manager.models import WorkoutLog, WorkoutSession
 from wger.core.models import UserCache
 
 
+STATISTICS_FIELDS = ('exercise_id', 'date', 'reps', 'weight', 'weight_unit_id',
+                     'repetition_unit_id')
+'''Fields of the logs used for the statistics'''
+
+
 def update_activity_cache(sender, instance, **kwargs):
     '''
     Update the user's cached last activity date
@@ -32,8 +38,60 @@ def update_activity_cache(sender, instance, **kwargs):
     user.usercache.save()
 
 
+def get_loaded_statistics_values(instance):
+    '''
+    Returns the statistics values of a log as it was loaded from the database
+
+    :raise KeyError: if the fields were not loaded, e.g. for new logs
+    '''
+    loaded = getattr(instance, '_loaded_values', {})
+    return get_log_values(WorkoutLog(**dict([(field, loaded[field])
+                                             for field in STATISTICS_FIELDS])))
+
+
+def remember_log_statistics_values(sender, instance, **kwargs):
+    '''
+    Remember the old values of an edited log, the statistics for them need to
+    be updated as well
+    '''
+    try:
+        instance._old_statistics_values = get_loaded_statistics_values(instance)
+    except KeyError:
+        old = WorkoutLog.objects.filter(pk=instance.pk).first() if instance.pk else None
+        instance._old_statistics_values = get_log_values(old) if old else None
+
+
+def update_statistics(sender, instance, **kwargs):
+    '''
+    Update the aggregated statistics after a log was saved
+    '''
+    old = instance._old_statistics_values
+    new = get_log_values(instance)
+    instance._loaded_values = dict([(field, getattr(instance, field))
+                                    for field in STATISTICS_FIELDS])
+    if old != new:
+        update_log_statistics(instance.user_id,
+                              added=[new] if new else [],
+                              removed=[old] if old else [])
+
+
+def update_statistics_on_delete(sender, instance, **kwargs):
+    '''
+    Update the aggregated statistics after a log was deleted
+    '''
+    try:
+        old = get_loaded_statistics_values(instance)
+    except KeyError:
+        old = get_log_values(instance)
+    if old:
+        update_log_statistics(instance.user_id, removed=[old])
+
+
 post_save.connect(update_activity_cache, sender=WorkoutSession)
 post_save.connect(update_activity_cache, sender=WorkoutLog)
+pre_save.connect(remember_log_statistics_values, sender=WorkoutLog)
+post_save.connect(update_statistics, sender=WorkoutLog)
+post_delete.connect(update_statistics_on_delete, sender=WorkoutLog)
 
 # TODO: this seems to cause problems when users are deleted
 #       perhaps because of the cascading, needs to be checked
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Saving of many sets and settings of a workout at once
+
+Saving sets and settings one by one checks the ownership and resets the cached
+canonical form of the workout for every single object. The functions here
+validate all rows first, check the ownership with one query, save them with
+as few queries as possible and reset the canonical form once per workout.
+'''
+
+import logging
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+from django.utils.translation import ugettext as _
+
+from wger.exercises.models import Exercise
+from wger.manager.ingestion import get_repetition_unit_ids, get_weight_unit_ids
+from wger.manager.models import Day, Set, Setting
+from wger.utils.cache import reset_workout_canonical_forms
+from wger.utils.helpers import validate_instances
+
+
+logger = logging.getLogger(__name__)
+
+UPDATE_BATCH_SIZE = 50
+'''Number of settings changed per query, each one adds two parameters per field'''
+
+SETTING_FIELDS = ('exercise',
+                  'repetition_unit',
+                  'reps',
+                  'weight',
+                  'weight_unit',
+                  'order',
+                  'comment')
+'''Fields of the settings that can be saved in bulk'''
+
+
+def get_messages(errors, prefix=''):
+    '''
+    Flattens the errors of validate_instances to a list of messages prefixed
+    with the field name
+    '''
+    return [u'{0}{1}: {2}'.format(prefix, field, message)
+            for field in errors
+            for message in errors[field]]
+
+
+def get_setting(data, setting=None):
+    '''
+    Returns a setting with the values of a dictionary, e.g. from a request
+
+    :param setting: the setting to update, only the fields present in the
+                    dictionary are changed
+    '''
+    if setting is None:
+        setting = Setting()
+    for name in SETTING_FIELDS:
+        if name in data:
+            field = Setting._meta.get_field(name)
+            setattr(setting, field.attname, data[name])
+    return setting
+
+
+def get_setting_validators():
+    '''
+    Returns the functions validating the foreign keys of settings, except the set
+    '''
+    return {'exercise': lambda ids: Exercise.objects.filter(pk__in=ids)
+                                                    .values_list('pk', flat=True),
+            'repetition_unit': get_repetition_unit_ids,
+            'weight_unit': get_weight_unit_ids}
+
+
+def save_sets(user, rows):
+    '''
+    Creates sets together with their exercises and settings
+
+    The sets are inserted one by one, since their primary keys are needed for
+    the exercises and settings, these are then inserted with one query each.
+    The canonical forms of the workouts are only reset at the end.
+
+    :param user: the user the workout days belong to
+    :param rows: a list of dictionaries with the fields of the sets, a list
+                 of exercise IDs under 'exercises' and a list of dictionaries
+                 with the fields of the settings under 'settings'
+    :raise ValidationError: if any of the sets is invalid, nothing is saved.
+                            The error's dictionary uses the position of the
+                            invalid sets in the list as key, the values are the
+                            messages prefixed with the field name.
+    :return: the list of saved sets
+    '''
+    days = {}
+
+    def get_day_ids(ids):
+        days.update(Day.objects.filter(training__user=user).in_bulk(ids))
+        return days.keys()
+
+    now = timezone.now()
+    sets = []
+    settings = []
+    positions = []  # positions of the settings' sets in the list and in their set
+    for i, row in enumerate(rows):
+        sets.append(Set(exerciseday_id=row.get('exerciseday'),
+                        sets=row.get('sets', Set.DEFAULT_SETS),
+                        order=row.get('order'),
+                        updated=now))
+        for j, data in enumerate(row.get('settings', [])):
+            setting = get_setting(dict({'order': j + 1}, **data))
+            setting.updated = now
+            settings.append(setting)
+            positions.append((i, j))
+
+    errors = dict([(i, get_messages(set_errors)) for i, set_errors in
+                   validate_instances(sets, {'exerciseday': get_day_ids}).items()])
+    setting_errors = validate_instances(settings, get_setting_validators(), exclude=('set',))
+    for i, setting_error in setting_errors.items():
+        errors.setdefault(positions[i][0], []).extend(
+            get_messages(setting_error, u'settings.{0}.'.format(positions[i][1])))
+
+    exercise_ids = {}
+    for i, row in enumerate(rows):
+        try:
+            exercise_ids[i] = [int(pk) for pk in row.get('exercises', [])]
+        except (TypeError, ValueError):
+            errors.setdefault(i, []).append(u'exercises: {0}'.format(_('Enter a whole number.')))
+    all_exercise_ids = set([pk for ids in exercise_ids.values() for pk in ids])
+    valid_exercise_ids = set(Exercise.objects.filter(pk__in=all_exercise_ids)
+                                             .values_list('pk', flat=True))
+    for i, ids in exercise_ids.items():
+        if not ids or set(ids) - valid_exercise_ids:
+            errors.setdefault(i, []).append(u'exercises: {0}'.format(
+                _('Select a valid choice. That choice is not one of the available choices.')))
+
+    if errors:
+        raise ValidationError(errors)
+
+    with transaction.atomic():
+        for set_obj in sets:
+            set_obj.exerciseday = days[set_obj.exerciseday_id]
+            super(Set, set_obj).save()
+        Set.exercises.through.objects.bulk_create([
+            Set.exercises.through(set=set_obj, exercise_id=exercise_id, sort_value=i)
+            for position, set_obj in enumerate(sets)
+            for i, exercise_id in enumerate(exercise_ids[position])])
+        for setting, position in zip(settings, positions):
+            setting.set = sets[position[0]]
+        Setting.objects.bulk_create(settings)
+
+    reset_workout_canonical_forms(set([day.training_id for day in days.values()]))
+    logger.debug('Saved %s sets and %s settings for user %s', len(sets), len(settings), user.pk)
+    return sets
+
+
+def update_settings(user, rows):
+    '''
+    Updates existing settings
+
+    The settings are changed with one UPDATE query per UPDATE_BATCH_SIZE rows,
+    which sets every field to its value for each ID with a CASE expression.
+
+    :param user: the user the settings belong to
+    :param rows: a list of dictionaries with the setting's ID under 'id' and
+                 the fields to change
+    :raise ValidationError: if any of the settings is invalid, nothing is
+                            saved. See save_sets for the error's format.
+    :return: the list of saved settings
+    '''
+    ids = []
+    errors = {}
+    for i, row in enumerate(rows):
+        try:
+            ids.append(int(row.get('id')))
+        except (TypeError, ValueError):
+            ids.append(None)
+            errors[i] = [u'id: {0}'.format(_('Enter a whole number.'))]
+
+    existing = Setting.objects.filter(set__exerciseday__training__user=user) \
+                              .select_related('set__exerciseday') \
+                              .in_bulk([pk for pk in ids if pk])
+    workout_ids = set([setting.set.exerciseday.training_id for setting in existing.values()])
+
+    settings = []
+    for i, (pk, row) in enumerate(zip(ids, rows)):
+        if pk and pk not in existing:
+            errors[i] = [u'id: {0}'.format(_('Not found.'))]
+        settings.append(get_setting(row, existing.get(pk)))
+
+    for i, setting_errors in validate_instances(settings,
+                                                get_setting_validators(),
+                                                exclude=('set',)).items():
+        errors.setdefault(i, []).extend(get_messages(setting_errors))
+
+    if errors:
+        raise ValidationError(errors)
+
+    now = timezone.now()
+    fields = [Setting._meta.get_field(name) for name in SETTING_FIELDS + ('updated',)]
+    with transaction.atomic():
+        for setting in settings:
+            setting.updated = now
+        for start in range(0, len(settings), UPDATE_BATCH_SIZE):
+            batch = settings[start:start + UPDATE_BATCH_SIZE]
+            Setting.objects.filter(pk__in=[setting.pk for setting in batch]).update(
+                **dict([(field.name, Case(*[When(pk=setting.pk,
+                                                 then=Value(getattr(setting, field.attname),
+                                                            output_field=field))
+                                            for setting in batch],
+                                          output_field=field))
+                        for field in fields]))
+
+    reset_workout_canonical_forms(workout_ids)
+    logger.debug('Updated %s settings for user %s', len(settings), user.pk)
+    return settings
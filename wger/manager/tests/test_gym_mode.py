@@ -0,0 +1,230 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+
+from wger.core.models import RepetitionUnit, WeightUnit
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.gym_mode import get_bundle_version
+from wger.manager.models import Day, WorkoutLog, WorkoutSession
+from wger.utils.cache import cache_mapper
+
+
+class GymModeBundleTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the offline bundle of the gym mode
+    '''
+
+    url = reverse('day-gym-mode', kwargs={'pk': 2})
+
+    def setUp(self):
+        super(GymModeBundleTestCase, self).setUp()
+        self.user_login('admin')
+
+    def test_bundle(self):
+        '''
+        Test the content of the bundle
+        '''
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['day'], 2)
+        self.assertEqual(response.data['workout'], 1)
+        self.assertEqual(response['ETag'], '"{0}"'.format(response.data['version']))
+
+        exercises = [step for step in response.data['steps'] if step['type'] == 'exercise']
+        self.assertTrue(exercises)
+        for step in exercises:
+            self.assertIn(str(step['exercise']), response.data['exercises'])
+        self.assertNotEqual(response.data['steps'][-1]['type'], 'pause')
+        self.assertTrue(response.data['repetition_units'])
+        self.assertTrue(response.data['weight_units'])
+
+    def test_not_modified(self):
+        '''
+        Test that clients with the current version get an empty response
+        '''
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        WorkoutLog.objects.create(user=User.objects.get(username='admin'),
+                                  workout_id=1,
+                                  exercise_id=2,
+                                  reps=10,
+                                  weight=20,
+                                  date=datetime.date.today())
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_cache(self):
+        '''
+        Test that the bundle is cached per version
+        '''
+        day = Day.objects.get(pk=2)
+        version = get_bundle_version(day, User.objects.get(username='admin'))
+        self.assertFalse(cache.get(cache_mapper.get_gym_mode_key(2, version)))
+        self.client.get(self.url)
+        self.assertTrue(cache.get(cache_mapper.get_gym_mode_key(2, version)))
+
+        day.training.save()
+        self.assertNotEqual(get_bundle_version(day, User.objects.get(username='admin')), version)
+
+    def test_units(self):
+        '''
+        Test that changing the units changes the version
+        '''
+        day = Day.objects.get(pk=2)
+        user = User.objects.get(username='admin')
+        version = get_bundle_version(day, user)
+
+        unit = WeightUnit.objects.get(pk=1)
+        unit.name = 'Kilogram'
+        unit.save()
+        self.assertNotEqual(get_bundle_version(day, user), version)
+
+        version = get_bundle_version(day, user)
+        RepetitionUnit.objects.get(pk=1).save()
+        self.assertNotEqual(get_bundle_version(day, user), version)
+
+    def test_deleted_log(self):
+        '''
+        Test that deleting any of the logs changes the version
+        '''
+        user = User.objects.get(username='admin')
+        day = Day.objects.get(pk=2)
+        WorkoutLog.objects.create(user=user,
+                                  workout_id=1,
+                                  exercise_id=2,
+                                  reps=10,
+                                  weight=20,
+                                  date=datetime.date.today())
+        version = get_bundle_version(day, user)
+
+        WorkoutLog.objects.filter(user=user).order_by('updated').first().delete()
+        self.assertNotEqual(get_bundle_version(day, user), version)
+
+    def test_other_user(self):
+        '''
+        Test that the bundle of other users' days can't be read
+        '''
+        response = self.client.get(reverse('day-gym-mode', kwargs={'pk': 5}))
+        self.assertEqual(response.status_code, 404)
+
+
+class GymModeUploadTestCase(WorkoutManagerTestCase):
+    '''
+    Tests uploading a session with its logs in one request
+    '''
+
+    url = reverse('workoutsession-upload')
+
+    def setUp(self):
+        super(GymModeUploadTestCase, self).setUp()
+        self.user_login('admin')
+
+    def upload(self, data):
+        return self.client.post(self.url, json.dumps(data), content_type='application/json')
+
+    def get_data(self, **kwargs):
+        data = {'workout': 1,
+                'date': '2016-05-01',
+                'impression': '3',
+                'time_start': '17:00',
+                'time_end': '18:00',
+                'logs': [{'exercise': 1, 'reps': 10, 'weight': '20.5'},
+                         {'exercise': 1, 'reps': 8, 'weight': '22.5', 'weight_unit': 2}]}
+        data.update(kwargs)
+        return data
+
+    def test_upload(self):
+        '''
+        Test that the session and all logs are saved
+        '''
+        response = self.upload(self.get_data())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['logs'], 2)
+
+        session = WorkoutSession.objects.get(pk=response.data['session']['id'])
+        self.assertEqual(session.user.username, 'admin')
+        self.assertEqual(session.date, datetime.date(2016, 5, 1))
+        logs = WorkoutLog.objects.filter(date=datetime.date(2016, 5, 1))
+        self.assertEqual(sorted([(log.reps, log.weight_unit_id) for log in logs]),
+                         [(8, 2), (10, 1)])
+
+        # Uploading again updates the session of the day
+        response = self.upload(self.get_data(notes='Tired', logs=[]))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['session']['id'], session.pk)
+        self.assertEqual(WorkoutSession.objects.get(pk=session.pk).notes, 'Tired')
+
+    def test_repeated_upload(self):
+        '''
+        Test that an upload that is sent again is only saved once
+        '''
+        response = self.upload(self.get_data(upload_id='abc-1'))
+        self.assertEqual(response.status_code, 201)
+
+        repeated = self.upload(self.get_data(upload_id='abc-1'))
+        self.assertEqual(repeated.status_code, 200)
+        self.assertEqual(repeated.data, response.data)
+        self.assertEqual(WorkoutLog.objects.filter(date=datetime.date(2016, 5, 1)).count(), 2)
+
+        response = self.upload(self.get_data(upload_id='abc-2'))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(WorkoutLog.objects.filter(date=datetime.date(2016, 5, 1)).count(), 4)
+
+        # The IDs of other users are not used
+        self.user_login('test')
+        response = self.upload(self.get_data(workout=3, upload_id='abc-1'))
+        self.assertEqual(response.status_code, 201)
+
+        response = self.upload(self.get_data(upload_id=''))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('upload_id', response.data)
+
+    def test_invalid_log(self):
+        '''
+        Test that nothing is saved if a log is invalid
+        '''
+        count = WorkoutSession.objects.count()
+        data = self.get_data()
+        data['logs'].append({'exercise': 'abc', 'reps': 10})
+        response = self.upload(data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(2, response.data['logs'])
+        self.assertEqual(WorkoutSession.objects.count(), count)
+        self.assertFalse(WorkoutLog.objects.filter(date=datetime.date(2016, 5, 1)).exists())
+
+    def test_invalid_date(self):
+        '''
+        Test uploading a session with an invalid date
+        '''
+        response = self.upload(self.get_data(date='abc'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date', response.data)
+
+    def test_other_user(self):
+        '''
+        Test that sessions can't be uploaded for other users' workouts
+        '''
+        response = self.upload(self.get_data(workout=3))
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(WorkoutLog.objects.filter(date=datetime.date(2016, 5, 1)).exists())
@@ -0,0 +1,100 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.ingestion import save_workout_logs
+from wger.manager.models import Workout, WorkoutLog
+from wger.utils.cache import cache_mapper
+
+
+class WorkoutLogIngestionTestCase(WorkoutManagerTestCase):
+    '''
+    Tests saving many workout logs at once
+    '''
+
+    def get_logs(self, user, amount, **kwargs):
+        '''
+        Helper that returns unsaved logs
+        '''
+        data = {'exercise_id': 1,
+                'workout_id': Workout.objects.filter(user=user).first().pk,
+                'reps': 10,
+                'weight': 50,
+                'date': datetime.date(2016, 2, 3)}
+        data.update(kwargs)
+        return [WorkoutLog(**data) for i in range(amount)]
+
+    def test_save(self):
+        '''
+        Test saving valid logs
+        '''
+        user = User.objects.get(username='test')
+        count = WorkoutLog.objects.filter(user=user).count()
+        key = cache_mapper.get_workout_log_list(hash((user.pk, 2016, 2)))
+        cache.set(key, 'foo')
+        logs = self.get_logs(user, 100)
+
+        with self.assertNumQueries(29):
+            save_workout_logs(user, logs)
+
+        self.assertEqual(WorkoutLog.objects.filter(user=user).count(), count + 100)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(User.objects.get(pk=user.pk).usercache.last_activity,
+                         datetime.date(2016, 2, 3))
+
+    def test_until_failure(self):
+        '''
+        Test that logs "until failure" only have one repetition
+        '''
+        user = User.objects.get(username='test')
+        save_workout_logs(user, self.get_logs(user, 2, repetition_unit_id=2,
+                                              date=datetime.date(2000, 1, 1)))
+        self.assertEqual(set(WorkoutLog.objects.filter(user=user, date=datetime.date(2000, 1, 1))
+                                               .values_list('reps', flat=True)),
+                         set([1]))
+
+    def test_invalid(self):
+        '''
+        Test that invalid logs are reported and nothing is saved
+        '''
+        user = User.objects.get(username='test')
+        other_workout = Workout.objects.exclude(user=user).first()
+        count = WorkoutLog.objects.count()
+
+        logs = self.get_logs(user, 4)
+        logs[1].reps = -1
+        logs[2].workout_id = other_workout.pk
+        logs[3].exercise_id = 99999
+
+        with self.assertRaises(ValidationError) as context:
+            save_workout_logs(user, logs)
+        self.assertEqual(sorted(context.exception.message_dict.keys()), [1, 2, 3])
+        self.assertIn('workout', context.exception.message_dict[2][0])
+        self.assertEqual(WorkoutLog.objects.count(), count)
+
+    def test_model_until_failure(self):
+        '''
+        Test that saving a single log "until failure" sets the repetitions
+        '''
+        user = User.objects.get(username='test')
+        log = self.get_logs(user, 1, repetition_unit_id=2)[0]
+        log.user = user
+        log.save()
+        self.assertEqual(WorkoutLog.objects.get(pk=log.pk).reps, 1)
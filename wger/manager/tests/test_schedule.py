@@ -709,6 +709,26 @@ class SchedulePdfExportTestCase(WorkoutManagerTestCase):
         self.export_pdf_with_images_and_comments(fail=False, pdf_type="table")
         self.export_pdf_token(pdf_type="table")
 
+    def test_export_pdf_repeated_workout(self):
+        '''
+        Tests exporting a schedule that uses the same workout in several steps
+        '''
+        self.user_login('test')
+        schedule = Schedule.objects.get(pk=1)
+        response = self.client.get(reverse('manager:schedule:pdf-table', kwargs={'pk': 1}))
+        length = int(response['Content-Length'])
+
+        step = schedule.schedulestep_set.first()
+        for i in range(3):
+            ScheduleStep.objects.create(schedule=schedule,
+                                        workout=step.workout,
+                                        duration=2,
+                                        order=10 + i)
+
+        response = self.client.get(reverse('manager:schedule:pdf-table', kwargs={'pk': 1}))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['Content-Length']), length)
+
 
 class ScheduleApiTestCase(api_base_test.ApiBaseResourceTestCase):
     '''
@@ -0,0 +1,284 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.aggregation import (
+    calculate_day_statistics,
+    create_statistics,
+    estimate_one_rep_max
+)
+from wger.manager.ingestion import save_workout_logs
+from wger.manager.models import (
+    WorkoutLog,
+    ExerciseDayStatistics,
+    MuscleWeekStatistics,
+    PersonalRecord
+)
+
+
+class WorkoutStatisticsTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the aggregated workout log statistics
+    '''
+
+    def setUp(self):
+        super(WorkoutStatisticsTestCase, self).setUp()
+        self.user = User.objects.get(username='test')
+
+    def add_log(self, exercise_id, date, reps, weight, **kwargs):
+        '''
+        Helper that saves a log of the test user
+        '''
+        log = WorkoutLog(user=self.user,
+                         workout_id=3,
+                         exercise_id=exercise_id,
+                         date=date,
+                         reps=reps,
+                         weight=weight,
+                         **kwargs)
+        log.save()
+        return log
+
+    def get_statistics(self):
+        '''
+        Helper that returns the statistics of the test user
+        '''
+        days = dict([((i.exercise_id, i.date), i)
+                     for i in ExerciseDayStatistics.objects.filter(user=self.user)])
+        weeks = dict([((i.muscle_id, i.week), i)
+                      for i in MuscleWeekStatistics.objects.filter(user=self.user)])
+        records = dict([((i.exercise_id, i.reps), i)
+                        for i in PersonalRecord.objects.filter(user=self.user)])
+        return days, weeks, records
+
+    def test_estimate_one_rep_max(self):
+        '''
+        Test the estimation of the one repetition maximum
+        '''
+        self.assertEqual(estimate_one_rep_max(decimal.Decimal(100), 1), 100)
+        self.assertEqual(estimate_one_rep_max(decimal.Decimal(100), 10), decimal.Decimal('133.33'))
+
+    def test_fixture_logs(self):
+        '''
+        Test that the statistics of existing logs are available
+        '''
+        days, weeks, records = self.get_statistics()
+        self.assertEqual(days[(2, datetime.date(2012, 11, 1))].volume, 240)
+        self.assertEqual(weeks[(2, datetime.date(2012, 10, 29))].sets, 1)
+        self.assertEqual(records[(2, 8)].weight, 30)
+
+    def test_add_logs(self):
+        '''
+        Test that saving logs updates the statistics
+        '''
+        monday = datetime.date(2016, 2, 1)
+        wednesday = datetime.date(2016, 2, 3)
+        self.add_log(1, monday, 10, 50)
+        self.add_log(1, monday, 8, 60)
+        self.add_log(1, wednesday, 5, 100, weight_unit_id=2)
+        self.add_log(3, wednesday, 10, 20)
+
+        # Not counted
+        self.add_log(1, wednesday, 60, 0, repetition_unit_id=3)
+        self.add_log(1, wednesday, 1, 80, weight_unit_id=3)
+
+        days, weeks, records = self.get_statistics()
+
+        day = days[(1, monday)]
+        self.assertEqual(day.sets, 2)
+        self.assertEqual(day.reps, 18)
+        self.assertEqual(day.volume, 980)
+        self.assertEqual(day.max_weight, 60)
+        self.assertEqual(day.estimated_1rm, 76)
+        self.assertEqual(days[(1, wednesday)].volume, decimal.Decimal('226.80'))
+        self.assertEqual(days[(1, wednesday)].sets, 1)
+
+        # Exercise 1 trains muscles 1 and 2, exercise 3 only muscle 1
+        self.assertEqual(weeks[(1, monday)].sets, 4)
+        self.assertEqual(weeks[(1, monday)].volume, decimal.Decimal('1406.80'))
+        self.assertEqual(weeks[(2, monday)].sets, 3)
+        self.assertEqual(weeks[(2, monday)].reps, 23)
+
+        self.assertEqual(records[(1, 10)].weight, 50)
+        self.assertEqual(records[(1, 5)].weight, decimal.Decimal('45.36'))
+        self.assertEqual(records[(1, 5)].date, wednesday)
+
+        # A new record
+        self.add_log(1, datetime.date(2016, 3, 1), 10, 55)
+        self.assertEqual(PersonalRecord.objects.get(user=self.user, exercise=1, reps=10).date,
+                         datetime.date(2016, 3, 1))
+
+    def test_edit_delete_log(self):
+        '''
+        Test that editing and deleting logs updates the statistics
+        '''
+        old_date = datetime.date(2016, 2, 1)
+        new_date = datetime.date(2016, 2, 10)
+        log = self.add_log(1, old_date, 10, 50)
+
+        log.date = new_date
+        log.save()
+        days, weeks, records = self.get_statistics()
+        self.assertNotIn((1, old_date), days)
+        self.assertNotIn((1, old_date), weeks)
+        self.assertEqual(days[(1, new_date)].volume, 500)
+        self.assertEqual(weeks[(1, datetime.date(2016, 2, 8))].volume, 500)
+
+        log.delete()
+        days, weeks, records = self.get_statistics()
+        self.assertNotIn((1, new_date), days)
+        self.assertNotIn((1, datetime.date(2016, 2, 8)), weeks)
+        self.assertNotIn((1, 10), records)
+
+    def test_changed_keys(self):
+        '''
+        Test that only the days and weeks of the changed logs are calculated again
+        '''
+        self.add_log(1, datetime.date(2016, 2, 1), 10, 50)
+        self.add_log(1, datetime.date(2016, 2, 12), 10, 50)
+        ExerciseDayStatistics.objects.filter(user=self.user, date=datetime.date(2016, 2, 1)) \
+                                     .update(sets=99)
+        MuscleWeekStatistics.objects.filter(user=self.user, week=datetime.date(2016, 2, 8)) \
+                                    .update(sets=99)
+
+        self.add_log(1, datetime.date(2016, 2, 3), 10, 50)
+        days, weeks, records = self.get_statistics()
+        self.assertEqual(days[(1, datetime.date(2016, 2, 1))].sets, 99)
+        self.assertEqual(days[(1, datetime.date(2016, 2, 3))].sets, 1)
+        self.assertEqual(weeks[(1, datetime.date(2016, 2, 1))].sets, 100)
+        self.assertEqual(weeks[(1, datetime.date(2016, 2, 8))].sets, 99)
+
+    def test_concurrent_rows(self):
+        '''
+        Test that rows created in the meantime are updated
+        '''
+        ExerciseDayStatistics.objects.create(user=self.user,
+                                             exercise_id=1,
+                                             date=datetime.date(2016, 2, 1),
+                                             sets=5,
+                                             reps=50,
+                                             volume=10,
+                                             max_weight=1,
+                                             estimated_1rm=1)
+        create_statistics(ExerciseDayStatistics,
+                          ('exercise_id', 'date'),
+                          calculate_day_statistics(self.user.pk,
+                                                   [(1, datetime.date(2016, 2, 1), 10, 50, 1)]))
+        day = ExerciseDayStatistics.objects.get(user=self.user,
+                                                exercise=1,
+                                                date=datetime.date(2016, 2, 1))
+        self.assertEqual(day.sets, 1)
+        self.assertEqual(day.volume, 500)
+
+    def test_records(self):
+        '''
+        Test that the records are only looked up in the logs when needed
+        '''
+        def get_record():
+            record = PersonalRecord.objects.get(user=self.user, exercise=1, reps=10)
+            return record.weight, record.date
+
+        first = self.add_log(1, datetime.date(2016, 2, 1), 10, 50)
+        with CaptureQueriesContext(connection) as queries:
+            best = self.add_log(1, datetime.date(2016, 2, 2), 10, 60)
+            self.add_log(1, datetime.date(2016, 2, 3), 10, 50)
+        self.assertFalse([query for query in queries.captured_queries
+                          if '"manager_workoutlog"."reps" IN' in query['sql']])
+        self.assertEqual(get_record(), (60, datetime.date(2016, 2, 2)))
+
+        # Changing or deleting the log with the record looks for the next one
+        best = WorkoutLog.objects.get(pk=best.pk)
+        best.weight = 40
+        best.save()
+        self.assertEqual(get_record(), (50, datetime.date(2016, 2, 1)))
+
+        first.delete()
+        self.assertEqual(get_record(), (50, datetime.date(2016, 2, 3)))
+
+        # The same weight on an earlier day
+        self.add_log(1, datetime.date(2016, 1, 1), 10, 50)
+        self.assertEqual(get_record(), (50, datetime.date(2016, 1, 1)))
+
+    def test_ingestion(self):
+        '''
+        Test that saving many logs at once updates the statistics
+        '''
+        logs = [WorkoutLog(workout_id=3,
+                           exercise_id=1,
+                           reps=10,
+                           weight=10 + i,
+                           date=datetime.date(2016, 2, 1) + datetime.timedelta(days=i))
+                for i in range(14)]
+        save_workout_logs(self.user, logs)
+
+        days, weeks, records = self.get_statistics()
+        self.assertEqual(len([key for key in days if key[0] == 1]), 14)
+        self.assertEqual(weeks[(2, datetime.date(2016, 2, 8))].volume, 1400)
+        self.assertEqual(records[(1, 10)].weight, 23)
+
+    def test_rebuild(self):
+        '''
+        Test that the management command calculates the same statistics
+        '''
+        self.add_log(1, datetime.date(2016, 2, 1), 10, 50)
+        self.add_log(3, datetime.date(2016, 2, 3), 5, 100, weight_unit_id=2)
+        days, weeks, records = self.get_statistics()
+
+        ExerciseDayStatistics.objects.all().delete()
+        MuscleWeekStatistics.objects.all().delete()
+        PersonalRecord.objects.all().delete()
+        call_command('update-workout-statistics')
+
+        new_days, new_weeks, new_records = self.get_statistics()
+        self.assertEqual(sorted(days.keys()), sorted(new_days.keys()))
+        self.assertEqual([days[key].volume for key in days],
+                         [new_days[key].volume for key in days])
+        self.assertEqual(sorted(weeks.keys()), sorted(new_weeks.keys()))
+        self.assertEqual([weeks[key].volume for key in weeks],
+                         [new_weeks[key].volume for key in weeks])
+        self.assertEqual(sorted(records.keys()), sorted(new_records.keys()))
+        self.assertTrue(ExerciseDayStatistics.objects.filter(user=1).exists())
+
+    def test_api(self):
+        '''
+        Test that the statistics are only available to their owner
+        '''
+        self.add_log(1, datetime.date(2016, 2, 1), 10, 50)
+        self.user_login('test')
+
+        response = self.client.get(reverse('exercisestatistics-list'), {'exercise': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['volume'], '500.00')
+
+        response = self.client.get(reverse('musclestatistics-list'))
+        self.assertEqual(response.data['count'],
+                         MuscleWeekStatistics.objects.filter(user=self.user).count())
+
+        response = self.client.get(reverse('personalrecord-list'), {'reps': 10})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['date'], '2016-02-01')
+
+        self.user_logout()
+        response = self.client.get(reverse('personalrecord-list'))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,220 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import Set, Setting, Workout
+from wger.manager.structure import save_sets, update_settings
+from wger.utils.cache import cache_mapper
+
+
+class SaveSetsTestCase(WorkoutManagerTestCase):
+    '''
+    Tests saving sets and settings in bulk
+    '''
+
+    def get_rows(self):
+        return [{'exerciseday': 1,
+                 'sets': 3,
+                 'exercises': [3, 1],
+                 'settings': [{'exercise': 3, 'reps': 10, 'weight': '50'},
+                              {'exercise': 1, 'reps': 5, 'repetition_unit': 2}]},
+                {'exerciseday': 2,
+                 'exercises': [2],
+                 'settings': [{'exercise': 2, 'reps': 8}]}]
+
+    def test_save(self):
+        '''
+        Test that the sets, exercises and settings are saved
+        '''
+        user = User.objects.get(username='admin')
+        Workout.objects.get(pk=1).canonical_representation
+        self.assertTrue(cache.get(cache_mapper.get_workout_canonical(1)))
+
+        sets = save_sets(user, self.get_rows())
+        self.assertEqual(len(sets), 2)
+        self.assertFalse(cache.get(cache_mapper.get_workout_canonical(1)))
+
+        set_obj = Set.objects.get(pk=sets[0].pk)
+        self.assertEqual(set_obj.sets, 3)
+        self.assertEqual([i.pk for i in set_obj.exercises.all()], [3, 1])
+        settings = Setting.objects.filter(set=set_obj)
+        self.assertEqual([(i.exercise_id, i.reps, i.order) for i in settings],
+                         [(3, 10, 1), (1, 5, 2)])
+        self.assertEqual(settings[0].weight, Decimal(50))
+        self.assertEqual(Set.objects.get(pk=sets[1].pk).sets, Set.DEFAULT_SETS)
+
+    def test_queries(self):
+        '''
+        Test that the number of queries doesn't depend on the number of settings
+        '''
+        user = User.objects.get(username='admin')
+        save_sets(user, self.get_rows())
+
+        rows = self.get_rows()
+        rows[0]['settings'] *= 10
+        with self.assertNumQueries(9):
+            save_sets(user, rows)
+
+    def test_invalid(self):
+        '''
+        Test that nothing is saved if any of the rows is invalid
+        '''
+        count = Setting.objects.count()
+        rows = self.get_rows()
+        rows[1]['exercises'] = [1000]
+        rows[1]['settings'][0]['reps'] = 'abc'
+        try:
+            save_sets(User.objects.get(username='admin'), rows)
+            self.fail('No validation error')
+        except ValidationError as e:
+            self.assertEqual(list(e.message_dict.keys()), [1])
+            self.assertEqual(len(e.message_dict[1]), 2)
+        self.assertEqual(Setting.objects.count(), count)
+
+    def test_null(self):
+        '''
+        Test that fields that can be empty but not null are validated
+        '''
+        rows = self.get_rows()
+        rows[0]['settings'][0]['order'] = None
+        rows[1]['settings'][0]['comment'] = None
+        try:
+            save_sets(User.objects.get(username='admin'), rows)
+            self.fail('No validation error')
+        except ValidationError as e:
+            self.assertEqual(sorted(e.message_dict.keys()), [0, 1])
+
+    def test_other_user(self):
+        '''
+        Test that sets can't be added to other users' days
+        '''
+        self.assertRaises(ValidationError,
+                          save_sets,
+                          User.objects.get(username='test'),
+                          self.get_rows())
+
+
+class UpdateSettingsTestCase(WorkoutManagerTestCase):
+    '''
+    Tests updating settings in bulk
+    '''
+
+    def test_update(self):
+        '''
+        Test that only the passed fields are changed
+        '''
+        user = User.objects.get(username='admin')
+        comment = Setting.objects.get(pk=2).comment
+        update_settings(user, [{'id': 1, 'reps': 12}, {'id': '2', 'weight': '20.5'}])
+        self.assertEqual(Setting.objects.get(pk=1).reps, 12)
+        self.assertEqual(Setting.objects.get(pk=2).weight, Decimal('20.5'))
+        self.assertEqual(Setting.objects.get(pk=2).comment, comment)
+
+    def test_queries(self):
+        '''
+        Test that the settings are changed with one query
+        '''
+        user = User.objects.get(username='admin')
+        settings = Setting.objects.filter(set__exerciseday__training__user=user)
+        rows = [{'id': setting.pk, 'reps': 3, 'comment': str(setting.pk)} for setting in settings]
+        self.assertTrue(len(rows) > 1)
+        with self.assertNumQueries(7):
+            update_settings(user, rows)
+        for setting in settings.all():
+            self.assertEqual((setting.reps, setting.comment), (3, str(setting.pk)))
+
+    def test_null(self):
+        '''
+        Test that fields that can be empty but not null are validated
+        '''
+        user = User.objects.get(username='admin')
+        self.assertRaises(ValidationError, update_settings, user, [{'id': 1, 'comment': None}])
+        self.assertRaises(ValidationError, update_settings, user, [{'id': 1, 'order': None}])
+        update_settings(user, [{'id': 1, 'comment': '', 'weight': None}])
+        self.assertIsNone(Setting.objects.get(pk=1).weight)
+
+    def test_other_user(self):
+        '''
+        Test that settings of other users can't be changed
+        '''
+        user = User.objects.get(username='admin')
+        reps = Setting.objects.get(pk=1).reps
+        self.assertRaises(ValidationError,
+                          update_settings,
+                          user,
+                          [{'id': 1, 'reps': 12}, {'id': 3, 'reps': 12}])
+        self.assertEqual(Setting.objects.get(pk=1).reps, reps)
+
+
+class BulkApiTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the bulk endpoints for sets and settings
+    '''
+
+    def setUp(self):
+        super(BulkApiTestCase, self).setUp()
+        self.user_login('admin')
+
+    def test_create_sets(self):
+        '''
+        Test creating sets with their settings
+        '''
+        response = self.client.post(reverse('Set-bulk'),
+                                    json.dumps([{'exerciseday': 1,
+                                                 'exercises': [1],
+                                                 'settings': [{'exercise': 1, 'reps': 10}]}]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data[0]['exercises'], [1])
+        self.assertEqual(response.data[0]['settings'][0]['reps'], 10)
+        self.assertTrue(Setting.objects.filter(pk=response.data[0]['settings'][0]['id'],
+                                               set_id=response.data[0]['id']).exists())
+
+    def test_create_sets_invalid(self):
+        '''
+        Test creating sets with invalid data
+        '''
+        response = self.client.post(reverse('Set-bulk'),
+                                    json.dumps({'exerciseday': 1}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(reverse('Set-bulk'),
+                                    json.dumps([{'exerciseday': 5, 'exercises': [1]}]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_update_settings(self):
+        '''
+        Test updating settings
+        '''
+        response = self.client.patch(reverse('Setting-bulk'),
+                                     json.dumps([{'id': 1, 'reps': 7}]),
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['reps'], 7)
+        self.assertEqual(Setting.objects.get(pk=1).reps, 7)
+
+        response = self.client.patch(reverse('Setting-bulk'),
+                                     json.dumps([{'id': 1, 'comment': None}]),
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -19,10 +19,13 @@ from decimal import Decimal
 
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
 from wger.exercises.models import Exercise
 from wger.manager.models import Workout
+from wger.manager.models import WorkoutLog
 from wger.manager.models import WorkoutSession
 
 logger = logging.getLogger(__name__)
@@ -111,6 +114,31 @@ class WorkoutTimerTestCase(WorkoutManagerTestCase):
             self.assertEqual(current_step['type'], 'exercise')
             self.assertEqual(current_step['weight'], Decimal(15))
 
+    def test_timer_last_weight(self):
+        '''
+        Tests that the weight of the most recent log is used
+        '''
+        self.user_login('admin')
+        user = User.objects.get(username='admin')
+        for date, weight in ((datetime.date(2016, 2, 1), 20),
+                             (datetime.date(2015, 1, 1), 30),
+                             (datetime.date(2016, 2, 1), 25)):
+            WorkoutLog.objects.create(user=user,
+                                      workout_id=1,
+                                      exercise_id=2,
+                                      reps=10,
+                                      weight=weight,
+                                      date=date)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('manager:workout:timer', kwargs={'day_pk': 2}))
+        steps = [step for step in response.context['step_list'] if step['type'] == 'exercise']
+        self.assertEqual(set([step['weight'] for step in steps]), set([Decimal(25)]))
+
+        # The last dates and their logs are read with two queries for the whole day
+        self.assertEqual(len([query for query in context.captured_queries
+                              if 'FROM "manager_workoutlog"' in query['sql']]), 2)
+
     def test_timer_anonymous(self):
         '''
         Tests the timer as an anonymous user
@@ -226,6 +226,31 @@ class WeightLogOverviewAddTestCase(WorkoutManagerTestCase):
         self.user_login('admin')
         self.add_weight_log(fail=False)
 
+    def test_add_weight_log_existing(self):
+        '''
+        Tests that existing log entries can't be changed when adding entries
+        '''
+
+        self.user_login('admin')
+        log = WorkoutLog.objects.exclude(user__username='admin').first()
+        reps = log.reps
+        response = self.client.post(reverse('manager:day:log', kwargs={'pk': 1}),
+                                    {'date': '2012-01-01',
+                                     'impression': '3',
+                                     'time_start': datetime.time(10, 0),
+                                     'time_end': datetime.time(12, 0),
+                                     'form-0-id': log.pk,
+                                     'form-0-reps': reps + 1,
+                                     'form-0-repetition_unit': 1,
+                                     'form-0-weight': 10,
+                                     'form-0-weight_unit': 1,
+                                     'form-TOTAL_FORMS': 1,
+                                     'form-INITIAL_FORMS': 1,
+                                     'form-MAX-NUM_FORMS': 1
+                                     })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(WorkoutLog.objects.get(pk=log.pk).reps, reps)
+
     def test_add_weight_log_other(self):
         '''
         Tests adding weight log entries as a logged user not owning the data
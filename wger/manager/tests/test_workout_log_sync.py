@@ -0,0 +1,154 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import gzip
+import io
+import json
+import unittest
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.ingestion import save_workout_logs
+from wger.manager.models import Workout, WorkoutLog
+from wger.utils.renderers import msgpack
+
+
+class WorkoutLogSyncTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the bulk sync endpoint for workout logs
+    '''
+
+    url = reverse('workoutlog-sync')
+
+    def setUp(self):
+        super(WorkoutLogSyncTestCase, self).setUp()
+        self.user_login('admin')
+
+    def test_columns(self):
+        '''
+        Test that all logs of the user are returned as columns
+        '''
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 4)
+        self.assertFalse(response.data['more'])
+        self.assertEqual(sorted(response.data['logs']['id']), [1, 2, 3, 4])
+        self.assertEqual(response.data['logs']['exercise'], [1, 1, 1, 1])
+
+        position = response.data['logs']['id'].index(3)
+        self.assertEqual(response.data['logs']['date'][position], '2013-10-30')
+        self.assertEqual(response.data['logs']['weight'][position], 38)
+
+    def test_cursor(self):
+        '''
+        Test that only changed logs are returned after the first sync
+        '''
+        response = self.client.get(self.url, {'limit': 3})
+        self.assertEqual(response.data['count'], 3)
+        self.assertTrue(response.data['more'])
+
+        response = self.client.get(self.url, {'since': response.data['cursor']})
+        self.assertEqual(response.data['count'], 1)
+        self.assertFalse(response.data['more'])
+        cursor = response.data['cursor']
+
+        response = self.client.get(self.url, {'since': cursor})
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response.data['cursor'], cursor)
+        self.assertEqual(response.data['logs']['id'], [])
+
+        log = WorkoutLog.objects.get(pk=2)
+        log.reps = 12
+        log.save()
+        save_workout_logs(User.objects.get(username='admin'),
+                          [WorkoutLog(exercise_id=1,
+                                      workout_id=1,
+                                      reps=5,
+                                      weight=10,
+                                      date=datetime.date(2016, 1, 1))])
+
+        response = self.client.get(self.url, {'since': cursor})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['logs']['id'][0], 2)
+        self.assertEqual(response.data['logs']['reps'][0], 12)
+
+    def test_deleted(self):
+        '''
+        Test that logs deleted together with their workout are listed
+        '''
+        cursor = self.client.get(self.url).data['cursor']
+        Workout.objects.get(pk=1).delete()
+        WorkoutLog.objects.filter(pk=4).delete()
+
+        response = self.client.get(self.url, {'since': cursor})
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(sorted(response.data['deleted']), [1, 2, 3, 4])
+
+    def test_limit(self):
+        '''
+        Test that every page has at least one log
+        '''
+        for limit in (0, -5):
+            response = self.client.get(self.url, {'limit': limit})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], 1)
+            self.assertTrue(response.data['more'])
+
+            cursor = response.data['cursor']
+
+            # The cursor moves on with every page
+            response = self.client.get(self.url, {'since': cursor, 'limit': limit})
+            self.assertEqual(response.data['count'], 1)
+            self.assertNotEqual(response.data['cursor'], cursor)
+
+    def test_invalid_cursor(self):
+        '''
+        Test that invalid cursors are rejected
+        '''
+        response = self.client.get(self.url, {'since': 'foo'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_gzip(self):
+        '''
+        Test that the logs are compressed if the client accepts it
+        '''
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        content = gzip.GzipFile(fileobj=io.BytesIO(response.content)).read()
+        self.assertEqual(json.loads(content.decode('utf-8'))['count'], 4)
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack(self):
+        '''
+        Test the MessagePack encoding
+        '''
+        response = self.client.get(self.url, HTTP_ACCEPT='application/x-msgpack')
+        self.assertEqual(response['Content-Type'], 'application/x-msgpack')
+        self.assertEqual(msgpack.unpackb(response.content, encoding='utf-8')['count'], 4)
+
+    def test_other_users(self):
+        '''
+        Test that only the user's own logs are returned
+        '''
+        self.user_logout()
+        self.user_login('test')
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['logs']['id'], [5])
+
+        self.user_logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
@@ -32,6 +32,7 @@ from django.views.generic import (
     DeleteView
 )
 
+from wger.manager.ingestion import save_workout_logs
 from wger.manager.helpers import WorkoutCalendar
 from wger.manager.models import (
     Workout,
@@ -50,6 +51,7 @@ from wger.utils.generic_views import (
     WgerDeleteMixin
 )
 from wger.utils.helpers import check_access
+from wger.utils.owner import get_object_owner_id
 from wger.weight.helpers import process_log_entries, group_log_entries
 
 
@@ -102,7 +104,7 @@ def add(request, pk):
 
     # Load the day and check ownership
     day = get_object_or_404(Day, pk=pk)
-    if day.get_owner_object().user != request.user:
+    if get_object_owner_id(day, request) != request.user.pk:
         return HttpResponseForbidden()
 
     # We need several lists here because we need to assign specific form to each
@@ -150,7 +152,7 @@ def add(request, pk):
                 post_copy['form-%s-exercise' % form_id] = form_to_exercise[form_id].id
 
         # Pass the new data to the forms
-        formset = WorkoutLogFormSet(data=post_copy)
+        formset = WorkoutLogFormSet(data=post_copy, queryset=WorkoutLog.objects.none())
         dateform = HelperDateForm(data=post_copy)
         session_form = HelperWorkoutSessionForm(data=post_copy)
 
@@ -178,10 +180,9 @@ def add(request, pk):
             for instance in instances:
                 if not instance.weight:
                     instance.weight = 0
-                instance.user = request.user
                 instance.workout = day.training
                 instance.date = log_date
-                instance.save()
+            save_workout_logs(request.user, instances, validate=False)
 
             return HttpResponseRedirect(reverse('manager:log:log', kwargs={'pk': day.training_id}))
     else:
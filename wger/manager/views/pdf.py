@@ -16,30 +16,37 @@
 
 import logging
 import datetime
+from io import BytesIO
+
+import six
 
-from django.http import HttpResponse
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404
+from django.utils import translation
 from django.utils.translation import ugettext as _
 
 from wger.manager.models import Workout
-from wger.manager.helpers import render_workout_day
+from wger.manager.helpers import render_workout_day, get_main_images
+from wger.utils.cache import cache_mapper
 from wger.utils.helpers import check_token
-from wger.utils.pdf import styleSheet
-from wger.utils.pdf import render_footer
+from wger.utils.pdf import (
+    styleSheet,
+    render_footer,
+    render_pdf,
+    pdf_response,
+    pdf_pending_response,
+    pdf_failed_response,
+    PdfRenderingError,
+    PDF_BACKGROUND_MIN_ROWS
+)
 
 from reportlab.lib.pagesizes import A4, cm
 from reportlab.platypus import (
     Paragraph,
     SimpleDocTemplate,
-    Table,
     Spacer
 )
 
-from reportlab.lib import colors
-
-from wger import get_version
-
 logger = logging.getLogger(__name__)
 
 
@@ -51,73 +58,22 @@ def workout_log(request, id, images=False, comments=False, uidb64=None, token=No
     * http://www.blog.pythonlibrary.org/2010/09/21/reportlab
     * http://www.reportlab.com/apis/reportlab/dev/platypus.html
     '''
-    comments = bool(int(comments))
-    images = bool(int(images))
-
-    # Load the workout
-    if uidb64 is not None and token is not None:
-        if check_token(uidb64, token):
-            workout = get_object_or_404(Workout, pk=id)
-        else:
-            return HttpResponseForbidden()
-    else:
-        if request.user.is_anonymous():
-            return HttpResponseForbidden()
-        workout = get_object_or_404(Workout, pk=id, user=request.user)
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
-
-    # Create the PDF object, using the response object as its "file."
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            # pagesize = landscape(A4),
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject=_('Workout for %s') % request.user.username)
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
-                  {'description': workout},
-                  styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Iterate through the Workout and render the training days
-    for day in workout.canonical_representation['day_list']:
-        elements.append(render_workout_day(day, images=images, comments=comments))
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    elements.append(render_footer(request.build_absolute_uri(workout.get_absolute_url())))
-
-    # write the document and send the response to the browser
-    doc.build(elements)
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response['Content-Disposition'] = 'attachment; filename=Workout-{0}-log.pdf'.format(id)
-    response['Content-Length'] = len(response.content)
-    return response
+    return workout_pdf(request, id, images, comments, uidb64, token, only_table=False)
 
 
 def workout_view(request, id, images=False, comments=False, uidb64=None, token=None):
     '''
     Generates a PDF with the contents of the workout, without table for logs
     '''
+    return workout_pdf(request, id, images, comments, uidb64, token, only_table=True)
 
+
+def workout_pdf(request, id, images, comments, uidb64, token, only_table):
     '''
-    Generates a PDF with the contents of the given workout
-    See also
-    * http://www.blog.pythonlibrary.org/2010/09/21/reportlab
-    * http://www.reportlab.com/apis/reportlab/dev/platypus.html
+    Loads the workout and returns its PDF, from the cache if possible
+
+    Large or image heavy PDFs are rendered in the background, the client is
+    asked to reload until they are ready.
     '''
     comments = bool(int(comments))
     images = bool(int(images))
@@ -133,43 +89,72 @@ def workout_view(request, id, images=False, comments=False, uidb64=None, token=N
             return HttpResponseForbidden()
         workout = get_object_or_404(Workout, pk=id, user=request.user)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
-
-    # Create the PDF object, using the response object as its "file."
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject=_('Workout for %s') % request.user.username)
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
-                  {'description': workout},
-                  styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Iterate through the Workout and render the training days
-    for day in workout.canonical_representation['day_list']:
-        elements.append(render_workout_day(day, images=images, comments=comments, only_table=True))
+    canonical = workout.canonical_representation
+    footer_url = request.build_absolute_uri(workout.get_absolute_url())
+    key = cache_mapper.get_pdf_key('workout',
+                                   workout.pk,
+                                   canonical['version'],
+                                   only_table,
+                                   images,
+                                   comments,
+                                   translation.get_language(),
+                                   datetime.date.today(),
+                                   footer_url)
+
+    # Everything the rendering needs is collected here, so it does not need
+    # to access the database, even when it runs in a worker thread
+    nr_of_rows = sum([len(set_obj['exercise_list'])
+                      for day in canonical['day_list']
+                      for set_obj in day['set_list']])
+    main_images = get_main_images(canonical['day_list']) if images else None
+    title = _('Workout')
+    subject = _('Workout for %s') % workout.user.username
+    description = six.text_type(workout)
+
+    def render():
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer,
+                                pagesize=A4,
+                                leftMargin=cm,
+                                rightMargin=cm,
+                                topMargin=0.5 * cm,
+                                bottomMargin=0.5 * cm,
+                                title=title,
+                                author='wger Workout Manager',
+                                subject=subject)
+
+        # container for the 'Flowable' objects
+        elements = []
+
+        # Set the title
+        p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
+                      {'description': description},
+                      styleSheet["HeaderBold"])
+        elements.append(p)
+        elements.append(Spacer(10 * cm, 0.5 * cm))
+
+        # Iterate through the Workout and render the training days
+        for day in canonical['day_list']:
+            elements.append(render_workout_day(day,
+                                               images=images,
+                                               comments=comments,
+                                               only_table=only_table,
+                                               main_images=main_images))
+            elements.append(Spacer(10 * cm, 0.5 * cm))
+
+        # Footer, date and info
         elements.append(Spacer(10 * cm, 0.5 * cm))
+        elements.append(render_footer(footer_url))
 
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    elements.append(render_footer(request.build_absolute_uri(workout.get_absolute_url())))
+        doc.build(elements)
+        return buffer.getvalue()
 
-    # write the document and send the response to the browser
-    doc.build(elements)
+    try:
+        pdf = render_pdf(key, render, background=images or nr_of_rows > PDF_BACKGROUND_MIN_ROWS)
+    except PdfRenderingError:
+        return pdf_failed_response()
+    if pdf is None:
+        return pdf_pending_response()
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response['Content-Disposition'] = 'attachment; filename=Workout-{0}-table.pdf'.format(id)
-    response['Content-Length'] = len(response.content)
-    return response
+    filename = 'Workout-{0}-{1}.pdf'.format(id, 'table' if only_table else 'log')
+    return pdf_response(pdf, filename)
@@ -16,14 +16,17 @@
 
 import logging
 import datetime
+from io import BytesIO
+
+import six
 
 from django.shortcuts import render, get_object_or_404
 from django.http import (
     HttpResponseRedirect,
-    HttpResponseForbidden,
-    HttpResponse
+    HttpResponseForbidden
 )
 from django.core.urlresolvers import reverse_lazy, reverse
+from django.utils import translation
 from django.utils.translation import ugettext_lazy, ugettext as _
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib.auth.decorators import login_required
@@ -42,13 +45,23 @@ from reportlab.platypus import (
 )
 
 from wger.manager.models import Schedule
-from wger.manager.helpers import render_workout_day
+from wger.manager.helpers import render_workout_day, get_main_images
+from wger.utils.cache import cache_mapper
 from wger.utils.generic_views import (
     WgerFormMixin,
     WgerDeleteMixin
 )
 from wger.utils.helpers import make_token, check_token
-from wger.utils.pdf import styleSheet, render_footer
+from wger.utils.pdf import (
+    styleSheet,
+    render_footer,
+    render_pdf,
+    pdf_response,
+    pdf_pending_response,
+    pdf_failed_response,
+    PdfRenderingError,
+    PDF_BACKGROUND_MIN_ROWS
+)
 
 
 logger = logging.getLogger(__name__)
@@ -102,71 +115,23 @@ def export_pdf_log(request, pk, images=False, comments=False, uidb64=None, token
     '''
     Show the workout schedule
     '''
-    user = request.user
-
-    comments = bool(int(comments))
-    images = bool(int(images))
-
-    # Load the workout
-    if uidb64 is not None and token is not None:
-        if check_token(uidb64, token):
-            schedule = get_object_or_404(Schedule, pk=pk)
-        else:
-            return HttpResponseForbidden()
-    else:
-        if request.user.is_anonymous():
-            return HttpResponseForbidden()
-        schedule = get_object_or_404(Schedule, pk=pk, user=user)
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    # and use it to the create the PDF using it as a file like object
-    response = HttpResponse(content_type='application/pdf')
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject='Schedule for {0}'.format(request.user.username))
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph(u'<para align="center">{0}</para>'.format(schedule), styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Iterate through the Workout and render the training days
-    for step in schedule.schedulestep_set.all():
-        p = Paragraph(u'<para>{0} {1}</para>'.format(step.duration, _('Weeks')),
-                      styleSheet["HeaderBold"])
-        elements.append(p)
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-        for day in step.workout.canonical_representation['day_list']:
-            elements.append(
-                render_workout_day(day, images=images, comments=comments, nr_of_weeks=7))
-            elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    url = reverse('manager:schedule:view', kwargs={'pk': schedule.id})
-    elements.append(render_footer(request.build_absolute_uri(url)))
-
-    # write the document and send the response to the browser
-    doc.build(elements)
-    response['Content-Disposition'] = 'attachment; filename=Schedule-{0}-log.pdf'.format(pk)
-    response['Content-Length'] = len(response.content)
-    return response
+    return schedule_pdf(request, pk, images, comments, uidb64, token, only_table=False)
 
 
 def export_pdf_table(request, pk, images=False, comments=False, uidb64=None, token=None):
     '''
     Show the workout schedule
     '''
+    return schedule_pdf(request, pk, images, comments, uidb64, token, only_table=True)
+
+
+def schedule_pdf(request, pk, images, comments, uidb64, token, only_table):
+    '''
+    Loads the schedule and returns its PDF, from the cache if possible
+
+    The workouts of all steps are loaded at once and the tables of a workout
+    are only built once, even if it is used in several steps.
+    '''
     user = request.user
 
     comments = bool(int(comments))
@@ -183,50 +148,98 @@ def export_pdf_table(request, pk, images=False, comments=False, uidb64=None, tok
             return HttpResponseForbidden()
         schedule = get_object_or_404(Schedule, pk=pk, user=user)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    # and use it to the create the PDF using it as a file like object
-    response = HttpResponse(content_type='application/pdf')
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject='Schedule for {0}'.format(request.user.username))
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph(u'<para align="center">{0}</para>'.format(schedule), styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Iterate through the Workout and render the training days
-    for step in schedule.schedulestep_set.all():
-        p = Paragraph(u'<para>{0} {1}</para>'.format(step.duration, _('Weeks')),
+    steps = list(schedule.schedulestep_set.select_related('workout'))
+    workouts = {}
+    for step in steps:
+        if step.workout_id not in workouts:
+            workouts[step.workout_id] = step.workout.canonical_representation
+
+    url = request.build_absolute_uri(reverse('manager:schedule:view',
+                                             kwargs={'pk': schedule.id}))
+    key = cache_mapper.get_pdf_key('schedule',
+                                   schedule.pk,
+                                   schedule,
+                                   [(step.workout_id, step.duration) for step in steps],
+                                   sorted([(workout_id, workouts[workout_id]['version'])
+                                           for workout_id in workouts]),
+                                   only_table,
+                                   images,
+                                   comments,
+                                   translation.get_language(),
+                                   datetime.date.today(),
+                                   url)
+
+    # Everything the rendering needs is collected here, so it does not need
+    # to access the database, even when it runs in a worker thread
+    day_list = [day for workout_id in workouts for day in workouts[workout_id]['day_list']]
+    nr_of_rows = sum([len(set_obj['exercise_list'])
+                      for step in steps
+                      for day in workouts[step.workout_id]['day_list']
+                      for set_obj in day['set_list']])
+    main_images = get_main_images(day_list) if images else None
+    subject = 'Schedule for {0}'.format(schedule.user.username)
+    description = six.text_type(schedule)
+
+    def render():
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer,
+                                pagesize=A4,
+                                leftMargin=cm,
+                                rightMargin=cm,
+                                topMargin=0.5 * cm,
+                                bottomMargin=0.5 * cm,
+                                title=_('Workout'),
+                                author='wger Workout Manager',
+                                subject=subject)
+
+        # container for the 'Flowable' objects
+        elements = []
+
+        # Set the title
+        p = Paragraph(u'<para align="center">{0}</para>'.format(description),
                       styleSheet["HeaderBold"])
         elements.append(p)
         elements.append(Spacer(10 * cm, 0.5 * cm))
 
-        for day in step.workout.canonical_representation['day_list']:
-            elements.append(
-                render_workout_day(day, images=images, comments=comments, nr_of_weeks=7,
-                                   only_table=True))
+        # Iterate through the Workout and render the training days, the
+        # tables of workouts used in more than one step are reused
+        workout_tables = {}
+        for step in steps:
+            p = Paragraph(u'<para>{0} {1}</para>'.format(step.duration, _('Weeks')),
+                          styleSheet["HeaderBold"])
+            elements.append(p)
             elements.append(Spacer(10 * cm, 0.5 * cm))
 
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    url = reverse('manager:schedule:view', kwargs={'pk': schedule.id})
-    elements.append(render_footer(request.build_absolute_uri(url)))
+            if step.workout_id not in workout_tables:
+                workout_tables[step.workout_id] = [
+                    render_workout_day(day,
+                                       images=images,
+                                       comments=comments,
+                                       nr_of_weeks=7,
+                                       only_table=only_table,
+                                       main_images=main_images)
+                    for day in workouts[step.workout_id]['day_list']]
+
+            for table in workout_tables[step.workout_id]:
+                elements.append(table)
+                elements.append(Spacer(10 * cm, 0.5 * cm))
+
+        # Footer, date and info
+        elements.append(Spacer(10 * cm, 0.5 * cm))
+        elements.append(render_footer(url))
+
+        doc.build(elements)
+        return buffer.getvalue()
+
+    try:
+        pdf = render_pdf(key, render, background=images or nr_of_rows > PDF_BACKGROUND_MIN_ROWS)
+    except PdfRenderingError:
+        return pdf_failed_response()
+    if pdf is None:
+        return pdf_pending_response()
 
-    # write the document and send the response to the browser
-    doc.build(elements)
-    response['Content-Disposition'] = 'attachment; filename=Schedule-{0}-table.pdf'.format(pk)
-    response['Content-Length'] = len(response.content)
-    return response
+    filename = 'Schedule-{0}-{1}.pdf'.format(pk, 'table' if only_table else 'log')
+    return pdf_response(pdf, filename)
 
 
 @login_required
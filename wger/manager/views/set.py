@@ -36,6 +36,7 @@ from wger.manager.forms import (
     SettingForm
 )
 from wger.utils.language import load_item_languages
+from wger.utils.owner import get_object_owner_id
 from wger.config.models import LanguageConfig
 
 logger = logging.getLogger(__name__)
@@ -61,7 +62,7 @@ def create(request, day_pk):
     settings formsets
     '''
     day = get_object_or_404(Day, pk=day_pk)
-    if day.get_owner_object().user != request.user:
+    if get_object_owner_id(day, request) != request.user.pk:
         return HttpResponseForbidden()
 
     # Select the correct form depending on the flavour of the request.
@@ -115,7 +116,7 @@ def create(request, day_pk):
                     instance.save()
 
             return HttpResponseRedirect(reverse('manager:workout:view',
-                                        kwargs={'pk': day.get_owner_object().id}))
+                                        kwargs={'pk': day.training_id}))
         else:
             logger.debug(form.errors)
 
@@ -159,10 +160,10 @@ def delete(request, pk):
     set_obj = get_object_or_404(Set, pk=pk)
 
     # Check if the user is the owner of the object
-    if set_obj.get_owner_object().user == request.user:
+    if get_object_owner_id(set_obj, request) == request.user.pk:
         set_obj.delete()
         return HttpResponseRedirect(reverse('manager:workout:view',
-                                            kwargs={'pk': set_obj.get_owner_object().id}))
+                                            kwargs={'pk': set_obj.exerciseday.training_id}))
     else:
         return HttpResponseForbidden()
 
@@ -173,7 +174,7 @@ def edit(request, pk):
     Edit a set (its settings actually)
     '''
     set_obj = get_object_or_404(Set, pk=pk)
-    if set_obj.get_owner_object().user != request.user:
+    if get_object_owner_id(set_obj, request) != request.user.pk:
         return HttpResponseForbidden()
 
     formsets = []
@@ -204,7 +205,7 @@ def edit(request, pk):
                         instance.set
 
                         # Check that we are allowed to do this
-                        if instance.get_owner_object().user != request.user:
+                        if get_object_owner_id(instance, request) != request.user.pk:
                             return HttpResponseForbidden()
 
                         instance.save()
@@ -217,7 +218,7 @@ def edit(request, pk):
                         instance.save()
 
             return HttpResponseRedirect(reverse('manager:workout:view',
-                                        kwargs={'pk': set_obj.get_owner_object().id}))
+                                        kwargs={'pk': set_obj.exerciseday.training_id}))
 
     # Other context we need
     context = {}
@@ -34,10 +34,10 @@ from wger.core.models import (
 from wger.manager.models import (
     Workout,
     WorkoutSession,
-    WorkoutLog,
     Schedule,
     Day
 )
+from wger.manager.gym_mode import get_steps
 from wger.manager.forms import (
     WorkoutForm,
     WorkoutSessionHiddenFieldsForm,
@@ -48,6 +48,7 @@ from wger.utils.generic_views import (
     WgerDeleteMixin
 )
 from wger.utils.helpers import make_token
+from wger.utils.cache import cache_mapper, local_cache
 
 
 logger = logging.getLogger(__name__)
@@ -249,38 +250,6 @@ class WorkoutEditView(WgerFormMixin, LoginRequiredMixin, UpdateView):
         return context
 
 
-class LastWeightHelper:
-    '''
-    Small helper class to retrieve the last workout log for a certain
-    user, exercise and repetition combination.
-    '''
-    user = None
-    last_weight_list = {}
-
-    def __init__(self, user):
-        self.user = user
-
-    def get_last_weight(self, exercise, reps, default_weight):
-        '''
-        Returns an emtpy string if no entry is found
-
-        :param exercise:
-        :param reps:
-        :param default_weight:
-        :return: WorkoutLog or '' if none is found
-        '''
-        key = (self.user.pk, exercise.pk, reps, default_weight)
-        if self.last_weight_list.get(key) is None:
-            last_log = WorkoutLog.objects.filter(user=self.user,
-                                                 exercise=exercise,
-                                                 reps=reps).order_by('-date')
-            default_weight = '' if default_weight is None else default_weight
-            weight = last_log[0].weight if last_log.exists() else default_weight
-            self.last_weight_list[key] = weight
-
-        return self.last_weight_list.get(key)
-
-
 @login_required
 def timer(request, day_pk):
     '''
@@ -290,84 +259,18 @@ def timer(request, day_pk):
     day = get_object_or_404(Day, pk=day_pk, training__user=request.user)
     canonical_day = day.canonical_representation
     context = {}
-    step_list = []
-    last_log = LastWeightHelper(request.user)
-
-    # Go through the workout day and create the individual 'pages'
-    for set_dict in canonical_day['set_list']:
-
-        if not set_dict['is_superset']:
-            for exercise_dict in set_dict['exercise_list']:
-                exercise = exercise_dict['obj']
-                for key, element in enumerate(exercise_dict['reps_list']):
-                    reps = exercise_dict['reps_list'][key]
-                    rep_unit = exercise_dict['repetition_units'][key]
-                    weight_unit = exercise_dict['weight_units'][key]
-                    default_weight = last_log.get_last_weight(exercise,
-                                                              reps,
-                                                              exercise_dict['weight_list'][key])
-
-                    step_list.append({'current_step': uuid.uuid4().hex,
-                                      'step_percent': 0,
-                                      'step_nr': len(step_list) + 1,
-                                      'exercise': exercise,
-                                      'type': 'exercise',
-                                      'reps': reps,
-                                      'rep_unit': rep_unit,
-                                      'weight': default_weight,
-                                      'weight_unit': weight_unit})
-                    if request.user.userprofile.timer_active:
-                        step_list.append({'current_step': uuid.uuid4().hex,
-                                          'step_percent': 0,
-                                          'step_nr': len(step_list) + 1,
-                                          'type': 'pause',
-                                          'time': request.user.userprofile.timer_pause})
-
-        # Supersets need extra work to group the exercises and reps together
-        else:
-            total_reps = len(set_dict['exercise_list'][0]['reps_list'])
-            for i in range(0, total_reps):
-                for exercise_dict in set_dict['exercise_list']:
-                    reps = exercise_dict['reps_list'][i]
-                    rep_unit = exercise_dict['repetition_units'][i]
-                    weight_unit = exercise_dict['weight_units'][i]
-                    default_weight = exercise_dict['weight_list'][i]
-                    exercise = exercise_dict['obj']
-
-                    step_list.append({'current_step': uuid.uuid4().hex,
-                                      'step_percent': 0,
-                                      'step_nr': len(step_list) + 1,
-                                      'exercise': exercise,
-                                      'type': 'exercise',
-                                      'reps': reps,
-                                      'rep_unit': rep_unit,
-                                      'weight_unit': weight_unit,
-                                      'weight': last_log.get_last_weight(exercise,
-                                                                         reps,
-                                                                         default_weight)})
-
-                if request.user.userprofile.timer_active:
-                    step_list.append({'current_step': uuid.uuid4().hex,
-                                      'step_percent': 0,
-                                      'step_nr': len(step_list) + 1,
-                                      'type': 'pause',
-                                      'time': 90})
-
-    # Remove the last pause step as it is not needed. If the list is empty,
-    # because the user didn't add any repetitions to any exercise, do nothing
-    try:
-        step_list.pop()
-    except IndexError:
-        pass
+    step_list = get_steps(canonical_day, request.user)
 
     # Go through the page list and calculate the correct value for step_percent
     for i, s in enumerate(step_list):
+        step_list[i]['current_step'] = uuid.uuid4().hex
+        step_list[i]['step_nr'] = i + 1
         step_list[i]['step_percent'] = (i + 1) * 100.0 / len(step_list)
 
     # Depending on whether there is already a workout session for today, update
     # the current one or create a new one (this will be the most usual case)
-    if WorkoutSession.objects.filter(user=request.user, date=datetime.date.today()).exists():
-        session = WorkoutSession.objects.get(user=request.user, date=datetime.date.today())
+    session = WorkoutSession.objects.filter(user=request.user, date=datetime.date.today()).first()
+    if session:
         url = reverse('manager:session:edit', kwargs={'pk': session.pk})
         session_form = WorkoutSessionHiddenFieldsForm(instance=session)
     else:
@@ -385,6 +288,10 @@ def timer(request, day_pk):
     context['workout'] = day.training
     context['session_form'] = session_form
     context['form_action'] = url
-    context['weight_units'] = WeightUnit.objects.all()
-    context['repetition_units'] = RepetitionUnit.objects.all()
+    context['weight_units'] = local_cache.get_or_set(cache_mapper.WEIGHT_UNITS,
+                                                     'all',
+                                                     lambda: list(WeightUnit.objects.all()))
+    context['repetition_units'] = local_cache.get_or_set(cache_mapper.REPETITION_UNITS,
+                                                         'all',
+                                                         lambda: list(RepetitionUnit.objects.all()))
     return render(request, 'workout/timer.html', context)
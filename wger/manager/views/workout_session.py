@@ -37,6 +37,7 @@ from wger.utils.generic_views import (
     WgerFormMixin,
     WgerDeleteMixin
 )
+from wger.utils.owner import get_owner_id
 
 
 logger = logging.getLogger(__name__)
@@ -89,8 +90,7 @@ class WorkoutSessionAddView(WgerFormMixin, LoginRequiredMixin, CreateView):
         '''
         Check for ownership
         '''
-        workout = Workout.objects.get(pk=kwargs['workout_pk'])
-        if workout.get_owner_object().user != request.user:
+        if get_owner_id(Workout, kwargs['workout_pk'], request) != request.user.pk:
             return HttpResponseForbidden()
 
         if not self.get_date():
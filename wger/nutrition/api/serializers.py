@@ -24,9 +24,10 @@ from wger.nutrition.models import (
     Meal,
     Ingredient
 )
+from wger.utils.serializers import WgerModelSerializer
 
 
-class NutritionPlanSerializer(serializers.ModelSerializer):
+class NutritionPlanSerializer(WgerModelSerializer):
     '''
     Nutritional plan serializer
     '''
@@ -36,16 +37,16 @@ class NutritionPlanSerializer(serializers.ModelSerializer):
         exclude = ('user',)
 
 
-class IngredientWeightUnitSerializer(serializers.ModelSerializer):
+class IngredientSerializer(WgerModelSerializer):
     '''
-    IngredientWeightUnit serializer
+    Ingredient serializer
     '''
 
     class Meta:
-        model = IngredientWeightUnit
+        model = Ingredient
 
 
-class WeightUnitSerializer(serializers.ModelSerializer):
+class WeightUnitSerializer(WgerModelSerializer):
     '''
     WeightUnit serializer
     '''
@@ -54,7 +55,17 @@ class WeightUnitSerializer(serializers.ModelSerializer):
         model = WeightUnit
 
 
-class MealItemSerializer(serializers.ModelSerializer):
+class IngredientWeightUnitSerializer(WgerModelSerializer):
+    '''
+    IngredientWeightUnit serializer
+    '''
+
+    class Meta:
+        model = IngredientWeightUnit
+        expandable_fields = {'unit': (WeightUnitSerializer, {})}
+
+
+class MealItemSerializer(WgerModelSerializer):
     '''
     MealItem serializer
     '''
@@ -63,9 +74,11 @@ class MealItemSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MealItem
+        expandable_fields = {'ingredient': (IngredientSerializer, {}),
+                             'weight_unit': (IngredientWeightUnitSerializer, {})}
 
 
-class MealSerializer(serializers.ModelSerializer):
+class MealSerializer(WgerModelSerializer):
     '''
     Meal serializer
     '''
@@ -74,12 +87,3 @@ class MealSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Meal
-
-
-class IngredientSerializer(serializers.ModelSerializer):
-    '''
-    Ingredient serializer
-    '''
-
-    class Meta:
-        model = Ingredient
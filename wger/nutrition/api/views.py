@@ -30,6 +30,7 @@ from wger.nutrition.api.serializers import (
 )
 from wger.nutrition.forms import UnitChooserForm
 from wger.nutrition.models import (
+    INGREDIENT_TABLES,
     Ingredient,
     Meal,
     MealItem,
@@ -38,16 +39,21 @@ from wger.nutrition.models import (
     NutritionPlan
 )
 from wger.utils.language import load_ingredient_languages, load_language
-from wger.utils.viewsets import WgerOwnerObjectModelViewSet
+from wger.utils.pagination import WgerCursorPagination
+from wger.utils.viewsets import WgerConditionalMixin, WgerOwnerObjectModelViewSet
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for ingredient objects
     '''
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
-    ordering_fields = '__all__'
+    cache_tables = INGREDIENT_TABLES
+    pagination_class = WgerCursorPagination
+    ordering = 'id'
+    ordering_fields = ('id',
+                       'name')
     filter_fields = ('carbohydrates',
                      'carbohydrates_sugar',
                      'creation_date',
@@ -144,24 +150,28 @@ def search(request):
     return Response(json_response)
 
 
-class WeightUnitViewSet(viewsets.ReadOnlyModelViewSet):
+class WeightUnitViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for weight unit objects
     '''
     queryset = WeightUnit.objects.all()
     serializer_class = WeightUnitSerializer
+    cache_tables = (WeightUnit, )
     ordering_fields = '__all__'
     filter_fields = ('language',
                      'name')
 
 
-class IngredientWeightUnitViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientWeightUnitViewSet(WgerConditionalMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for many-to-many table ingredient-weight unit objects
     '''
     queryset = IngredientWeightUnit.objects.all()
     serializer_class = IngredientWeightUnitSerializer
-    ordering_fields = '__all__'
+    cache_tables = (IngredientWeightUnit, WeightUnit)
+    pagination_class = WgerCursorPagination
+    ordering = 'id'
+    ordering_fields = ('id', )
     filter_fields = ('amount',
                      'gram',
                      'ingredient',
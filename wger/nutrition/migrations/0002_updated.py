@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meal',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='mealitem',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='nutritionplan',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+    ]
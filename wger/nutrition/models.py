@@ -33,11 +33,11 @@ from django.utils.translation import ugettext_lazy as _
 from django.utils import translation
 from django.conf import settings
 
-from wger.core.models import Language
+from wger.core.models import Language, License
 from wger.utils.constants import TWOPLACES
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import cache_mapper, reset_table_version
 from wger.utils.fields import Html5TimeField
-from wger.utils.models import AbstractLicenseModel
+from wger.utils.models import AbstractChangeTrackingModel, AbstractLicenseModel
 from wger.utils.units import AbstractWeight
 from wger.weight.models import WeightEntry
 
@@ -59,7 +59,7 @@ logger = logging.getLogger(__name__)
 
 
 @python_2_unicode_compatible
-class NutritionPlan(models.Model):
+class NutritionPlan(AbstractChangeTrackingModel, models.Model):
     '''
     A nutrition plan
     '''
@@ -160,6 +160,12 @@ class NutritionPlan(models.Model):
         Returns None if there are no entries.
         '''
         target = self.creation_date
+
+        # If there are no newer entries, the last one is the closest
+        last_entry = self.user.userprofile.get_latest_weight_entry()
+        if last_entry is None or last_entry.date <= target:
+            return last_entry
+
         closest_entry_gte = WeightEntry.objects.filter(user=self.user) \
             .filter(date__gte=target).order_by('date').first()
         closest_entry_lte = WeightEntry.objects.filter(user=self.user) \
@@ -171,6 +177,8 @@ class NutritionPlan(models.Model):
         else:
             return closest_entry_lte
 
+    owner_field = 'user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -258,7 +266,8 @@ class Ingredient(AbstractLicenseModel, models.Model):
                                    editable=False)
 
     name = models.CharField(max_length=200,
-                            verbose_name=_('Name'),)
+                            verbose_name=_('Name'),
+                            db_index=True)
 
     energy = models.IntegerField(verbose_name=_('Energy'),
                                  help_text=_('In kcal per 100g'))
@@ -376,6 +385,15 @@ class Ingredient(AbstractLicenseModel, models.Model):
 
         super(Ingredient, self).save(*args, **kwargs)
         cache.delete(cache_mapper.get_ingredient_key(self.id))
+        reset_table_version(Ingredient)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset the cache
+        '''
+        cache.delete(cache_mapper.get_ingredient_key(self.id))
+        super(Ingredient, self).delete(*args, **kwargs)
+        reset_table_version(Ingredient)
 
     def __str__(self):
         '''
@@ -467,6 +485,20 @@ class WeightUnit(models.Model):
         '''
         return self.name
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(WeightUnit, self).save(*args, **kwargs)
+        reset_table_version(WeightUnit)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(WeightUnit, self).delete(*args, **kwargs)
+        reset_table_version(WeightUnit)
+
     def get_owner_object(self):
         '''
         Weight unit has no owner information
@@ -507,9 +539,23 @@ class IngredientWeightUnit(models.Model):
                                        self.unit.name,
                                        self.gram)
 
+    def save(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(IngredientWeightUnit, self).save(*args, **kwargs)
+        reset_table_version(IngredientWeightUnit)
+
+    def delete(self, *args, **kwargs):
+        '''
+        Reset the table version
+        '''
+        super(IngredientWeightUnit, self).delete(*args, **kwargs)
+        reset_table_version(IngredientWeightUnit)
+
 
 @python_2_unicode_compatible
-class Meal(models.Model):
+class Meal(AbstractChangeTrackingModel, models.Model):
     '''
     A meal
     '''
@@ -534,6 +580,8 @@ class Meal(models.Model):
         '''
         return u"{0} Meal".format(self.order)
 
+    owner_field = 'plan__user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -570,7 +618,7 @@ class Meal(models.Model):
 
 
 @python_2_unicode_compatible
-class MealItem(models.Model):
+class MealItem(AbstractChangeTrackingModel, models.Model):
     '''
     An item (component) of a meal
     '''
@@ -600,6 +648,8 @@ class MealItem(models.Model):
         '''
         return u"{0}g ingredient {1}".format(self.amount, self.ingredient_id)
 
+    owner_field = 'meal__plan__user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -675,3 +725,11 @@ class MealItem(models.Model):
             nutritional_info[i] = Decimal(nutritional_info[i]).quantize(TWOPLACES)
 
         return nutritional_info
+
+
+INGREDIENT_TABLES = (Ingredient,
+                     IngredientWeightUnit,
+                     WeightUnit,
+                     Language,
+                     License)
+'''Models whose data is shown by the ingredient pages and API endpoints'''
@@ -17,7 +17,7 @@ from django.core.urlresolvers import reverse
 
 from wger.core.models import Language
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
-from wger.nutrition.models import NutritionPlan
+from wger.nutrition.models import MealItem, NutritionPlan
 from wger.utils.helpers import make_token
 
 
@@ -116,3 +116,22 @@ class NutritionalPlanPdfExportTestCase(WorkoutManagerTestCase):
         self.user_login('admin')
         self.export_pdf(fail=True)
         self.export_pdf_token()
+
+    def test_export_pdf_cache(self):
+        '''
+        Tests that the cached PDF is used until the plan changes
+        '''
+
+        self.user_login('test')
+        url = reverse('nutrition:plan:export-pdf', kwargs={'id': 4})
+        response = self.client.get(url)
+
+        # The meals and their items are not loaded again
+        with self.assertNumQueries(12):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content, response.content)
+
+        item = MealItem.objects.filter(meal__plan=4).first()
+        item.amount += 1
+        item.save()
+        self.assertNotEqual(self.client.get(url).content, response.content)
@@ -32,14 +32,14 @@ from django.views.generic import (
 )
 
 from wger.nutrition.forms import UnitChooserForm
-from wger.nutrition.models import Ingredient
+from wger.nutrition.models import INGREDIENT_TABLES, Ingredient
 from wger.utils.generic_views import (
     WgerFormMixin,
     WgerDeleteMixin
 )
 from wger.utils.constants import PAGINATION_OBJECTS_PER_PAGE
 from wger.utils.language import load_language, load_ingredient_languages
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import cache_mapper, condition_on_tables
 
 
 logger = logging.getLogger(__name__)
@@ -78,6 +78,7 @@ class IngredientListView(ListView):
         return context
 
 
+@condition_on_tables(INGREDIENT_TABLES, anonymous_only=True)
 def view(request, id, slug=None):
     template_data = {}
 
@@ -17,16 +17,18 @@
 import six
 import logging
 import datetime
+from io import BytesIO
 
 from django.shortcuts import render, get_object_or_404
 from django.http import (
-    HttpResponse,
     HttpResponseForbidden,
     HttpResponseRedirect
 )
 from django.template.context_processors import csrf
 from django.core.urlresolvers import reverse, reverse_lazy
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Max
+from django.utils import translation
 from django.utils.translation import ugettext_lazy, ugettext as _
 from django.views.generic import DeleteView, UpdateView
 
@@ -41,13 +43,26 @@ from reportlab.platypus import (
 
 from wger.nutrition.models import (
     NutritionPlan,
+    Meal,
+    Ingredient,
+    IngredientWeightUnit,
+    WeightUnit,
     MEALITEM_WEIGHT_GRAM,
     MEALITEM_WEIGHT_UNIT
 )
 from wger import get_version
+from wger.utils.cache import cache_mapper, get_tables_version
 from wger.utils.generic_views import WgerFormMixin, WgerDeleteMixin
 from wger.utils.helpers import check_token, make_token
-from wger.utils.pdf import styleSheet
+from wger.utils.pdf import (
+    styleSheet,
+    render_pdf,
+    pdf_response,
+    pdf_pending_response,
+    pdf_failed_response,
+    PdfRenderingError,
+    PDF_BACKGROUND_MIN_ROWS
+)
 from wger.utils.language import load_language
 
 
@@ -216,103 +231,158 @@ def export_pdf(request, id, uidb64=None, token=None):
             return HttpResponseForbidden()
         plan = get_object_or_404(NutritionPlan, pk=id, user=request.user)
 
-    plan_data = plan.get_nutritional_values()
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
-
-    # Create the PDF object, using the response object as its "file."
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            title=_('Nutrition plan'),
-                            author='wger Workout Manager',
-                            subject=_('Nutritional plan %s') % request.user.username)
-
-    # Background colour for header
-    # Reportlab doesn't use the HTML hexadecimal format, but has a range of
-    # 0 till 1, so we have to convert here.
-    header_colour = colors.Color(int('73', 16) / 255.0,
-                                 int('8a', 16) / 255.0,
-                                 int('5f', 16) / 255.0)
-
-    # container for the 'Flowable' objects
-    elements = []
-    data = []
-
-    # Iterate through the Plan
-    meal_markers = []
-    ingredient_markers = []
-
-    # Meals
-    i = 0
-    for meal in plan.meal_set.select_related():
-        i += 1
-
-        meal_markers.append(len(data))
-
-        if not meal.time:
-            p = Paragraph(u'<para align="center"><strong>{nr} {meal_nr}</strong></para>'
-                          .format(nr=_('Nr.'), meal_nr=i),
-                          styleSheet["Normal"])
+    # The version only needs the plan, the last changes to its meals and items
+    # and the other data the nutritional values depend on, so that cached PDFs
+    # are found without loading the whole plan
+    contents = Meal.objects.filter(plan=plan).aggregate(meals=Count('id', distinct=True),
+                                                        meals_updated=Max('updated'),
+                                                        items=Count('mealitem'),
+                                                        items_updated=Max('mealitem__updated'))
+    weight_entry = plan.get_closest_weight_entry()
+    version = (plan.updated,
+               plan.description,
+               sorted(contents.items()),
+               plan.user.userprofile.use_metric,
+               (weight_entry.pk, weight_entry.weight) if weight_entry else None,
+               get_tables_version((Ingredient, IngredientWeightUnit, WeightUnit)))
+    nr_of_rows = contents['meals'] + contents['items']
+
+    url = request.build_absolute_uri(reverse('nutrition:plan:view', kwargs={'id': plan.id}))
+    key = cache_mapper.get_pdf_key('nutrition-plan',
+                                   plan.pk,
+                                   version,
+                                   translation.get_language(),
+                                   datetime.date.today(),
+                                   url)
+    subject = _('Nutritional plan %s') % plan.user.username
+
+    def render():
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer,
+                                pagesize=A4,
+                                title=_('Nutrition plan'),
+                                author='wger Workout Manager',
+                                subject=subject)
+
+        # Background colour for header
+        # Reportlab doesn't use the HTML hexadecimal format, but has a range of
+        # 0 till 1, so we have to convert here.
+        header_colour = colors.Color(int('73', 16) / 255.0,
+                                     int('8a', 16) / 255.0,
+                                     int('5f', 16) / 255.0)
+
+        # container for the 'Flowable' objects
+        elements = []
+        data = []
+
+        # Iterate through the Plan
+        meal_markers = []
+
+        # Meals
+        i = 0
+        for meal in plan.meal_set.select_related():
+            i += 1
+            meal_markers.append(len(data))
+
+            if not meal.time:
+                p = Paragraph(u'<para align="center"><strong>{nr} {meal_nr}</strong></para>'
+                              .format(nr=_('Nr.'), meal_nr=i),
+                              styleSheet["Normal"])
+            else:
+                p = Paragraph(u'<para align="center"><strong>'
+                              u'{nr} {meal_nr} - {meal_time}'
+                              u'</strong></para>'
+                              .format(nr=_('Nr.'),
+                                      meal_nr=i,
+                                      meal_time=meal.time.strftime("%H:%M")),
+                              styleSheet["Normal"])
+            data.append([p])
+
+            # Ingredients
+            for item in meal.mealitem_set.select_related():
+                if item.get_unit_type() == MEALITEM_WEIGHT_GRAM:
+                    unit_name = 'g'
+                else:
+                    unit_name = ' ' + item.weight_unit.unit.name
+
+                data.append([Paragraph(u"{0}{1}".format(item.amount, unit_name),
+                                       styleSheet["Normal"]),
+                             Paragraph(u'<para>{0}</para>'.format(item.ingredient.name),
+                                       styleSheet["Normal"])])
+
+        # Set general table styles
+        table_style = []
+
+        # Set specific styles, e.g. background for title cells
+        for marker in meal_markers:
+            # Set background colour for headings
+            table_style.append(('BACKGROUND', (0, marker), (-1, marker), header_colour))
+            table_style.append(('BOX', (0, marker), (-1, marker), 1.25, colors.black))
+
+            # Make the headings span the whole width
+            table_style.append(('SPAN', (0, marker), (-1, marker)))
+
+        # has the plan any data?
+        if data:
+            t = Table(data, style=table_style)
+
+            # Manually set the width of the columns
+            t._argW[0] = 2.5 * cm
+
+        # There is nothing to output
         else:
-            p = Paragraph(u'<para align="center"><strong>'
-                          u'{nr} {meal_nr} - {meal_time}'
-                          u'</strong></para>'
-                          .format(nr=_('Nr.'), meal_nr=i, meal_time=meal.time.strftime("%H:%M")),
+            t = Paragraph(_('<i>This is an empty plan, what did you expect on the PDF?</i>'),
                           styleSheet["Normal"])
-        data.append([p])
-
-        # Ingredients
-        for item in meal.mealitem_set.select_related():
-            ingredient_markers.append(len(data))
 
-            p = Paragraph(u'<para>{0}</para>'.format(item.ingredient.name), styleSheet["Normal"])
-            if item.get_unit_type() == MEALITEM_WEIGHT_GRAM:
-                unit_name = 'g'
-            else:
-                unit_name = ' ' + item.weight_unit.unit.name
-
-            data.append([Paragraph(u"{0}{1}".format(item.amount, unit_name), styleSheet["Normal"]),
-                         p])
-
-    # Set general table styles
-    table_style = []
+        # Set the title (if available)
+        if plan.description:
+            p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
+                          {'description': plan.description},
+                          styleSheet["Bold"])
+            elements.append(p)
 
-    # Set specific styles, e.g. background for title cells
-    for marker in meal_markers:
-        # Set background colour for headings
-        table_style.append(('BACKGROUND', (0, marker), (-1, marker), header_colour))
-        table_style.append(('BOX', (0, marker), (-1, marker), 1.25, colors.black))
+            # Filler
+            elements.append(Spacer(10 * cm, 0.5 * cm))
 
-        # Make the headings span the whole width
-        table_style.append(('SPAN', (0, marker), (-1, marker)))
+        # append the table to the document
+        elements.append(t)
+        elements.append(Paragraph('<para>&nbsp;</para>', styleSheet["Normal"]))
+        elements.append(render_nutritional_data(plan.get_nutritional_values()))
 
-    # has the plan any data?
-    if data:
-        t = Table(data, style=table_style)
-
-        # Manually set the width of the columns
-        t._argW[0] = 2.5 * cm
-
-    # There is nothing to output
-    else:
-        t = Paragraph(_('<i>This is an empty plan, what did you expect on the PDF?</i>'),
+        # Footer, date and info
+        elements.append(Spacer(10 * cm, 0.5 * cm))
+        created = datetime.date.today().strftime("%d.%m.%Y")
+        p = Paragraph('''<para align="left">
+                            %(date)s -
+                            <a href="%(url)s">%(url)s</a> -
+                            %(created)s
+                            %(version)s
+                        </para>''' %
+                      {'date': _("Created on the <b>%s</b>") % created,
+                       'created': "wger Workout Manager",
+                       'version': get_version(),
+                       'url': url, },
                       styleSheet["Normal"])
-
-    # Set the title (if available)
-    if plan.description:
-        p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
-                      {'description': plan.description},
-                      styleSheet["Bold"])
         elements.append(p)
+        doc.build(elements)
+        return buffer.getvalue()
 
-        # Filler
-        elements.append(Spacer(10 * cm, 0.5 * cm))
+    try:
+        pdf = render_pdf(key, render, background=nr_of_rows > PDF_BACKGROUND_MIN_ROWS)
+    except PdfRenderingError:
+        return pdf_failed_response()
+    if pdf is None:
+        return pdf_pending_response()
+    return pdf_response(pdf, 'nutritional-plan.pdf')
 
-    # append the table to the document
-    elements.append(t)
-    elements.append(Paragraph('<para>&nbsp;</para>', styleSheet["Normal"]))
 
+def render_nutritional_data(plan_data):
+    '''
+    Renders the table with the nutritional calculations of a plan
+
+    :param plan_data: the plan's values, as returned by get_nutritional_values
+    :return: a Table object
+    '''
     # Create table with nutritional calculations
     data = []
     data.append([Paragraph(u'<para align="center">{0}</para>'.format(_('Nutritional data')),
@@ -360,26 +430,4 @@ def export_pdf(request, id, uidb64=None, token=None):
     table_style.append(('SPAN', (1, 9), (-1, 9)))  # Sodium
     t = Table(data, style=table_style)
     t._argW[0] = 5 * cm
-    elements.append(t)
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    created = datetime.date.today().strftime("%d.%m.%Y")
-    url = reverse('nutrition:plan:view', kwargs={'id': plan.id})
-    p = Paragraph('''<para align="left">
-                        %(date)s -
-                        <a href="%(url)s">%(url)s</a> -
-                        %(created)s
-                        %(version)s
-                    </para>''' %
-                  {'date': _("Created on the <b>%s</b>") % created,
-                   'created': "wger Workout Manager",
-                   'version': get_version(),
-                   'url': request.build_absolute_uri(url), },
-                  styleSheet["Normal"])
-    elements.append(p)
-    doc.build(elements)
-
-    response['Content-Disposition'] = 'attachment; filename=nutritional-plan.pdf'
-    response['Content-Length'] = len(response.content)
-    return response
+    return t
@@ -45,6 +45,15 @@ MEDIA_URL = '/media/'
 # Allow all hosts to access the application. Change if used in production.
 ALLOWED_HOSTS = '*'
 
+# If you run more than one worker process (gunicorn, mod_wsgi, etc.), use a cache
+# shared by all of them, otherwise each process keeps its own (stale) copy.
+#CACHES['default'] = {{
+#    'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+#    'LOCATION': '127.0.0.1:11211',
+#    'KEY_PREFIX': 'wger',
+#    'TIMEOUT': 30 * 24 * 60 * 60,
+#}}
+
 # This might be a good idea if you setup memcached
 #SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 
@@ -279,6 +279,7 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'wger-cache',
+        'KEY_PREFIX': 'wger',
         'TIMEOUT': 30 * 24 * 60 * 60,  # Cache for a month
     }
 }
@@ -340,7 +341,9 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.TokenAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ('rest_framework.filters.DjangoFilterBackend',
-                                'rest_framework.filters.OrderingFilter',)
+                                'rest_framework.filters.OrderingFilter',
+                                'wger.utils.filters.ModifiedSinceFilter',
+                                'wger.utils.filters.ExpandFilter',)
 }
 
 
@@ -368,5 +371,6 @@ WGER_SETTINGS = {
     'ALLOW_REGISTRATION': True,
     'ALLOW_GUEST_USERS': True,
     'EMAIL_FROM': 'wger Workout Manager <wger@example.com>',
-    'TWITTER': False
+    'TWITTER': False,
+    'PDF_BACKGROUND_RENDERING': True
 }
@@ -92,6 +92,15 @@ router.register(r'day', manager_api_views.DayViewSet, base_name='day')
 router.register(r'set', manager_api_views.SetViewSet, base_name='Set')
 router.register(r'setting', manager_api_views.SettingViewSet, base_name='Setting')
 router.register(r'workoutlog', manager_api_views.WorkoutLogViewSet, base_name='workoutlog')
+router.register(r'exercisestatistics',
+                manager_api_views.ExerciseDayStatisticsViewSet,
+                base_name='exercisestatistics')
+router.register(r'musclestatistics',
+                manager_api_views.MuscleWeekStatisticsViewSet,
+                base_name='musclestatistics')
+router.register(r'personalrecord',
+                manager_api_views.PersonalRecordViewSet,
+                base_name='personalrecord')
 
 # Core app
 router.register(r'userprofile', core_api_views.UserProfileViewSet, base_name='userprofile')
@@ -100,6 +109,7 @@ router.register(r'daysofweek', core_api_views.DaysOfWeekViewSet, base_name='days
 router.register(r'license', core_api_views.LicenseViewSet, base_name='license')
 router.register(r'setting-repetitionunit', core_api_views.RepetitionUnitViewSet, base_name='setting-repetition-unit')
 router.register(r'setting-weightunit', core_api_views.WeightUnitViewSet, base_name='setting-weight-unit')
+router.register(r'deletedobject', core_api_views.DeletedObjectViewSet, base_name='deletedobject')
 
 # Exercises app
 router.register(r'exercise', exercises_api_views.ExerciseViewSet, base_name='exercise')
@@ -168,6 +178,9 @@ urlpatterns += [
     url(r'^api/v2/ingredient/search/$',
         nutrition_api_views.search,
         name='ingredient-search'),
+    url(r'^api/v2/reference-bundle/(?P<language>[\w-]+)/$',
+        core_api_views.reference_bundle,
+        name='reference-bundle'),
     url(r'^api/v2/', include(router.urls)),
 ]
 
@@ -14,9 +14,18 @@
 
 import logging
 import hashlib
+import six
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
 
 from django.core.cache import cache
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from django.utils.encoding import force_bytes
+from django.utils.http import http_date, quote_etag
 
 
 logger = logging.getLogger(__name__)
@@ -39,8 +48,69 @@ def delete_template_fragment_cache(fragment_name='', *args):
     cache.delete(get_template_cache_name(fragment_name, *args))
 
 
+def get_exercise_fragments_version():
+    '''
+    Return the version of the cached exercise template fragments
+
+    The templates pass this to the cache tag, so that all the fragments in all
+    languages can be invalidated at once by bumping the namespace's generation.
+    '''
+    namespace = cache_mapper.EXERCISE_FRAGMENTS
+    return '{0}.{1}'.format(cache_mapper.NAMESPACE_VERSIONS[namespace],
+                            local_cache.get_generation(namespace))
+
+
+def get_fragment_cache_name(fragment_name='', *args):
+    '''
+    Return the current cache key of an exercise template fragment
+    '''
+    args = args + (get_exercise_fragments_version(), )
+    return get_template_cache_name(fragment_name, *args)
+
+
+def reset_exercise_fragments():
+    '''
+    Resets the cached exercise template fragments, in all languages
+    '''
+    local_cache.invalidate(cache_mapper.EXERCISE_FRAGMENTS)
+
+
 def reset_workout_canonical_form(workout_id):
-    cache.delete(cache_mapper.get_workout_canonical(workout_id))
+    cache.delete_many([cache_mapper.get_workout_canonical(workout_id),
+                       cache_mapper.get_workout_version_key(workout_id)])
+
+
+def reset_workout_canonical_forms(workout_ids):
+    '''
+    Resets the canonical form of several workouts with one cache call
+    '''
+    namespace = cache_mapper.WORKOUT_CANONICAL
+    generation = cache_mapper.get_generation(namespace)
+    cache.delete_many([cache_mapper.make_generation_key(namespace, generation, i)
+                       for i in workout_ids] +
+                      [cache_mapper.make_generation_key(namespace, generation, i, 'version')
+                       for i in workout_ids])
+
+
+def get_workout_version(workout_id):
+    '''
+    Returns the version of a workout, it only changes when the workout's
+    canonical form is reset, e.g. to use it in the key of a rendered PDF
+    '''
+    key = cache_mapper.get_workout_version_key(workout_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def reset_weight_rollups(user_ids):
+    '''
+    Resets the weekly and monthly weight rollups and the trends of several users
+    '''
+    cache.delete_many([cache_mapper.get_weight_rollup_key(i) for i in user_ids]
+                      + [cache_mapper.get_weight_trend_key(i) for i in user_ids])
 
 
 def reset_workout_log(user_pk, year, month, day=None):
@@ -55,18 +125,188 @@ def reset_workout_log(user_pk, year, month, day=None):
     cache.delete(cache_mapper.get_workout_log_list(log_hash))
 
 
+def reset_workout_logs(user_pk, dates):
+    '''
+    Resets the cached workout logs for several dates with one cache call
+
+    Dates in the same month only reset the month's list once.
+    '''
+    keys = set()
+    for date in dates:
+        keys.add(cache_mapper.get_workout_log_list(hash((user_pk, date.year, date.month))))
+        keys.add(cache_mapper.get_workout_log_list(hash((user_pk,
+                                                         date.year,
+                                                         date.month,
+                                                         date.day))))
+    cache.delete_many(list(keys))
+
+
+def reset_table_version(model):
+    '''
+    Marks the data of a model's table as changed
+
+    The version is the time of the last change, it is used to answer
+    conditional requests without reading the data, see condition_on_tables.
+    It is saved in the database, the cache only saves reading it there.
+    '''
+    # Local import to avoid circular imports
+    from wger.core.models import TableVersion
+
+    version = time.time()
+    table = model._meta.db_table
+    if not TableVersion.objects.filter(table=table).update(version=version):
+        TableVersion.objects.get_or_create(table=table, defaults={'version': version})
+    cache.set(cache_mapper.get_table_version_key(model), version, None)
+
+
+def get_table_versions(models):
+    '''
+    Return the time of the last change to the tables of several models
+
+    The versions missing in the cache are read from the database. Tables
+    without a version yet, e.g. after the installation, are versioned from
+    now on.
+
+    :return: a dictionary with the model as key and the version as value
+    '''
+    from wger.core.models import TableVersion
+
+    generation = cache_mapper.get_generation(cache_mapper.TABLE_VERSION)
+    keys = dict([(cache_mapper.get_table_version_key(model, generation), model)
+                 for model in models])
+    versions = cache.get_many(keys.keys())
+    missing = dict([(keys[key]._meta.db_table, key) for key in keys if key not in versions])
+    if missing:
+        stored = dict(TableVersion.objects.filter(table__in=missing.keys())
+                                          .values_list('table', 'version'))
+        for table, key in missing.items():
+            if table not in stored:
+                stored[table] = TableVersion.objects.get_or_create(
+                    table=table,
+                    defaults={'version': time.time()})[0].version
+            versions[key] = stored[table]
+            cache.set(key, stored[table], None)
+    return dict([(keys[key], versions[key]) for key in keys])
+
+
+def get_tables_version(models):
+    '''
+    Return the time of the last change to any of the tables of several models
+    '''
+    return max(get_table_versions(models).values())
+
+
+def get_tables_etag(request, version):
+    '''
+    Return the ETag of a response that only depends on a tables version and
+    the request itself
+    '''
+    key = u':'.join([repr(version),
+                     request.get_full_path(),
+                     request.META.get('HTTP_ACCEPT', ''),
+                     translation.get_language() or '',
+                     six.text_type(request.user.pk)])
+    return hashlib.md5(force_bytes(key)).hexdigest()
+
+
+def condition_on_tables(models, max_age=0, anonymous_only=False):
+    '''
+    Decorator for views that only show the data of some tables
+
+    Read requests get an ETag and a Last-Modified header calculated from the
+    tables versions, if the client already has the current version it is
+    answered with 304 Not Modified without calling the view. The Cache-Control
+    header allows shared caches such as a CDN to keep the responses for
+    anonymous users for max_age seconds.
+
+    :param models: the models whose tables the view reads
+    :param max_age: seconds the response can be used without asking again
+    :param anonymous_only: only handle anonymous users, for views that also
+                           show data of the logged in user
+    '''
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            authenticated = request.user.is_authenticated()
+            if request.method not in ('GET', 'HEAD') or (anonymous_only and authenticated):
+                return view(request, *args, **kwargs)
+
+            version = get_tables_version(models)
+            etag = get_tables_etag(request, version)
+            last_modified = int(version)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                return response
+
+            response['ETag'] = quote_etag(etag)
+            response['Last-Modified'] = http_date(last_modified)
+            if authenticated:
+                patch_cache_control(response, private=True, max_age=max_age)
+            else:
+                patch_cache_control(response, public=True, max_age=max_age)
+            patch_vary_headers(response, ('Accept', ))
+            return response
+        return inner
+    return decorator
+
+
 class CacheKeyMapper(object):
     '''
     Simple class for mapping the cache keys of different objects
+
+    Every key belongs to a namespace and is built out of the namespace's schema
+    version and its current generation. Bumping the schema version (in the code)
+    or the generation (at runtime, see invalidate_namespace) makes all the old
+    entries unreachable at once, they simply expire in the backend. This works
+    the same across processes when using a shared cache like memcached.
+    '''
+
+    # Namespaces used by the cache
+    LANGUAGE = 'language'
+    LANGUAGE_CONFIG = 'language-config'
+    EXERCISE_MUSCLE_BG = 'exercise-muscle-bg'
+    INGREDIENT = 'ingredient'
+    WORKOUT_CANONICAL = 'workout-canonical-representation'
+    WORKOUT_LOG_LIST = 'workout-log-hash'
+    DAYS_OF_WEEK = 'days-of-week'
+    REPETITION_UNITS = 'repetition-units'
+    WEIGHT_UNITS = 'weight-units'
+    EXERCISE_FRAGMENTS = 'exercise-fragments'
+    PDF = 'pdf'
+    WEIGHT_ROLLUP = 'weight-rollup'
+    WEIGHT_TREND = 'weight-trend'
+    GYM_MODE = 'gym-mode'
+    TABLE_VERSION = 'table-version'
+    EXERCISE_IMAGE_THUMBNAILS = 'exercise-image-thumbnails'
+
+    NAMESPACE_VERSIONS = {
+        LANGUAGE: 1,
+        LANGUAGE_CONFIG: 1,
+        EXERCISE_MUSCLE_BG: 1,
+        INGREDIENT: 1,
+        WORKOUT_CANONICAL: 2,
+        WORKOUT_LOG_LIST: 1,
+        DAYS_OF_WEEK: 1,
+        REPETITION_UNITS: 1,
+        WEIGHT_UNITS: 1,
+        EXERCISE_FRAGMENTS: 1,
+        PDF: 1,
+        WEIGHT_ROLLUP: 1,
+        WEIGHT_TREND: 1,
+        GYM_MODE: 1,
+        TABLE_VERSION: 1,
+        EXERCISE_IMAGE_THUMBNAILS: 1,
+    }
+    '''
+    Schema version of the cached structures. Increase the number when the shape
+    of the cached objects changes, so that a deploy does not read stale entries.
     '''
 
     # Keys used by the cache
-    LANGUAGE_CACHE_KEY = 'language-{0}'
-    LANGUAGE_CONFIG_CACHE_KEY = 'language-config-{0}-{1}'
-    EXERCISE_CACHE_KEY_MUSCLE_BG = 'exercise-muscle-bg-{0}'
-    INGREDIENT_CACHE_KEY = 'ingredient-{0}'
-    WORKOUT_CANONICAL_REPRESENTATION = 'workout-canonical-representation-{0}'
-    WORKOUT_LOG_LIST = 'workout-log-hash-{0}'
+    KEY_TEMPLATE = '{namespace}:v{version}:g{generation}:{key}'
+    GENERATION_KEY = 'generation:{0}'
 
     def get_pk(self, param):
         '''
@@ -79,40 +319,242 @@ class CacheKeyMapper(object):
 
         return pk
 
+    def get_generation(self, namespace):
+        '''
+        Return the current generation of a namespace
+        '''
+        generation_key = self.GENERATION_KEY.format(namespace)
+        generation = cache.get(generation_key)
+        if generation is None:
+            generation = 1
+            cache.add(generation_key, generation, None)
+        return generation
+
+    def invalidate_namespace(self, namespace):
+        '''
+        Invalidates all the keys of a namespace by bumping its generation
+        '''
+        generation_key = self.GENERATION_KEY.format(namespace)
+        try:
+            return cache.incr(generation_key)
+        except ValueError:
+            cache.set(generation_key, 2, None)
+            return 2
+
+    def make_key(self, namespace, *args):
+        '''
+        Return a versioned cache key for the given namespace
+        '''
+        return self.make_generation_key(namespace, self.get_generation(namespace), *args)
+
+    def make_generation_key(self, namespace, generation, *args):
+        '''
+        Return a versioned cache key for an already known generation
+        '''
+        return self.KEY_TEMPLATE.format(namespace=namespace,
+                                        version=self.NAMESPACE_VERSIONS[namespace],
+                                        generation=generation,
+                                        key='-'.join([str(arg) for arg in args]))
+
     def get_exercise_muscle_bg_key(self, param):
         '''
         Return the exercise muscle background cache key
         '''
-        return self.EXERCISE_CACHE_KEY_MUSCLE_BG.format(self.get_pk(param))
+        return self.make_key(self.EXERCISE_MUSCLE_BG, self.get_pk(param))
 
     def get_language_key(self, param):
         '''
         Return the language cache key
         '''
-        return self.LANGUAGE_CACHE_KEY.format(self.get_pk(param))
+        return self.make_key(self.LANGUAGE, self.get_pk(param))
 
     def get_language_config_key(self, param, item):
         '''
         Return the language cache key
         '''
-        return self.LANGUAGE_CONFIG_CACHE_KEY.format(self.get_pk(param), item)
+        return self.make_key(self.LANGUAGE_CONFIG, self.get_pk(param), item)
 
     def get_ingredient_key(self, param):
         '''
         Return the ingredient cache key
         '''
-        return self.INGREDIENT_CACHE_KEY.format(self.get_pk(param))
+        return self.make_key(self.INGREDIENT, self.get_pk(param))
 
     def get_workout_canonical(self, param):
         '''
         Return the workout canonical representation
         '''
-        return self.WORKOUT_CANONICAL_REPRESENTATION.format(self.get_pk(param))
+        return self.make_key(self.WORKOUT_CANONICAL, self.get_pk(param))
+
+    def get_workout_version_key(self, param):
+        '''
+        Return the key for the version of a workout
+        '''
+        return self.make_key(self.WORKOUT_CANONICAL, self.get_pk(param), 'version')
 
     def get_workout_log_list(self, hash_value):
         '''
         Return the workout canonical representation
         '''
-        return self.WORKOUT_LOG_LIST.format(hash_value)
+        return self.make_key(self.WORKOUT_LOG_LIST, hash_value)
+
+    def get_pdf_key(self, *args):
+        '''
+        Return the key for a rendered PDF, e.g. for an object, version and options
+        '''
+        key = u':'.join([six.text_type(arg) for arg in args])
+        return self.make_key(self.PDF, hashlib.md5(force_bytes(key)).hexdigest())
+
+    def get_pdf_pending_key(self, pdf_key):
+        '''
+        Return the key used to mark a PDF as being rendered
+        '''
+        return '{0}:pending'.format(pdf_key)
+
+    def get_pdf_failed_key(self, pdf_key):
+        '''
+        Return the key used to mark a PDF whose rendering failed
+        '''
+        return '{0}:failed'.format(pdf_key)
+
+    def get_weight_rollup_key(self, user_id):
+        '''
+        Return the key for the weekly and monthly weight rollups of a user
+        '''
+        return self.make_key(self.WEIGHT_ROLLUP, user_id)
+
+    def get_weight_trend_key(self, user_id):
+        '''
+        Return the key for the weight trend of a user
+        '''
+        return self.make_key(self.WEIGHT_TREND, user_id)
+
+    def get_gym_mode_key(self, day_id, version):
+        '''
+        Return the key for the gym mode bundle of a workout day
+        '''
+        return self.make_key(self.GYM_MODE, day_id, version)
+
+    def get_table_version_key(self, model, generation=None):
+        '''
+        Return the key for the version of a model's table
+        '''
+        if generation is None:
+            generation = self.get_generation(self.TABLE_VERSION)
+        return self.make_generation_key(self.TABLE_VERSION, generation, model._meta.db_table)
+
+    def get_exercise_image_thumbnails_key(self, param):
+        '''
+        Return the key for the thumbnail URLs of an exercise image
+        '''
+        return self.make_key(self.EXERCISE_IMAGE_THUMBNAILS, self.get_pk(param))
 
 cache_mapper = CacheKeyMapper()
+
+
+class LocalCache(object):
+    '''
+    Bounded, per process LRU cache in front of django's cache
+
+    Meant for small lookups that are read on almost every request but rarely
+    change, such as the languages or the setting units. Entries are served from
+    the process' memory and are dropped after their timeout or as soon as the
+    generation of their namespace changes in the shared cache. The generations
+    are read in one go and at most every GENERATION_CHECK seconds, so most reads
+    don't hit the cache backend at all.
+    '''
+
+    MAX_ENTRIES = 512
+    TIMEOUT = 5 * 60
+    GENERATION_CHECK = 5
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        '''
+        Removes all entries from the local cache
+        '''
+        with self._lock:
+            self._entries = OrderedDict()
+            self._generations = {}
+            self._generations_checked = 0
+
+    def get_generation(self, namespace):
+        '''
+        Return the current generation of a namespace, as last seen by this process
+        '''
+        with self._lock:
+            if time.time() - self._generations_checked > self.GENERATION_CHECK:
+                keys = dict([(cache_mapper.GENERATION_KEY.format(i), i)
+                             for i in cache_mapper.NAMESPACE_VERSIONS])
+                generations = cache.get_many(keys.keys())
+                self._generations = dict([(keys[i], generations[i]) for i in generations])
+                self._generations_checked = time.time()
+            return self._generations.get(namespace, 1)
+
+    def get(self, namespace, key):
+        '''
+        Return an entry, looking first in the local and then in the shared cache
+        '''
+        generation = self.get_generation(namespace)
+        local_key = (namespace, generation, key)
+        with self._lock:
+            entry = self._entries.pop(local_key, None)
+            if entry is not None and entry[1] > time.time():
+                self._entries[local_key] = entry
+                return entry[0]
+
+        value = cache.get(self._get_shared_key(namespace, generation, key))
+        if value is not None:
+            self._set_local(local_key, value)
+        return value
+
+    def set(self, namespace, key, value):
+        '''
+        Saves an entry to the local and the shared cache
+        '''
+        generation = self.get_generation(namespace)
+        cache.set(self._get_shared_key(namespace, generation, key), value)
+        self._set_local((namespace, generation, key), value)
+
+    def get_or_set(self, namespace, key, default):
+        '''
+        Return an entry, calculating and saving it with the default callable if needed
+        '''
+        value = self.get(namespace, key)
+        if value is None:
+            value = default()
+            self.set(namespace, key, value)
+        return value
+
+    def invalidate(self, namespace):
+        '''
+        Invalidates a namespace in all processes by bumping its generation
+        '''
+        generation = cache_mapper.invalidate_namespace(namespace)
+        with self._lock:
+            self._generations[namespace] = generation
+            for local_key in [i for i in self._entries if i[0] == namespace]:
+                del self._entries[local_key]
+
+    def _get_shared_key(self, namespace, generation, key):
+        '''
+        Return the key used in the shared cache, the key can also be a tuple
+        '''
+        if not isinstance(key, tuple):
+            key = (key, )
+        return cache_mapper.make_generation_key(namespace, generation, *key)
+
+    def _set_local(self, local_key, value):
+        '''
+        Saves an entry to the local cache, evicting the least recently used ones
+        '''
+        with self._lock:
+            self._entries.pop(local_key, None)
+            self._entries[local_key] = (value, time.time() + self.TIMEOUT)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+local_cache = LocalCache()
@@ -18,6 +18,7 @@ from django.templatetags.static import static
 
 from wger import get_version
 from wger.utils import constants
+from wger.utils.cache import get_exercise_fragments_version
 from wger.utils.language import load_language
 
 
@@ -64,6 +65,9 @@ def processor(request):
         # Default cache time for template fragment caching
         'cache_timeout': settings.CACHES['default']['TIMEOUT'],
 
+        # Version of the cached exercise fragments (called lazily by the template)
+        'exercise_fragments_version': get_exercise_fragments_version,
+
         # Used for logged in trainers
         'trainer_identity': request.session.get('trainer.identity'),
     }
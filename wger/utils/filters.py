@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import exceptions
+from rest_framework.filters import BaseFilterBackend
+
+from wger.utils.serializers import get_expanded_fields
+
+
+def parse_modified_since(value):
+    '''
+    Reads a date or a date and time as sent by clients
+
+    Times without timezone are interpreted as UTC.
+
+    :raise ValueError: if the value could not be read
+    '''
+    timestamp = parse_datetime(value)
+    if timestamp is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError('Invalid date: {0}'.format(value))
+        timestamp = datetime.datetime.combine(date, datetime.time())
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, timezone.utc)
+    return timestamp
+
+
+class ModifiedSinceFilter(BaseFilterBackend):
+    '''
+    Only returns objects changed since the date passed as 'modified_since'
+
+    This works with models that keep the time of their last change, the field
+    can be changed with the view's modified_since_field attribute.
+    '''
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get('modified_since')
+        if not value:
+            return queryset
+
+        field = getattr(view, 'modified_since_field', 'updated')
+        try:
+            queryset.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            return queryset
+
+        try:
+            timestamp = parse_modified_since(value)
+        except ValueError:
+            raise exceptions.ParseError('Invalid value for modified_since')
+        return queryset.filter(**{'{0}__gte'.format(field): timestamp})
+
+
+class ExpandFilter(BaseFilterBackend):
+    '''
+    Loads the related objects the client asked to expand with 'expand'
+
+    Foreign keys are loaded with select_related, the other relations with
+    prefetch_related. See wger.utils.serializers.WgerModelSerializer.
+    '''
+
+    def filter_queryset(self, request, queryset, view):
+        if not hasattr(view, 'get_serializer_class'):
+            return queryset
+
+        for name, (serializer_class, kwargs) in \
+                get_expanded_fields(request, view.get_serializer_class()).items():
+            source = kwargs.get('source', name)
+            try:
+                field = queryset.model._meta.get_field(source)
+                is_single = (field.many_to_one or field.one_to_one) and field.concrete
+            except FieldDoesNotExist:
+                is_single = False
+
+            if is_single:
+                queryset = queryset.select_related(source)
+            else:
+                queryset = queryset.prefetch_related(source)
+        return queryset
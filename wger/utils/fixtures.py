@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Loading of large JSON fixtures
+
+Django's loaddata reads the whole file into memory and saves the objects one
+by one. The loader here reads the file incrementally, inserts the new objects
+in chunks and skips the ones already in the database with the same values,
+so loading the same fixtures again is cheap.
+'''
+
+import io
+import json
+import logging
+import re
+
+from django.core.management.color import no_style
+from django.core.serializers import python
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from wger.utils.cache import reset_table_version
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+'''Maximum number of objects saved at once'''
+
+READ_SIZE = 64 * 1024
+'''Number of characters read from the file at once'''
+
+SEPARATOR = re.compile(r'[\s,]*')
+WHITESPACE = re.compile(r'\s*')
+
+
+def iter_json_array(fixture, read_size=READ_SIZE):
+    '''
+    Yields the elements of a JSON array in a file one by one
+
+    :param fixture: the file, opened in text mode
+    :raise ValueError: if the file doesn't contain a valid JSON array
+    '''
+    decoder = json.JSONDecoder()
+    buffer = u''
+    position = 0
+    started = False
+    finished = False
+
+    while True:
+        position = SEPARATOR.match(buffer, position).end()
+        at_element = started and position < len(buffer) and buffer[position] != u']'
+        element = end = None
+        if at_element:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+                end = WHITESPACE.match(buffer, end).end()
+            except ValueError:
+                pass
+
+        # The element is only complete when followed by a separator, e.g. the
+        # number 1.5 could be split into two chunks after '1.'
+        complete = end is not None and end < len(buffer) and buffer[end] in u',]'
+        if not finished and (position == len(buffer) or (at_element and not complete)):
+            chunk = fixture.read(read_size)
+            if chunk:
+                buffer = buffer[position:] + chunk
+                position = 0
+            else:
+                finished = True
+            continue
+
+        if position == len(buffer):
+            raise ValueError('Unexpected end of the JSON array')
+        elif not started:
+            if buffer[position] != u'[':
+                raise ValueError('The fixture does not contain a JSON array')
+            started = True
+            position += 1
+        elif not at_element:
+            return
+        elif not complete:
+            # Raise the decoder's error, if any
+            decoder.raw_decode(buffer, position)
+            raise ValueError('Expecting a separator after char {0}'.format(position))
+        else:
+            position = end
+            yield element
+
+
+def get_m2m_values(model, pks, using):
+    '''
+    Returns the related IDs of the many to many fields of some objects
+
+    :return: a dictionary with the field's name as key and a dictionary with
+             the object's PK as key and the set of related IDs as value
+    '''
+    values = {}
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        values[field.name] = {}
+        for source_id, target_id in through._base_manager.using(using) \
+                .filter(**{'{0}__in'.format(source): pks}) \
+                .values_list(source, target):
+            values[field.name].setdefault(source_id, set()).add(target_id)
+    return values
+
+
+def is_unchanged(deserialized, existing, fields, m2m_values):
+    '''
+    Checks whether an object from a fixture has the same values as in the database
+    '''
+    instance = deserialized.object
+    for field in fields:
+        if getattr(instance, field.attname) != getattr(existing, field.attname):
+            return False
+
+    for name, related_ids in deserialized.m2m_data.items():
+        if set(related_ids) != m2m_values[name].get(instance.pk, set()):
+            return False
+    return True
+
+
+def save_objects(objects, using, counts):
+    '''
+    Saves a chunk of objects of the same model
+
+    New objects are inserted like loaddata does it, without changing their
+    values (e.g. the dates of fields with auto_now) and without sending any
+    signals. Changed objects are saved one by one.
+    '''
+    model = objects[0].object.__class__
+    manager = model._base_manager.using(using)
+
+    # Objects of child models need their parents to be saved first
+    if model._meta.parents:
+        for deserialized in objects:
+            deserialized.save(using=using)
+        counts['updated'] += len(objects)
+        return
+
+    fields = model._meta.local_concrete_fields
+    existing = manager.in_bulk([deserialized.object.pk for deserialized in objects])
+    m2m_values = get_m2m_values(model, list(existing.keys()), using)
+
+    new = []
+    for deserialized in objects:
+        instance = deserialized.object
+        if instance.pk not in existing:
+            new.append(deserialized)
+        elif is_unchanged(deserialized, existing[instance.pk], fields, m2m_values):
+            counts['unchanged'] += 1
+        else:
+            deserialized.save(using=using)
+            counts['updated'] += 1
+
+    if not new:
+        return
+
+    instances = [deserialized.object for deserialized in new]
+    batch_size = max(connections[using].ops.bulk_batch_size(fields, instances), 1)
+    for i in range(0, len(instances), batch_size):
+        manager._insert(instances[i:i + batch_size], fields=fields, using=using, raw=True)
+
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        source = '{0}_id'.format(field.m2m_field_name())
+        target = '{0}_id'.format(field.m2m_reverse_field_name())
+        through._base_manager.using(using).bulk_create(
+            [through(**{source: deserialized.object.pk, target: related_id})
+             for deserialized in new
+             for related_id in deserialized.m2m_data.get(field.name, [])])
+    counts['created'] += len(new)
+
+
+def load_fixture(path, chunk_size=CHUNK_SIZE, using=DEFAULT_DB_ALIAS):
+    '''
+    Loads a JSON fixture
+
+    The fixture is loaded in one transaction. Like with loaddata, the objects
+    of a model must come after the ones they refer to, either in the same or
+    in an earlier fixture.
+
+    :return: a dictionary with the number of 'created', 'updated' and
+             'unchanged' objects
+    '''
+    connection = connections[using]
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+    models = set()
+
+    with io.open(path, encoding='utf-8') as fixture:
+        with transaction.atomic(using=using):
+            with connection.constraint_checks_disabled():
+                objects = []
+                chunk_model = None
+                for deserialized in python.Deserializer(iter_json_array(fixture), using=using):
+                    model = deserialized.object.__class__
+                    if objects and (model is not chunk_model or len(objects) >= chunk_size):
+                        save_objects(objects, using, counts)
+                        objects = []
+                    objects.append(deserialized)
+                    chunk_model = model
+                    models.add(model)
+                if objects:
+                    save_objects(objects, using, counts)
+
+            connection.check_constraints(table_names=[model._meta.db_table for model in models])
+
+            # Inserting objects with their PKs doesn't move the sequences on
+            # all databases
+            sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+            if sequence_sql:
+                with connection.cursor() as cursor:
+                    for line in sequence_sql:
+                        cursor.execute(line)
+
+    if counts['created'] or counts['updated']:
+        for model in models:
+            reset_table_version(model)
+
+    logger.info('Loaded %s: %s', path, counts)
+    return counts
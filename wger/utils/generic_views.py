@@ -31,6 +31,7 @@ from wger.utils.constants import (
     HTML_ATTRIBUTES_WHITELIST,
     HTML_STYLES_WHITELIST
 )
+from wger.utils.owner import get_owner_id, get_object_owner_id
 
 
 logger = logging.getLogger(__name__)
@@ -192,17 +193,18 @@ class WgerFormMixin(ModelFormMixin):
 
         # For new objects, we have to manually load the owner object
         if self.owner_object:
-            owner_object = self.owner_object['class'].objects.get(
-                pk=kwargs[self.owner_object['pk']])
+            owner_id = get_owner_id(self.owner_object['class'],
+                                    kwargs[self.owner_object['pk']],
+                                    request)
         else:
             # On CreateViews we don't have an object, so just ignore it
             try:
-                owner_object = self.get_object().get_owner_object()
+                owner_id = get_object_owner_id(self.get_object(), request)
             except AttributeError:
-                owner_object = False
+                owner_id = None
 
         # Nothing to see, please move along
-        if owner_object and owner_object.user != self.request.user:
+        if owner_id and owner_id != self.request.user.pk:
             return HttpResponseForbidden('You are not allowed to access this object')
 
         # Dispatch normally
@@ -296,10 +298,10 @@ class WgerDeleteMixin(ModelFormMixin):
         # These seem to be necessary if for calling get_object
         self.kwargs = kwargs
         self.request = request
-        owner_object = self.get_object().get_owner_object()
+        owner_id = get_object_owner_id(self.get_object(), request)
 
         # Nothing to see, please move along
-        if owner_object and owner_object.user != self.request.user:
+        if owner_id and owner_id != self.request.user.pk:
             return HttpResponseForbidden()
 
         # Dispatch normally
@@ -24,12 +24,15 @@ import datetime
 
 from functools import wraps
 
+from django.core.exceptions import ValidationError
 from django.http import Http404
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import default_token_generator
 from django.shortcuts import get_object_or_404
-from django.utils.encoding import force_bytes
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes, force_text
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.translation import ugettext as _
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +86,81 @@ def disable_for_loaddata(signal_handler):
     return wrapper
 
 
+def memoize(method):
+    '''
+    Decorator that remembers the result of a method on its instance
+
+    The results are kept per arguments until reset_memoized is called. Since
+    objects such as request.user live only as long as the request, this can be
+    used to avoid calculating (or querying) the same value several times.
+    '''
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        values = self.__dict__.setdefault('_memoized', {})
+        if key not in values:
+            values[key] = method(self, *args, **kwargs)
+        return values[key]
+    return wrapper
+
+
+def reset_memoized(obj):
+    '''
+    Forgets the results remembered with memoize
+    '''
+    obj.__dict__.pop('_memoized', None)
+
+
+def validate_instances(instances, get_valid_ids, exclude=()):
+    '''
+    Validates unsaved model instances of one model at once
+
+    Instead of loading the related object of every foreign key of every
+    instance, the IDs are collected and checked with one call per foreign key.
+    IDs passed as strings are converted to the right type.
+
+    :param instances: a list of unsaved model instances
+    :param get_valid_ids: a dictionary with the names of the foreign keys as
+                          keys and functions as values, these receive a set of
+                          IDs and return the valid ones
+    :param exclude: other fields that should not be validated
+    :return: a dictionary with the position of the invalid instances in the
+             list as key and the validation errors (as a dictionary) as value
+    '''
+    errors = {}
+    for i, instance in enumerate(instances):
+        try:
+            instance.clean_fields(exclude=tuple(exclude) + tuple(get_valid_ids))
+        except ValidationError as e:
+            errors[i] = e.message_dict
+
+        # clean_fields skips empty values of fields with blank=True, but None
+        # can't be saved if the field is not nullable either
+        for field in instance._meta.concrete_fields:
+            if field.blank and not field.null and field.editable and not field.primary_key \
+                    and field.name not in exclude and field.name not in get_valid_ids \
+                    and getattr(instance, field.attname) is None:
+                errors.setdefault(i, {})[field.name] = [field.error_messages['null']]
+
+        for name in get_valid_ids:
+            field = instance._meta.get_field(name)
+            try:
+                setattr(instance, field.attname,
+                        field.target_field.to_python(getattr(instance, field.attname)))
+            except ValidationError as e:
+                setattr(instance, field.attname, None)
+                errors.setdefault(i, {})[name] = e.messages
+
+    for name, get_ids in get_valid_ids.items():
+        attname = instances[0]._meta.get_field(name).attname if instances else None
+        valid_ids = set(get_ids(set([getattr(i, attname) for i in instances])))
+        for i, instance in enumerate(instances):
+            if name not in errors.get(i, {}) and getattr(instance, attname) not in valid_ids:
+                errors.setdefault(i, {})[name] = [
+                    _('Select a valid choice. That choice is not one of the available choices.')]
+    return errors
+
+
 def next_weekday(date, weekday):
     '''
     Helper function to find the next weekday after a given date,
@@ -146,6 +224,36 @@ def check_token(uidb64, token):
     return False
 
 
+def make_sync_cursor(timestamp, pk):
+    '''
+    Generates an opaque cursor from the modification time and the ID of the
+    last object a client received
+
+    :param timestamp: a datetime object
+    :param pk: the primary key of the object
+    :return: the cursor as a string that can be used in URLs
+    '''
+    return force_text(urlsafe_base64_encode(force_bytes(
+        u'{0},{1}'.format(timestamp.isoformat(), pk))))
+
+
+def parse_sync_cursor(cursor):
+    '''
+    Reads a cursor generated with make_sync_cursor
+
+    :raise ValueError: if the cursor is invalid
+    :return: a tuple with the modification time and the primary key
+    '''
+    try:
+        timestamp, pk = force_text(urlsafe_base64_decode(cursor)).split(',')
+        timestamp = parse_datetime(timestamp)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError('Invalid cursor: {0}'.format(e))
+    if timestamp is None:
+        raise ValueError('Invalid cursor: no timestamp')
+    return timestamp, int(pk)
+
+
 def password_generator(length=15):
     '''
     A simple password generator
@@ -16,11 +16,10 @@ import logging
 
 from django.utils import translation
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.cache import cache
 from wger.core.models import Language
 
 from wger.config.models import LanguageConfig
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import cache_mapper, local_cache
 
 
 logger = logging.getLogger(__name__)
@@ -44,7 +43,7 @@ def load_language(language_code=None):
     else:
         used_language = language_code
 
-    language = cache.get(cache_mapper.get_language_key(used_language))
+    language = local_cache.get(cache_mapper.LANGUAGE, used_language)
     if language:
         return language
 
@@ -54,7 +53,7 @@ def load_language(language_code=None):
         # No luck, load english as our fall-back language
         language = Language.objects.get(short_name="en")
 
-    cache.set(cache_mapper.get_language_key(language), language)
+    local_cache.set(cache_mapper.LANGUAGE, used_language, language)
     return language
 
 
@@ -64,7 +63,7 @@ def load_item_languages(item, language_code=None):
     '''
 
     language = load_language(language_code)
-    languages = cache.get(cache_mapper.get_language_config_key(language, item))
+    languages = local_cache.get(cache_mapper.LANGUAGE_CONFIG, (language.pk, item))
 
     # Load the configurations we are interested in and return the languages
     if not languages:
@@ -78,7 +77,7 @@ def load_item_languages(item, language_code=None):
         for i in config:
             languages.append(i.language_target)
 
-        cache.set(cache_mapper.get_language_config_key(language, item), languages)
+        local_cache.set(cache_mapper.LANGUAGE_CONFIG, (language.pk, item), languages)
 
     return languages
 
@@ -15,10 +15,9 @@
 # You should have received a copy of the GNU Affero General Public License
 
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
-from wger.core.models import License
-
 
 '''
 Abstract model classes
@@ -33,7 +32,7 @@ class AbstractLicenseModel(models.Model):
     class Meta:
         abstract = True
 
-    license = models.ForeignKey(License,
+    license = models.ForeignKey('core.License',
                                 verbose_name=_('License'),
                                 default=2)
     '''The item's license'''
@@ -75,3 +74,29 @@ class AbstractSubmissionModel(models.Model):
                               default=STATUS_PENDING,
                               editable=False)
     '''Status of the submission, e.g. accepted or declined'''
+
+
+class AbstractChangeTrackingModel(models.Model):
+    '''
+    Abstract class for user data that clients can sync incrementally
+
+    The time of the last change is saved when saving the object, deleting it
+    leaves an entry in core.DeletedObject (see wger.core.signals), also when
+    it is deleted in cascade or with delete() on a queryset. Changes done with
+    update() on querysets are not tracked.
+    '''
+
+    class Meta:
+        abstract = True
+
+    updated = models.DateTimeField(verbose_name=_('Last update'),
+                                   default=timezone.now,
+                                   editable=False)
+    '''Time of the last change'''
+
+    def save(self, *args, **kwargs):
+        '''
+        Set the modification time
+        '''
+        self.updated = timezone.now()
+        super(AbstractChangeTrackingModel, self).save(*args, **kwargs)
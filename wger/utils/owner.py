@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Resolve the user owning an object
+
+Models with owner information declare the lookup from the model to the owning
+user in an 'owner_field' attribute, e.g. 'set__exerciseday__training__user' for
+settings. This allows to find the owner with one query instead of following
+the foreign keys one by one with get_owner_object().
+'''
+
+from django.core.exceptions import ValidationError
+
+
+def get_owner_id(model, pk, request=None):
+    '''
+    Returns the ID of the user owning an object
+
+    The result is cached on the request, if one is passed. Models without an
+    owner_field are loaded and get_owner_object() is used.
+
+    :param model: the model class
+    :param pk: the primary key of the object
+    :param request: the current request, used as cache
+    :return: the owner's ID or None if the object has no owner
+    :raise DoesNotExist: if there is no object with that primary key
+    '''
+    try:
+        pk = model._meta.pk.to_python(pk)
+    except ValidationError:
+        raise model.DoesNotExist()
+
+    cache = getattr(request, 'wger_owner_cache', None)
+    if cache is None:
+        cache = {}
+        if request is not None:
+            request.wger_owner_cache = cache
+
+    key = (model._meta.label, pk)
+    if key not in cache:
+        owner_field = getattr(model, 'owner_field', None)
+        if owner_field:
+            cache[key] = model.objects.values_list(owner_field, flat=True).get(pk=pk)
+        else:
+            cache[key] = get_object_owner_id(model.objects.get(pk=pk))
+    return cache[key]
+
+
+def get_object_owner_id(obj, request=None):
+    '''
+    Returns the ID of the user owning an object
+
+    Objects owned directly by a user don't need any queries, for the others
+    see get_owner_id().
+
+    :return: the owner's ID or None if the object has no owner
+    '''
+    owner_field = getattr(obj, 'owner_field', None)
+    if owner_field == 'user':
+        return obj.user_id
+    elif owner_field:
+        return get_owner_id(obj.__class__, obj.pk, request)
+
+    owner_object = obj.get_owner_object() if hasattr(obj, 'get_owner_object') else None
+    return owner_object.user_id if owner_object else None
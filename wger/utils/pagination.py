@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class WgerCursorPagination(CursorPagination):
+    '''
+    Cursor pagination for large collections
+
+    Instead of an offset, the links to the next and previous pages contain the
+    position of the last object, so the database can use an index to find the
+    page. The views need an 'ordering' attribute with a unique, indexed field
+    and should only allow ordering by indexed fields. The page size can be
+    changed with the 'limit' parameter, up to max_page_size.
+    '''
+    page_size = settings.REST_FRAMEWORK['PAGINATE_BY']
+    page_size_query_param = settings.REST_FRAMEWORK['PAGINATE_BY_PARAM']
+    max_page_size = 500
+    ordering = 'id'
+
+    def get_page_size(self, request):
+        '''
+        Read the page size from the request
+        '''
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
@@ -13,10 +13,16 @@
 # You should have received a copy of the GNU Affero General Public License
 
 import datetime
+import logging
+from multiprocessing.pool import ThreadPool
 from os.path import join as path_join
 
 from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
 from django.utils import translation
+from django.utils.translation import ugettext as _
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 
 from reportlab.lib.styles import ParagraphStyle, StyleSheet1
@@ -26,6 +32,34 @@ from reportlab.platypus import Paragraph
 
 from wger import get_version
 from wger.core.models import Language
+from wger.utils.cache import cache_mapper
+
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_TIMEOUT = 24 * 60 * 60
+'''How long rendered PDFs are kept in the cache'''
+
+PDF_RENDER_TIMEOUT = 5 * 60
+'''Time after which a PDF that is still being rendered is started again'''
+
+PDF_FAILURE_TIMEOUT = 60
+'''Time during which a PDF whose rendering failed is not rendered again'''
+
+PDF_WORKERS = 2
+'''Number of threads rendering PDFs in the background, per process'''
+
+PDF_BACKGROUND_MIN_ROWS = 30
+'''PDFs with more rows than this are rendered in the background'''
+
+_pool = None
+
+
+class PdfRenderingError(Exception):
+    '''
+    Raised when a PDF recently could not be rendered in the background
+    '''
+    pass
 
 
 # ************************
@@ -98,6 +132,100 @@ def render_footer(url, date=None):
     return p
 
 
+# ************************
+# Rendering and caching
+# ************************
+
+
+def get_pdf_pool():
+    '''
+    Returns the (lazily created) pool of threads that render PDFs
+    '''
+    global _pool
+    if _pool is None:
+        _pool = ThreadPool(PDF_WORKERS)
+    return _pool
+
+
+def render_pdf(key, render, background=False):
+    '''
+    Returns a rendered PDF, from the cache if possible
+
+    If background is set (and allowed in the settings), PDFs that are not
+    cached are rendered by the worker pool and None is returned, the caller
+    should then ask the client to try again later, see pdf_pending_response.
+    Only one process renders the same PDF at a time. If rendering it failed,
+    PdfRenderingError is raised for a short while instead of trying again,
+    see pdf_failed_response.
+
+    :param key: the cache key for the PDF, see CacheKeyMapper.get_pdf_key
+    :param render: a callable returning the PDF's content
+    :param background: boolean indicating whether to render in the background
+    '''
+    pdf = cache.get(key)
+    if pdf is not None:
+        return pdf
+
+    if not background or not settings.WGER_SETTINGS['PDF_BACKGROUND_RENDERING']:
+        pdf = render()
+        cache.set(key, pdf, PDF_CACHE_TIMEOUT)
+        return pdf
+
+    if cache.get(cache_mapper.get_pdf_failed_key(key)):
+        raise PdfRenderingError(key)
+
+    if cache.add(cache_mapper.get_pdf_pending_key(key), True, PDF_RENDER_TIMEOUT):
+        get_pdf_pool().apply_async(_render_pdf_job, (key, render, translation.get_language()))
+    return None
+
+
+def _render_pdf_job(key, render, language):
+    '''
+    Renders a PDF in a worker thread and saves it to the cache
+    '''
+    try:
+        with translation.override(language):
+            cache.set(key, render(), PDF_CACHE_TIMEOUT)
+    except Exception:
+        logger.exception('Error rendering PDF %s', key)
+        cache.set(cache_mapper.get_pdf_failed_key(key), True, PDF_FAILURE_TIMEOUT)
+    finally:
+        cache.delete(cache_mapper.get_pdf_pending_key(key))
+        connection.close()
+
+
+def pdf_response(pdf, filename):
+    '''
+    Returns a response for a rendered PDF
+    '''
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = 'attachment; filename={0}'.format(filename)
+    response['Content-Length'] = len(pdf)
+    return response
+
+
+def pdf_pending_response():
+    '''
+    Returns a response asking the client to come back once the PDF is rendered
+    '''
+    response = HttpResponse(_('Your PDF is being generated, this page will reload '
+                              'automatically.'),
+                            content_type='text/plain; charset=utf-8',
+                            status=202)
+    response['Retry-After'] = 2
+    response['Refresh'] = 2
+    return response
+
+
+def pdf_failed_response():
+    '''
+    Returns a response telling the client that the PDF could not be rendered
+    '''
+    return HttpResponse(_('Your PDF could not be generated, please try again later.'),
+                        content_type='text/plain; charset=utf-8',
+                        status=500)
+
+
 # register new truetype fonts for reportlab
 pdfmetrics.registerFont(TTFont(
     'OpenSans', path_join(settings.SITE_ROOT, 'core/static/fonts/OpenSans-Light.ttf')))
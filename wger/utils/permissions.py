@@ -17,6 +17,8 @@
 
 from rest_framework import permissions
 
+from wger.utils.owner import get_object_owner_id
+
 
 class WgerPermission(permissions.BasePermission):
     '''
@@ -43,14 +45,14 @@ class WgerPermission(permissions.BasePermission):
         '''
         Perform the check
         '''
-        owner_object = obj.get_owner_object() if hasattr(obj, 'get_owner_object') else False
+        owner_id = get_object_owner_id(obj, request)
 
         # Owner
-        if owner_object and owner_object.user == request.user:
+        if owner_id and owner_id == request.user.pk:
             return True
 
         # 'global' objects only for GET, HEAD or OPTIONS
-        if not owner_object and request.method in permissions.SAFE_METHODS:
+        if not owner_id and request.method in permissions.SAFE_METHODS:
             return True
 
         # Everything else is a no-no
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class MsgpackRenderer(BaseRenderer):
+    '''
+    Renders the data with MessagePack
+
+    This needs the optional msgpack package.
+    '''
+    media_type = 'application/x-msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        '''
+        Render the data
+        '''
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True)
+
+
+def get_compact_renderers():
+    '''
+    Returns the renderers available for the compact API endpoints
+    '''
+    renderers = [JSONRenderer]
+    if msgpack is not None:
+        renderers.append(MsgpackRenderer)
+    return renderers
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from rest_framework import permissions, serializers
+
+
+def get_query_list(request, name):
+    '''
+    Returns the comma separated values of a query parameter as a list
+    '''
+    value = request.query_params.get(name, '')
+    return [i.strip() for i in value.split(',') if i.strip()]
+
+
+def get_expanded_fields(request, serializer_class):
+    '''
+    Returns the fields of a serializer the client asked to expand
+
+    Only read requests can expand fields.
+
+    :return: a dictionary with the field's name as key and a tuple with the
+             serializer class and its arguments as value
+    '''
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return {}
+
+    expandable_fields = getattr(getattr(serializer_class, 'Meta', None), 'expandable_fields', {})
+    return dict([(name, expandable_fields[name])
+                 for name in get_query_list(request, 'expand')
+                 if name in expandable_fields])
+
+
+class WgerModelSerializer(serializers.ModelSerializer):
+    '''
+    Model serializer that allows clients to select the fields of the response
+
+    The 'fields' query parameter limits the response to a comma separated
+    list of fields, e.g. ?fields=id,name. The 'expand' parameter replaces the
+    IDs of related objects with the objects themselves, e.g. ?expand=muscles.
+    The relations that can be expanded are listed in the Meta class as
+    expandable_fields, a dictionary with the field's name as key and a tuple
+    with the serializer class and its arguments as value.
+
+    Only the serializer used by the view is changed and only on read requests,
+    the related objects are loaded by wger.utils.filters.ExpandFilter.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super(WgerModelSerializer, self).__init__(*args, **kwargs)
+
+        # Nested serializers don't get a request in their context
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return
+
+        for name, (serializer_class, serializer_kwargs) in \
+                get_expanded_fields(request, self.__class__).items():
+            self.fields[name] = serializer_class(read_only=True, **serializer_kwargs)
+
+        fields = get_query_list(request, 'fields')
+        if fields:
+            for name in set(self.fields.keys()) - set(fields):
+                self.fields.pop(name)
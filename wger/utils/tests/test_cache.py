@@ -0,0 +1,214 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+
+from wger.core.models import Language, WeightUnit
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Muscle
+from wger.manager.models import Workout
+from wger.utils.cache import cache_mapper, local_cache, LocalCache
+from wger.utils.language import load_language
+
+
+class CacheKeyMapperTestCase(WorkoutManagerTestCase):
+    '''
+    Test the versioned cache keys
+    '''
+
+    def test_key_contains_version(self):
+        '''
+        Test that the keys contain the namespace, schema version and generation
+        '''
+        self.assertEqual(cache_mapper.get_workout_canonical(3),
+                         'workout-canonical-representation:v2:g1:3')
+        self.assertEqual(cache_mapper.get_language_config_key(2, 1),
+                         'language-config:v1:g1:2-1')
+
+    def test_schema_version(self):
+        '''
+        Test that changing the schema version changes the key
+        '''
+        key = cache_mapper.get_ingredient_key(1)
+        old_versions = cache_mapper.NAMESPACE_VERSIONS
+        cache_mapper.NAMESPACE_VERSIONS = dict(old_versions)
+        cache_mapper.NAMESPACE_VERSIONS[cache_mapper.INGREDIENT] = 2
+        try:
+            self.assertEqual(cache_mapper.get_ingredient_key(1), 'ingredient:v2:g1:1')
+            self.assertNotEqual(key, cache_mapper.get_ingredient_key(1))
+        finally:
+            cache_mapper.NAMESPACE_VERSIONS = old_versions
+
+    def test_invalidate_namespace(self):
+        '''
+        Test that invalidating a namespace only affects its own keys
+        '''
+        cache.set(cache_mapper.get_ingredient_key(1), 'foo')
+        cache.set(cache_mapper.get_workout_canonical(1), 'bar')
+
+        cache_mapper.invalidate_namespace(cache_mapper.WORKOUT_CANONICAL)
+        self.assertEqual(cache_mapper.get_generation(cache_mapper.WORKOUT_CANONICAL), 2)
+        self.assertFalse(cache.get(cache_mapper.get_workout_canonical(1)))
+        self.assertEqual(cache.get(cache_mapper.get_ingredient_key(1)), 'foo')
+
+    def test_clear_workout_cache(self):
+        '''
+        Test that the clear-cache command invalidates all canonical forms
+        '''
+        for workout in Workout.objects.all():
+            workout.canonical_representation
+            self.assertTrue(cache.get(cache_mapper.get_workout_canonical(workout.pk)))
+
+        call_command('clear-cache', clear_workout=True)
+        for workout in Workout.objects.all():
+            self.assertFalse(cache.get(cache_mapper.get_workout_canonical(workout.pk)))
+
+
+class LocalCacheTestCase(WorkoutManagerTestCase):
+    '''
+    Test the per process cache in front of the shared cache
+    '''
+
+    def test_get_set(self):
+        '''
+        Test that entries are saved to both cache levels
+        '''
+        self.assertIsNone(local_cache.get(cache_mapper.WEIGHT_UNITS, 'all'))
+        local_cache.set(cache_mapper.WEIGHT_UNITS, 'all', [1, 2])
+        self.assertEqual(local_cache.get(cache_mapper.WEIGHT_UNITS, 'all'), [1, 2])
+        self.assertEqual(cache.get(cache_mapper.make_key(cache_mapper.WEIGHT_UNITS, 'all')),
+                         [1, 2])
+
+        # Read from the shared cache, e.g. in another process
+        local_cache.clear()
+        self.assertEqual(local_cache.get(cache_mapper.WEIGHT_UNITS, 'all'), [1, 2])
+
+    def test_no_queries(self):
+        '''
+        Test that cached reference data doesn't hit the database
+        '''
+        load_language('de')
+        with self.assertNumQueries(0):
+            language = load_language('de')
+        self.assertEqual(language.short_name, 'de')
+
+    def test_lru(self):
+        '''
+        Test that the local cache is bounded
+        '''
+        other_cache = LocalCache()
+        other_cache.MAX_ENTRIES = 2
+        other_cache.set(cache_mapper.INGREDIENT, 1, 'one')
+        other_cache.set(cache_mapper.INGREDIENT, 2, 'two')
+        other_cache.get(cache_mapper.INGREDIENT, 1)
+        other_cache.set(cache_mapper.INGREDIENT, 3, 'three')
+
+        self.assertEqual(len(other_cache._entries), 2)
+        self.assertIn((cache_mapper.INGREDIENT, 1, 1), other_cache._entries)
+        self.assertNotIn((cache_mapper.INGREDIENT, 1, 2), other_cache._entries)
+
+    def test_invalidation_other_process(self):
+        '''
+        Test that an invalidation is seen by other processes
+        '''
+        other_cache = LocalCache()
+        other_cache.GENERATION_CHECK = 0
+        self.assertEqual(other_cache.get_or_set(cache_mapper.WEIGHT_UNITS, 'all', lambda: 'old'),
+                         'old')
+
+        unit = WeightUnit.objects.get(pk=1)
+        unit.name = 'Kilos'
+        unit.save()
+        self.assertEqual(other_cache.get_or_set(cache_mapper.WEIGHT_UNITS, 'all', lambda: 'new'),
+                         'new')
+
+    def test_invalidation_language(self):
+        '''
+        Test that changing a language resets the cache
+        '''
+        self.assertEqual(load_language('de').full_name, 'Deutsch')
+
+        language = Language.objects.get(short_name='de')
+        language.full_name = 'German'
+        language.save()
+        self.assertEqual(load_language('de').full_name, 'German')
+
+
+class ConditionalRequestTestCase(WorkoutManagerTestCase):
+    '''
+    Tests answering read requests with the tables versions
+    '''
+
+    def test_not_modified(self):
+        '''
+        Test that a client with the current version gets a 304 response
+        '''
+        response = self.client.get(reverse('muscle-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+        self.assertIn('public', response['Cache-Control'])
+
+        response = self.client.get(reverse('muscle-list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(reverse('muscle-list'),
+                                   HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_modified(self):
+        '''
+        Test that saving an object changes the version
+        '''
+        etag = self.client.get(reverse('muscle-detail', kwargs={'pk': 1}))['ETag']
+        self.assertEqual(self.client.get(reverse('muscle-detail', kwargs={'pk': 1}),
+                                         HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(reverse('muscle-list'),
+                                         HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        muscle = Muscle.objects.get(pk=1)
+        muscle.name = 'Biceps'
+        muscle.save()
+        response = self.client.get(reverse('muscle-detail', kwargs={'pk': 1}),
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_logged_in(self):
+        '''
+        Test that the responses for logged in users are private
+        '''
+        self.user_login('test')
+        response = self.client.get(reverse('exercise-list'))
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get(reverse('exercise-list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_page(self):
+        '''
+        Test that the exercise page is only conditional for anonymous users
+        '''
+        url = reverse('exercise:exercise:view', kwargs={'id': 81})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+                         304)
+
+        self.user_login('test')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,134 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.utils import timezone
+
+from wger.core.models import DeletedObject
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import Workout, WorkoutLog
+from wger.nutrition.models import MealItem
+from wger.weight.models import WeightEntry
+
+
+class ChangeTrackingTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the modification times and tombstones of user data
+    '''
+
+    def test_updated(self):
+        '''
+        Test that saving an object sets its modification time
+        '''
+        before = timezone.now()
+        workout = Workout.objects.get(pk=3)
+        workout.comment = 'foo'
+        workout.save()
+        self.assertGreaterEqual(Workout.objects.get(pk=3).updated, before)
+
+    def test_tombstone(self):
+        '''
+        Test that deleting an object leaves a tombstone
+        '''
+        MealItem.objects.get(pk=1).delete()
+        WeightEntry.objects.get(pk=1).delete()
+
+        tombstone = DeletedObject.objects.get(content_type__model='mealitem')
+        self.assertEqual(tombstone.object_id, 1)
+        self.assertEqual(tombstone.user.username, 'test')
+        self.assertEqual(DeletedObject.objects.filter(content_type__model='weightentry').count(),
+                         1)
+
+    def test_tombstone_cascade(self):
+        '''
+        Test that objects deleted in cascade or in a queryset leave tombstones
+        '''
+        Workout.objects.filter(pk=3).delete()
+        self.assertEqual(set(DeletedObject.objects.values_list('content_type__model', 'user__pk')),
+                         set([('workout', 2), ('day', 2), ('set', 2), ('setting', 2),
+                              ('workoutlog', 2), ('workoutsession', 2), ('schedulestep', 2)]))
+
+    def test_tombstone_user(self):
+        '''
+        Test that deleting a user doesn't leave tombstones
+        '''
+        User.objects.get(username='test').delete()
+        self.assertFalse(DeletedObject.objects.exists())
+
+    def test_api_modified_since(self):
+        '''
+        Test filtering the API endpoints by modification time
+        '''
+        self.user_login('admin')
+        url = reverse('workoutlog-list')
+        timestamp = timezone.now()
+        log = WorkoutLog.objects.get(pk=2)
+        log.save()
+
+        response = self.client.get(url, {'modified_since': timestamp.isoformat()})
+        self.assertEqual([i['id'] for i in response.data['results']], [2])
+
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+        response = self.client.get(url, {'modified_since': tomorrow.isoformat()})
+        self.assertEqual(response.data['results'], [])
+
+        response = self.client.get(url, {'modified_since': 'foo'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_api_deleted_objects(self):
+        '''
+        Test the endpoint for the deleted objects
+        '''
+        WorkoutLog.objects.get(pk=1).delete()
+        WorkoutLog.objects.get(pk=5).delete()
+        timestamp = timezone.now()
+        Workout.objects.get(pk=2).delete()
+
+        self.user_login('admin')
+        url = reverse('deletedobject-list')
+        response = self.client.get(url)
+        results = [(i['model'], i['object_id']) for i in response.data['results']]
+        self.assertEqual(sorted(results),
+                         [('day', 3),
+                          ('schedulestep', 2),
+                          ('workout', 2),
+                          ('workoutlog', 1),
+                          ('workoutsession', 3)])
+        self.assertEqual(results[0], ('workoutlog', 1))
+        self.assertEqual(results[-1], ('workout', 2))
+
+        response = self.client.get(url, {'model': 'workoutlog'})
+        self.assertEqual(response.data['count'], 1)
+
+        # The objects deleted together with the workout are listed as well
+        response = self.client.get(url, {'modified_since': timestamp.isoformat()})
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(response.data['results'][-1]['model'], 'workout')
+
+    def test_sync_deleted_logs(self):
+        '''
+        Test that the log sync endpoint lists the deleted logs
+        '''
+        self.user_login('admin')
+        url = reverse('workoutlog-sync')
+        response = self.client.get(url)
+        self.assertEqual(response.data['deleted'], [])
+
+        WorkoutLog.objects.get(pk=3).delete()
+        response = self.client.get(url, {'since': response.data['cursor']})
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response.data['deleted'], [3])
@@ -0,0 +1,136 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import IntegrityError
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise
+from wger.nutrition.models import WeightUnit
+from wger.utils.fixtures import iter_json_array, load_fixture
+
+
+class IterJsonArrayTestCase(WorkoutManagerTestCase):
+    '''
+    Tests reading JSON arrays incrementally
+    '''
+
+    def test_read(self):
+        '''
+        Test that the elements are the same as when reading the whole array
+        '''
+        data = u'[1, 23456, "a, b]", {"x": [1, {"y": null}]}, [], 0.5, 1e10 ]'
+        for read_size in (1, 2, 5, 1000):
+            self.assertEqual(list(iter_json_array(io.StringIO(data), read_size)),
+                             json.loads(data))
+
+    def test_invalid(self):
+        '''
+        Test that invalid files raise an error
+        '''
+        for data in (u'', u'{"a": 1}', u'[1, 2', u'[1, x]', u'[1 2]'):
+            self.assertRaises(ValueError, list, iter_json_array(io.StringIO(data), 2))
+
+
+class LoadFixtureTestCase(WorkoutManagerTestCase):
+    '''
+    Tests loading fixtures in chunks
+    '''
+
+    def setUp(self):
+        super(LoadFixtureTestCase, self).setUp()
+        handle, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+
+    def tearDown(self):
+        super(LoadFixtureTestCase, self).tearDown()
+        os.remove(self.path)
+
+    def write_fixture(self, objects):
+        with io.open(self.path, 'w', encoding='utf-8') as fixture:
+            fixture.write(json.dumps(objects, ensure_ascii=False))
+
+    def get_objects(self, name=u'P\xe4ckchen'):
+        return [{'model': 'nutrition.weightunit',
+                 'pk': 100 + i,
+                 'fields': {'name': u'{0} {1}'.format(name, i), 'language': 1}}
+                for i in range(5)] + \
+               [{'model': 'exercises.exercise',
+                 'pk': 1000,
+                 'fields': {'name': u'Frontdr\xfccken',
+                            'name_original': u'Frontdr\xfccken',
+                            'description': 'Test',
+                            'category': 1,
+                            'language': 1,
+                            'license': 1,
+                            'status': '2',
+                            'creation_date': '2014-01-02',
+                            'uuid': 'b83e3d85-a53d-4939-a61c-7baa2e94d999',
+                            'muscles': [1, 2],
+                            'muscles_secondary': [],
+                            'equipment': [1]}}]
+
+    def test_load(self):
+        '''
+        Test that new objects are created with their values and relations
+        '''
+        self.write_fixture(self.get_objects())
+        counts = load_fixture(self.path, chunk_size=2)
+        self.assertEqual(counts, {'created': 6, 'updated': 0, 'unchanged': 0})
+
+        self.assertEqual(WeightUnit.objects.get(pk=104).name, u'P\xe4ckchen 4')
+        exercise = Exercise.objects.get(pk=1000)
+        self.assertEqual(exercise.creation_date, datetime.date(2014, 1, 2))
+        self.assertEqual(sorted([i.pk for i in exercise.muscles.all()]), [1, 2])
+        self.assertEqual([i.pk for i in exercise.equipment.all()], [1])
+
+    def test_reload(self):
+        '''
+        Test that only changed objects are saved again
+        '''
+        self.write_fixture(self.get_objects())
+        load_fixture(self.path)
+
+        objects = self.get_objects()
+        objects[0]['fields']['name'] = 'Dose'
+        objects[-1]['fields']['muscles'] = [1]
+        self.write_fixture(objects)
+        counts = load_fixture(self.path)
+        self.assertEqual(counts, {'created': 0, 'updated': 2, 'unchanged': 4})
+        self.assertEqual(WeightUnit.objects.get(pk=100).name, 'Dose')
+        self.assertEqual([i.pk for i in Exercise.objects.get(pk=1000).muscles.all()], [1])
+
+    def test_invalid_reference(self):
+        '''
+        Test that nothing is saved if an object refers to a missing one
+        '''
+        objects = self.get_objects()
+        objects[-1]['fields']['category'] = 1000
+        self.write_fixture(objects)
+        self.assertRaises(IntegrityError, load_fixture, self.path)
+        self.assertFalse(WeightUnit.objects.filter(pk=100).exists())
+
+    def test_command(self):
+        '''
+        Test the management command
+        '''
+        self.write_fixture(self.get_objects())
+        call_command('bulk-loaddata', self.path, verbosity=0)
+        self.assertTrue(Exercise.objects.filter(pk=1000).exists())
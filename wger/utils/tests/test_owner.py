@@ -0,0 +1,59 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from django.http import HttpRequest
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise
+from wger.manager.models import Setting, Workout
+from wger.utils.owner import get_owner_id, get_object_owner_id
+
+
+class OwnerTestCase(WorkoutManagerTestCase):
+    '''
+    Tests resolving the owner of objects
+    '''
+
+    def test_owner_id(self):
+        '''
+        Test that the owner is read with one query and cached on the request
+        '''
+        request = HttpRequest()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_owner_id(Setting, 3, request), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_owner_id(Setting, '3', request), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_owner_id(Setting, 1, request), 1)
+
+    def test_missing(self):
+        '''
+        Test resolving the owner of objects that don't exist
+        '''
+        self.assertRaises(Setting.DoesNotExist, get_owner_id, Setting, 100)
+        self.assertRaises(Setting.DoesNotExist, get_owner_id, Setting, 'abc')
+
+    def test_object_owner_id(self):
+        '''
+        Test resolving the owner of already loaded objects
+        '''
+        workout = Workout.objects.get(pk=3)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_object_owner_id(workout), 2)
+
+        setting = Setting.objects.get(pk=1)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_object_owner_id(setting), 1)
+
+        self.assertIsNone(get_object_owner_id(Exercise.objects.get(pk=1)))
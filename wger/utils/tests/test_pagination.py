@@ -0,0 +1,65 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from django.core.urlresolvers import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.nutrition.models import Ingredient
+from wger.utils.pagination import WgerCursorPagination
+
+
+class CursorPaginationTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the cursor pagination of large API collections
+    '''
+
+    def get_all(self, url, data):
+        '''
+        Helper that follows the next links and returns all IDs
+        '''
+        ids = []
+        response = self.client.get(url, data)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), data['limit'])
+            ids += [i['id'] for i in response.data['results']]
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_pages(self):
+        '''
+        Test that following the cursors returns all objects once
+        '''
+        url = reverse('api-ingredient-list')
+        ids = self.get_all(url, {'limit': 3})
+        self.assertEqual(ids, list(Ingredient.objects.order_by('id').values_list('id', flat=True)))
+
+        ids = self.get_all(url, {'limit': 4, 'ordering': 'name'})
+        self.assertEqual(ids,
+                         list(Ingredient.objects.order_by('name').values_list('id', flat=True)))
+
+    def test_page_size(self):
+        '''
+        Test that the page size is capped
+        '''
+        factory = APIRequestFactory()
+        pagination = WgerCursorPagination()
+        self.assertEqual(pagination.get_page_size(Request(factory.get('/'))), 20)
+        self.assertEqual(pagination.get_page_size(Request(factory.get('/', {'limit': 50}))), 50)
+        self.assertEqual(pagination.get_page_size(Request(factory.get('/', {'limit': 9999}))),
+                         500)
+        self.assertEqual(pagination.get_page_size(Request(factory.get('/', {'limit': 'a'}))), 20)
@@ -0,0 +1,143 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import Workout
+from wger.utils.cache import cache_mapper
+from wger.utils.pdf import PdfRenderingError, render_pdf
+
+
+class RenderPdfTestCase(WorkoutManagerTestCase):
+    '''
+    Test the rendering cache for PDFs
+    '''
+
+    def test_cache(self):
+        '''
+        Test that the PDFs are only rendered once
+        '''
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b'pdf'
+
+        key = cache_mapper.get_pdf_key('test', 1)
+        self.assertEqual(render_pdf(key, render), b'pdf')
+        self.assertEqual(render_pdf(key, render), b'pdf')
+        self.assertEqual(len(calls), 1)
+
+        self.assertEqual(render_pdf(cache_mapper.get_pdf_key('test', 2), render), b'pdf')
+        self.assertEqual(len(calls), 2)
+
+    def test_background(self):
+        '''
+        Test rendering a PDF in the background
+        '''
+        settings.WGER_SETTINGS['PDF_BACKGROUND_RENDERING'] = True
+        key = cache_mapper.get_pdf_key('test', 'background')
+        self.assertIsNone(render_pdf(key, lambda: b'pdf', background=True))
+
+        for i in range(50):
+            if cache.get(key):
+                break
+            time.sleep(0.1)
+        self.assertEqual(render_pdf(key, lambda: b'other', background=True), b'pdf')
+        self.assertIsNone(cache.get(cache_mapper.get_pdf_pending_key(key)))
+
+    def test_background_failure(self):
+        '''
+        Test that a PDF whose rendering failed is not reported as pending
+        '''
+        settings.WGER_SETTINGS['PDF_BACKGROUND_RENDERING'] = True
+        key = cache_mapper.get_pdf_key('test', 'failure')
+
+        def render():
+            raise ValueError()
+
+        self.assertIsNone(render_pdf(key, render, background=True))
+        for i in range(50):
+            if cache.get(cache_mapper.get_pdf_failed_key(key)):
+                break
+            time.sleep(0.1)
+        self.assertRaises(PdfRenderingError, render_pdf, key, render, background=True)
+        self.assertIsNone(cache.get(cache_mapper.get_pdf_pending_key(key)))
+
+        # The other requests get an error instead of waiting forever
+        workout = Workout.objects.get(pk=3)
+        key = cache_mapper.get_pdf_key('workout',
+                                       3,
+                                       workout.canonical_representation['version'],
+                                       False,
+                                       True,
+                                       False,
+                                       'en',
+                                       datetime.date.today(),
+                                       'http://testserver' + workout.get_absolute_url())
+        cache.set(cache_mapper.get_pdf_failed_key(key), True)
+
+        self.user_login('test')
+        response = self.client.get(reverse('manager:workout:pdf-log', kwargs={'id': 3,
+                                                                              'images': 1,
+                                                                              'comments': 0}))
+        self.assertEqual(response.status_code, 500)
+
+    def test_pending_response(self):
+        '''
+        Test that the client is asked to come back while the PDF is rendered
+        '''
+        settings.WGER_SETTINGS['PDF_BACKGROUND_RENDERING'] = True
+
+        # Mark the PDF as being rendered by another process
+        workout = Workout.objects.get(pk=3)
+        key = cache_mapper.get_pdf_key('workout',
+                                       3,
+                                       workout.canonical_representation['version'],
+                                       False,
+                                       True,
+                                       False,
+                                       'en',
+                                       datetime.date.today(),
+                                       'http://testserver' + workout.get_absolute_url())
+        cache.add(cache_mapper.get_pdf_pending_key(key), True)
+
+        self.user_login('test')
+        response = self.client.get(reverse('manager:workout:pdf-log', kwargs={'id': 3,
+                                                                              'images': 1,
+                                                                              'comments': 0}))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertIsNone(cache.get(key))
+
+    def test_workout_version(self):
+        '''
+        Test that the rendered workout changes with the canonical form
+        '''
+        workout = Workout.objects.get(pk=3)
+        version = workout.canonical_representation['version']
+        self.assertEqual(workout.canonical_representation['version'], version)
+
+        # Building the form again, e.g. after it was evicted, keeps the version
+        cache.delete(cache_mapper.get_workout_canonical(3))
+        self.assertEqual(workout.canonical_representation['version'], version)
+
+        workout.save()
+        self.assertNotEqual(workout.canonical_representation['version'], version)
@@ -0,0 +1,85 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import json
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import Setting
+
+
+class FieldSelectionTestCase(WorkoutManagerTestCase):
+    '''
+    Tests selecting the fields of API responses
+    '''
+
+    def test_fields(self):
+        '''
+        Test that only the selected fields are returned
+        '''
+        response = self.client.get(reverse('exercise-list'), {'fields': 'id,name,unknown'})
+        self.assertEqual(response.status_code, 200)
+        for exercise in response.data['results']:
+            self.assertEqual(sorted(exercise.keys()), ['id', 'name'])
+
+        response = self.client.get(reverse('exercise-detail', kwargs={'pk': 1}),
+                                   {'fields': 'name'})
+        self.assertEqual(list(response.data.keys()), ['name'])
+
+    def test_expand(self):
+        '''
+        Test that related objects are embedded
+        '''
+        response = self.client.get(reverse('exercise-detail', kwargs={'pk': 1}),
+                                   {'expand': 'muscles,category,images,unknown'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('name', response.data['category'])
+        self.assertTrue(response.data['muscles'])
+        for muscle in response.data['muscles']:
+            self.assertIn('is_front', muscle)
+        self.assertIsInstance(response.data['images'], list)
+
+        response = self.client.get(reverse('exercise-detail', kwargs={'pk': 1}))
+        self.assertNotIn('images', response.data)
+        self.assertIsInstance(response.data['category'], int)
+
+    def test_expand_queries(self):
+        '''
+        Test that the expanded relations are loaded for all objects at once
+        '''
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('exercise-list'),
+                                       {'expand': 'muscles,category', 'fields': 'id,muscles'})
+        self.assertTrue(len(response.data['results']) > 1)
+        self.assertEqual(len([query for query in context.captured_queries
+                              if 'FROM "exercises_muscle"' in query['sql']]), 1)
+        self.assertEqual(len([query for query in context.captured_queries
+                              if 'FROM "exercises_exercisecategory"' in query['sql']]), 0)
+
+    def test_write(self):
+        '''
+        Test that writing is not affected by the parameters
+        '''
+        self.user_login('admin')
+        response = self.client.patch(reverse('Setting-detail', kwargs={'pk': 1}) +
+                                     '?fields=id&expand=exercise',
+                                     json.dumps({'reps': 3}),
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['reps'], 3)
+        self.assertIsInstance(response.data['exercise'], int)
+        self.assertEqual(Setting.objects.get(pk=1).reps, 3)
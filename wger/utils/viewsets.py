@@ -17,6 +17,33 @@
 
 from rest_framework import exceptions, viewsets
 
+from wger.utils.cache import condition_on_tables
+from wger.utils.owner import get_owner_id
+
+
+class WgerConditionalMixin(object):
+    '''
+    Answers read requests for data that rarely changes with 304 Not Modified
+    if the client (or a CDN) already has the current version
+
+    The views list the models whose tables their responses show in
+    cache_tables, see wger.utils.cache.condition_on_tables
+    '''
+
+    cache_tables = ()
+    '''Models whose data the responses contain'''
+
+    cache_max_age = 60
+    '''Seconds a response can be used without asking again'''
+
+    def dispatch(self, request, *args, **kwargs):
+        '''
+        Wrap the view's dispatch in the conditional request handling
+        '''
+        view = condition_on_tables(self.cache_tables, self.cache_max_age)(
+            super(WgerConditionalMixin, self).dispatch)
+        return view(request, *args, **kwargs)
+
 
 class WgerOwnerObjectModelViewSet(viewsets.ModelViewSet):
     '''
@@ -29,8 +56,7 @@ class WgerOwnerObjectModelViewSet(viewsets.ModelViewSet):
         for entry in self.get_owner_objects():
             if request.data.get(entry[1]):
                 pk = request.data.get(entry[1])
-                obj = entry[0].objects.get(pk=pk)
-                if obj.get_owner_object().user != request.user:
+                if get_owner_id(entry[0], pk, request) != request.user.pk:
                     raise exceptions.PermissionDenied('You are not allowed to do this')
         else:
             return super(WgerOwnerObjectModelViewSet, self).create(request, *args, **kwargs)
@@ -42,8 +68,7 @@ class WgerOwnerObjectModelViewSet(viewsets.ModelViewSet):
         for entry in self.get_owner_objects():
             if request.data.get(entry[1]):
                 pk = request.data.get(entry[1])
-                obj = entry[0].objects.get(pk=pk)
-                if obj.get_owner_object().user != request.user:
+                if get_owner_id(entry[0], pk, request) != request.user.pk:
                     raise exceptions.PermissionDenied('You are not allowed to do this')
         else:
             return super(WgerOwnerObjectModelViewSet, self).update(request, *args, **kwargs)
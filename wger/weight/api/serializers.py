@@ -15,12 +15,11 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
-from rest_framework import serializers
-
+from wger.utils.serializers import WgerModelSerializer
 from wger.weight.models import WeightEntry
 
 
-class WeightEntrySerializer(serializers.ModelSerializer):
+class WeightEntrySerializer(WgerModelSerializer):
     '''
     Weight serializer
     '''
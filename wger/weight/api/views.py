@@ -19,6 +19,7 @@ from rest_framework import viewsets
 from wger.weight.api.serializers import WeightEntrySerializer
 
 from wger.weight.models import WeightEntry
+from wger.utils.pagination import WgerCursorPagination
 
 
 class WeightEntryViewSet(viewsets.ModelViewSet):
@@ -27,7 +28,10 @@ class WeightEntryViewSet(viewsets.ModelViewSet):
     '''
     serializer_class = WeightEntrySerializer
     is_private = True
-    ordering_fields = '__all__'
+    pagination_class = WgerCursorPagination
+    ordering = 'id'
+    ordering_fields = ('id',
+                       'date')
     filter_fields = ('date',
                      'weight')
 
@@ -20,12 +20,15 @@ import datetime
 import decimal
 import csv
 import json
-from collections import OrderedDict
+from collections import OrderedDict, deque
 
 from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
 
 from wger.utils.helpers import DecimalJsonEncoder
 from wger.utils.cache import cache_mapper
+from wger.utils.constants import TWOPLACES
 from wger.weight.models import WeightEntry
 from wger.manager.models import WorkoutSession
 from wger.manager.models import WorkoutLog
@@ -208,7 +211,7 @@ def get_last_entries(user, amount=5):
         their changes are presented.
          '''
 
-        last_entries = WeightEntry.objects.filter(user=user).order_by('-date')[:5]
+        last_entries = WeightEntry.objects.filter(user=user).order_by('-date')[:amount]
         last_entries_details = []
 
         for index, entry in enumerate(last_entries):
@@ -228,3 +231,309 @@ def get_last_entries(user, amount=5):
             last_entries_details.append((curr_entry, weight_diff, day_diff))
 
         return last_entries_details
+
+
+def update_last_weight_entries(users=None):
+    '''
+    Saves the last weight entries of the given (or all) users in their cache table
+
+    The entries are found with one grouped query, this is needed after the
+    weight entries were changed without sending signals, e.g. with bulk_create.
+
+    :param users: a list or queryset of users, or None to process all users
+    '''
+    # Local import to avoid circular imports
+    from wger.core.models import UserCache
+
+    entries = WeightEntry.objects.all()
+    caches = UserCache.objects.all()
+    if users is not None:
+        entries = entries.filter(user__in=users)
+        caches = caches.filter(user__in=users)
+
+    last_dates = dict(entries.values_list('user').annotate(Max('date')).order_by())
+    last_entries = {}
+    for entry in entries.filter(date__in=set(last_dates.values())).order_by():
+        if last_dates[entry.user_id] == entry.date:
+            last_entries[entry.user_id] = entry.id
+
+    with transaction.atomic():
+        caches.exclude(user__in=list(last_entries.keys())).update(last_weight_entry=None)
+        for user_id, entry_id in last_entries.items():
+            UserCache.objects.filter(user=user_id).update(last_weight_entry=entry_id)
+
+
+def downsample_entries(entries, points):
+    '''
+    Reduces a list of weight entries to the given number of points
+
+    This uses the Largest-Triangle-Three-Buckets algorithm, that keeps the
+    first and last entries as well as the ones that contribute most to the
+    shape of the curve, so peaks are not averaged away.
+
+    :param entries: a list of (date, weight) tuples, sorted by date
+    :param points: the maximum number of entries to return, at least 3
+    :return: a list with the selected (date, weight) tuples
+    '''
+    if len(entries) <= points:
+        return list(entries)
+
+    x = [entry[0].toordinal() for entry in entries]
+    y = [float(entry[1]) for entry in entries]
+
+    # The first and last entries are always kept, the rest is split in buckets
+    bucket_size = (len(entries) - 2) / float(points - 2)
+    selected = 0
+    out = [entries[0]]
+
+    for i in range(points - 2):
+        bucket_start = int(i * bucket_size) + 1
+        bucket_end = int((i + 1) * bucket_size) + 1
+
+        # Average of the next bucket (or the last entry)
+        next_start = bucket_end
+        next_end = min(int((i + 2) * bucket_size) + 1, len(entries))
+        if next_start >= next_end:
+            next_start, next_end = len(entries) - 1, len(entries)
+        avg_x = sum(x[next_start:next_end]) / float(next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / float(next_end - next_start)
+
+        # Entry in this bucket with the largest triangle
+        max_area = -1
+        for j in range(bucket_start, bucket_end):
+            area = abs((x[selected] - avg_x) * (y[j] - y[selected])
+                       - (x[selected] - x[j]) * (avg_y - y[selected]))
+            if area > max_area:
+                max_area = area
+                candidate = j
+        out.append(entries[candidate])
+        selected = candidate
+
+    out.append(entries[-1])
+    return out
+
+
+WEIGHT_ROLLUP_PERIODS = {'week': lambda date: date - datetime.timedelta(days=date.weekday()),
+                         'month': lambda date: date.replace(day=1)}
+'''The periods of the weight rollups, with a function returning their start'''
+
+
+def get_weight_rollups(user):
+    '''
+    Returns the user's weight entries grouped by week and by month
+
+    The rollups are kept up to date in the cache by the weight entry signals,
+    see update_weight_rollups, they are only calculated here if they are not
+    cached, e.g. after a CSV import.
+
+    :param user: the user
+    :return: a dictionary with the keys 'week' and 'month', each with a list of
+             dictionaries with the start date of the period as well as the
+             minimum, average and maximum weight and the number of entries
+    '''
+    key = cache_mapper.get_weight_rollup_key(user.pk)
+    rollups = cache.get(key)
+    if rollups is None:
+        entries = WeightEntry.objects.filter(user=user).order_by('date')
+        rollups = calculate_weight_rollups(entries.values_list('date', 'weight'))
+        cache.set(key, rollups)
+    return rollups
+
+
+def update_weight_rollups(user_id, date=None, weight=None):
+    '''
+    Updates the cached weight rollups of a user after an entry changed
+
+    A new entry in the last period is simply added to the cached rollups,
+    otherwise they are calculated again from all the user's entries.
+
+    :param date: the date of a new entry, if any
+    :param weight: the weight of a new entry
+    '''
+    key = cache_mapper.get_weight_rollup_key(user_id)
+    rollups = cache.get(key) if date is not None else None
+    if rollups is None or not add_to_weight_rollups(rollups, date, weight):
+        entries = WeightEntry.objects.filter(user=user_id).order_by('date')
+        rollups = calculate_weight_rollups(entries.values_list('date', 'weight'))
+    cache.set(key, rollups)
+
+
+def add_to_bucket(bucket, weight):
+    '''
+    Adds a weight to a period of the rollups
+    '''
+    bucket['min'] = min(bucket['min'], weight)
+    bucket['max'] = max(bucket['max'], weight)
+    bucket['sum'] += weight
+    bucket['count'] += 1
+    bucket['avg'] = (bucket['sum'] / bucket['count']).quantize(TWOPLACES)
+
+
+def add_to_weight_rollups(rollups, date, weight):
+    '''
+    Adds an entry to the rollups, if it is not older than their last periods
+
+    :return: True if the entry could be added
+    '''
+    starts = dict([(period, get_start(date))
+                   for period, get_start in WEIGHT_ROLLUP_PERIODS.items()])
+    for period, start in starts.items():
+        if rollups[period] and rollups[period][-1]['date'] > start:
+            return False
+
+    for period, start in starts.items():
+        if rollups[period] and rollups[period][-1]['date'] == start:
+            add_to_bucket(rollups[period][-1], weight)
+        else:
+            rollups[period].append({'date': start,
+                                    'min': weight,
+                                    'max': weight,
+                                    'avg': weight.quantize(TWOPLACES),
+                                    'sum': weight,
+                                    'count': 1})
+    return True
+
+
+def calculate_weight_rollups(entries):
+    '''
+    Groups weight entries by week and by month, see get_weight_rollups
+
+    :param entries: an iterable of (date, weight) tuples, sorted by date
+    '''
+    rollups = dict([(period, []) for period in WEIGHT_ROLLUP_PERIODS])
+    for date, weight in entries:
+        add_to_weight_rollups(rollups, date, weight)
+    return rollups
+
+
+class WeightTrend(object):
+    '''
+    Trend analysis of a user's weight entries
+
+    For every entry the following values are calculated:
+
+    * trend: exponentially smoothed weight, each day the trend moves SMOOTHING
+      of the way to the current weight, so days without entries are accounted for
+    * avg_7, avg_30: average weight of the entries of the last 7 and 30 days
+    * weekly_change: change of the trend over the last week, in weight per week
+
+    Entries are added in chronological order. The object only keeps the state
+    needed to calculate the next point, i.e. the last point and the entries of
+    the last 30 days, so adding an entry takes constant time and the object
+    can be cached and updated when new entries are saved.
+    '''
+
+    SMOOTHING = 0.1
+    '''Fraction of the difference between weight and trend applied per day'''
+
+    WINDOWS = (7, 30)
+    '''Days of the moving averages'''
+
+    def __init__(self, entries=()):
+        '''
+        :param entries: an iterable of (date, weight) tuples, sorted by date
+        '''
+        self.last_point = None
+        self.last_trend = None
+        self.windows = dict([(days, deque()) for days in self.WINDOWS])
+        self.sums = dict([(days, 0.0) for days in self.WINDOWS])
+        self.week_trend = deque()
+        for date, weight in entries:
+            self.add(date, weight)
+
+    @property
+    def last_date(self):
+        '''
+        Date of the last added entry or None
+        '''
+        return self.last_point['date'] if self.last_point else None
+
+    def add(self, date, weight):
+        '''
+        Adds an entry, it must be newer than all the entries already added
+
+        :return: the calculated point, with rounded values
+        '''
+        weight = float(weight)
+
+        # Exponentially smoothed weight
+        if self.last_point:
+            days = (date - self.last_point['date']).days
+            factor = 1 - (1 - self.SMOOTHING) ** days
+            trend = self.last_trend + factor * (weight - self.last_trend)
+        else:
+            trend = weight
+
+        point = {'date': date, 'weight': round(weight, 2), 'trend': round(trend, 2)}
+
+        # Moving averages, drop the entries that left the window
+        for days, window in self.windows.items():
+            window.append((date, weight))
+            self.sums[days] += weight
+            while window[0][0] <= date - datetime.timedelta(days=days):
+                self.sums[days] -= window.popleft()[1]
+            point['avg_{0}'.format(days)] = round(self.sums[days] / len(window), 2)
+
+        # Weekly rate of change of the trend
+        self.week_trend.append((date, trend))
+        while self.week_trend[0][0] < date - datetime.timedelta(days=7):
+            self.week_trend.popleft()
+        first_date, first_trend = self.week_trend[0]
+        if first_date < date:
+            point['weekly_change'] = round((trend - first_trend) * 7 / (date - first_date).days,
+                                           2)
+        else:
+            point['weekly_change'] = None
+
+        self.last_point = point
+        self.last_trend = trend
+        return point
+
+
+def get_weight_trend(user):
+    '''
+    Returns the WeightTrend of the user's weight entries together with the
+    calculated points
+
+    Both are cached and new entries are added to them by the weight entry
+    signals, see update_weight_trend.
+
+    :return: a tuple with the WeightTrend and the list of points
+    '''
+    key = cache_mapper.get_weight_trend_key(user.pk)
+    cached = cache.get(key)
+    if cached is None:
+        trend = WeightTrend()
+        entries = WeightEntry.objects.filter(user=user) \
+            .order_by('date') \
+            .values_list('date', 'weight')
+        cached = (trend, [trend.add(date, weight) for date, weight in entries])
+        cache.add(key, cached)
+    return cached
+
+
+def get_weight_trend_points(user):
+    '''
+    Returns the trend values of all of the user's weight entries
+    '''
+    return get_weight_trend(user)[1]
+
+
+def update_weight_trend(user_id, date=None, weight=None):
+    '''
+    Updates the cached weight trend of a user after an entry changed
+
+    A new entry that is newer than all the others is added to the cached
+    trend, otherwise the trend is calculated again when it is read.
+
+    :param date: the date of a new entry, if any
+    :param weight: the weight of a new entry
+    '''
+    key = cache_mapper.get_weight_trend_key(user_id)
+    cached = cache.get(key) if date is not None else None
+    if cached is not None and (cached[0].last_date is None or date > cached[0].last_date):
+        trend, points = cached
+        points.append(trend.add(date, weight))
+        cache.set(key, (trend, points))
+    else:
+        cache.delete(key)
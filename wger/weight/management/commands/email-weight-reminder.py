@@ -25,7 +25,6 @@ from django.conf import settings
 
 from django.contrib.sites.models import Site
 from wger.core.models import UserProfile
-from wger.weight.models import WeightEntry
 
 
 class Command(BaseCommand):
@@ -37,7 +36,8 @@ class Command(BaseCommand):
 
     def handle(self, **options):
 
-        profile_list = UserProfile.objects.filter(num_days_weight_reminder__gt=0)
+        profile_list = UserProfile.objects.filter(num_days_weight_reminder__gt=0) \
+            .select_related('user__usercache__last_weight_entry')
 
         for profile in profile_list:
 
@@ -48,14 +48,12 @@ class Command(BaseCommand):
 
             today = datetime.datetime.now().date()
 
-            try:
-                last_entry = WeightEntry.objects.filter(user=profile.user).latest().date
+            if profile.user.usercache.last_weight_entry:
+                last_entry = profile.user.usercache.last_weight_entry.date
                 datediff = (today - last_entry).days
 
                 if datediff >= profile.num_days_weight_reminder:
                     self.send_email(profile.user, last_entry, datediff)
-            except WeightEntry.DoesNotExist:
-                pass
 
     @staticmethod
     def send_email(user, last_entry, datediff):
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weight', '0003_auto_20160416_1030'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='weightentry',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last update'),
+        ),
+    ]
@@ -22,9 +22,11 @@ from django.contrib.auth.models import User
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 
+from wger.utils.models import AbstractChangeTrackingModel
+
 
 @python_2_unicode_compatible
-class WeightEntry(models.Model):
+class WeightEntry(AbstractChangeTrackingModel, models.Model):
     '''
     Model for a weight point
     '''
@@ -60,6 +62,8 @@ class WeightEntry(models.Model):
         '''
         return u"{0}: {1:.2f} kg".format(self.date, self.weight)
 
+    owner_field = 'user'
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
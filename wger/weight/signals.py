@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+
+from wger.core.models import UserCache
+from wger.weight.models import WeightEntry
+from wger.weight.helpers import (
+    update_last_weight_entries,
+    update_weight_rollups,
+    update_weight_trend
+)
+
+
+def reset_profile_metrics(sender, instance, **kwargs):
+    '''
+    Reset the weight and metrics remembered by the user's profile
+
+    Only profiles already loaded on the entry's user can hold stale values, so
+    the profile is not fetched if it isn't there.
+    '''
+    user = instance.user
+    if hasattr(user, User.userprofile.cache_name):
+        user.userprofile.reset_metrics()
+
+
+def update_last_weight_entry(sender, instance, **kwargs):
+    '''
+    Update the user's cached last weight entry after an entry is saved
+
+    Usually the saved entry is newer than the cached one, only if the cached
+    entry was moved before other ones are the user's entries searched again.
+    '''
+    user_cache = UserCache.objects.filter(user=instance.user_id)
+    updated = user_cache.filter(Q(last_weight_entry=None)
+                                | Q(last_weight_entry__date__lt=instance.date)) \
+        .update(last_weight_entry=instance)
+
+    if not updated \
+            and user_cache.filter(last_weight_entry=instance).exists() \
+            and WeightEntry.objects.filter(user=instance.user_id, date__gt=instance.date).exists():
+        update_last_weight_entries([instance.user_id])
+
+
+def update_weight_caches(sender, instance, created=False, **kwargs):
+    '''
+    Update the user's cached weight rollups and trend
+
+    New entries that are newer than the others are simply added to the cached
+    rollups and trend, otherwise the rollups are calculated again and the
+    trend when it is read.
+    '''
+    date = WeightEntry._meta.get_field('date').to_python(instance.date)
+    weight = WeightEntry._meta.get_field('weight').to_python(instance.weight)
+    if created:
+        update_weight_rollups(instance.user_id, date, weight)
+        update_weight_trend(instance.user_id, date, weight)
+    else:
+        update_weight_rollups(instance.user_id)
+        update_weight_trend(instance.user_id)
+
+
+def delete_last_weight_entry(sender, instance, **kwargs):
+    '''
+    Update the user's cached last weight entry after an entry is deleted
+
+    Deleting the cached entry sets the reference to NULL, only then are the
+    user's entries searched again.
+    '''
+    if UserCache.objects.filter(user=instance.user_id, last_weight_entry=None).exists():
+        update_last_weight_entries([instance.user_id])
+
+
+post_save.connect(update_last_weight_entry, sender=WeightEntry)
+post_delete.connect(delete_last_weight_entry, sender=WeightEntry)
+post_save.connect(update_weight_caches, sender=WeightEntry)
+post_delete.connect(update_weight_caches, sender=WeightEntry)
+post_save.connect(reset_profile_metrics, sender=WeightEntry)
+post_delete.connect(reset_profile_metrics, sender=WeightEntry)
@@ -0,0 +1,136 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import decimal
+import json
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.weight.helpers import (
+    add_to_weight_rollups,
+    calculate_weight_rollups,
+    downsample_entries,
+    get_weight_rollups
+)
+from wger.weight.models import WeightEntry
+
+
+class WeightChartDataTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the data for the weight chart
+    '''
+
+    def get_data(self, **params):
+        '''
+        Helper that returns the decoded chart data
+        '''
+        self.user_login('test')
+        response = self.client.get(reverse('weight:weight-data'), params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode('utf8'))
+
+    def test_all_entries(self):
+        '''
+        Test that short histories are returned completely
+        '''
+        data = self.get_data()
+        self.assertEqual(len(data), 7)
+        self.assertEqual(data[0], {'date': '2012-10-01', 'weight': 77})
+
+    def test_points(self):
+        '''
+        Test reducing the number of points
+        '''
+        data = self.get_data(points=3)
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[0]['date'], '2012-10-01')
+        self.assertEqual(data[-1]['date'], '2013-01-30')
+
+        self.assertEqual(len(self.get_data(points='foo')), 7)
+
+    def test_downsample(self):
+        '''
+        Test that the downsampled data keeps the peaks
+        '''
+        start = datetime.date(2010, 1, 1)
+        entries = [(start + datetime.timedelta(days=i), decimal.Decimal(80))
+                   for i in range(1000)]
+        entries[500] = (entries[500][0], decimal.Decimal(90))
+
+        data = downsample_entries(entries, 50)
+        self.assertEqual(len(data), 50)
+        self.assertEqual(data[0], entries[0])
+        self.assertEqual(data[-1], entries[-1])
+        self.assertIn(entries[500], data)
+
+    def test_rollups(self):
+        '''
+        Test the weekly and monthly values
+        '''
+        data = self.get_data(resolution='month')
+        self.assertEqual(sum([i['count'] for i in data]), 7)
+        self.assertEqual(data[0]['date'], '2012-10-01')
+
+        data = self.get_data(resolution='week', date_min='2012-10-01', date_max='2012-10-31')
+        for i in data:
+            self.assertLessEqual(i['min'], i['weight'])
+            self.assertGreaterEqual(i['max'], i['weight'])
+
+    def test_rollups_cache(self):
+        '''
+        Test that the rollups are cached until an entry changes
+        '''
+        user = User.objects.get(username='test')
+        rollups = get_weight_rollups(user)
+        with self.assertNumQueries(0):
+            get_weight_rollups(user)
+
+        # The signals update the cached rollups
+        entry = WeightEntry.objects.create(user=user, weight=100, date=datetime.date(2014, 1, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_weight_rollups(user)['month']), len(rollups['month']) + 1)
+
+        entry.weight = 110
+        entry.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_weight_rollups(user)['month'][-1]['max'], 110)
+
+        entry.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_weight_rollups(user), rollups)
+
+    def test_rollups_incremental(self):
+        '''
+        Test that adding entries gives the same rollups as calculating everything
+        '''
+        start = datetime.date(2015, 1, 1)
+        entries = [(start + datetime.timedelta(days=i), decimal.Decimal(80 + i % 7))
+                   for i in range(100)]
+        rollups = calculate_weight_rollups(entries[:50])
+        for date, weight in entries[50:]:
+            self.assertTrue(add_to_weight_rollups(rollups, date, weight))
+        self.assertEqual(rollups, calculate_weight_rollups(entries))
+        self.assertFalse(add_to_weight_rollups(rollups, start, decimal.Decimal(80)))
+
+    def test_date_bounds(self):
+        '''
+        Test limiting the data with only one of the dates
+        '''
+        self.assertEqual(len(self.get_data(date_max='2012-10-31')), 2)
+        self.assertEqual(len(self.get_data(date_min='2012-11-01')), 5)
+        data = self.get_data(resolution='month', date_max='2012-10-31')
+        self.assertEqual([(i['date'], i['count']) for i in data], [('2012-10-01', 2)])
@@ -0,0 +1,101 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from wger.core.models import UserCache
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.weight.helpers import update_last_weight_entries
+from wger.weight.models import WeightEntry
+
+
+class LastWeightEntryTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the user's last weight entry saved in the cache table
+    '''
+
+    def get_last_entry(self, user):
+        '''
+        Helper that returns the cached last entry
+        '''
+        return UserCache.objects.get(user=user).last_weight_entry
+
+    def test_fixtures(self):
+        '''
+        Test that the last entries are set when loading data
+        '''
+        for user in User.objects.all():
+            self.assertEqual(self.get_last_entry(user),
+                             WeightEntry.objects.filter(user=user).order_by('date').last())
+
+    def test_add_entry(self):
+        '''
+        Test adding newer and older entries
+        '''
+        user = User.objects.get(pk=2)
+        last_entry = self.get_last_entry(user)
+
+        entry = WeightEntry.objects.create(user=user,
+                                           weight=80,
+                                           date=last_entry.date + datetime.timedelta(days=1))
+        self.assertEqual(self.get_last_entry(user), entry)
+
+        WeightEntry.objects.create(user=user,
+                                   weight=80,
+                                   date=datetime.date(2000, 1, 1))
+        self.assertEqual(self.get_last_entry(user), entry)
+
+    def test_edit_entry(self):
+        '''
+        Test moving the last entry back in time
+        '''
+        user = User.objects.get(pk=2)
+        entry = self.get_last_entry(user)
+        entry.date = datetime.date(2000, 1, 1)
+        entry.save()
+
+        self.assertNotEqual(self.get_last_entry(user), entry)
+        self.assertEqual(self.get_last_entry(user),
+                         WeightEntry.objects.filter(user=user).order_by('date').last())
+
+    def test_delete_entry(self):
+        '''
+        Test deleting the last and the other entries
+        '''
+        user = User.objects.get(pk=2)
+        entry = self.get_last_entry(user)
+        entry.delete()
+        self.assertEqual(self.get_last_entry(user),
+                         WeightEntry.objects.filter(user=user).order_by('date').last())
+
+        WeightEntry.objects.filter(user=user).delete()
+        self.assertIsNone(self.get_last_entry(user))
+
+    def test_rebuild(self):
+        '''
+        Test the update-user-cache command
+        '''
+        UserCache.objects.update(last_weight_entry=None)
+        with self.assertNumQueries(6):
+            update_last_weight_entries([2])
+        self.assertEqual(self.get_last_entry(2),
+                         WeightEntry.objects.filter(user=2).order_by('date').last())
+
+        call_command('update-user-cache')
+        for user in User.objects.all():
+            self.assertEqual(self.get_last_entry(user),
+                             WeightEntry.objects.filter(user=user).order_by('date').last())
@@ -0,0 +1,133 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils.cache import cache_mapper
+from wger.weight.helpers import (
+    WeightTrend,
+    get_weight_trend,
+    get_weight_trend_points,
+    get_last_entries
+)
+from wger.weight.models import WeightEntry
+
+
+class WeightTrendTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the trend analysis of the weight entries
+    '''
+
+    def get_entries(self, weights):
+        '''
+        Helper that returns entries for consecutive days
+        '''
+        start = datetime.date(2015, 1, 1)
+        return [(start + datetime.timedelta(days=i), weight) for i, weight in enumerate(weights)]
+
+    def test_constant(self):
+        '''
+        Test the values for a constant weight
+        '''
+        point = WeightTrend(self.get_entries([80] * 40)).last_point
+        self.assertEqual(point['trend'], 80)
+        self.assertEqual(point['avg_7'], 80)
+        self.assertEqual(point['avg_30'], 80)
+        self.assertEqual(point['weekly_change'], 0)
+
+    def test_values(self):
+        '''
+        Test the calculated values
+        '''
+        trend = WeightTrend()
+        points = [trend.add(date, weight) for date, weight in self.get_entries(range(80, 90))]
+        self.assertEqual(points[0]['weekly_change'], None)
+        self.assertEqual(points[1]['trend'], 80.1)
+        self.assertEqual(points[-1]['avg_7'], 86)
+        self.assertEqual(points[-1]['avg_30'], 84.5)
+        self.assertGreater(points[-1]['weekly_change'], 0)
+
+        # Days without entries move the trend further
+        trend = WeightTrend([(datetime.date(2015, 1, 1), 80),
+                             (datetime.date(2015, 1, 3), 90)])
+        self.assertEqual(trend.last_point['trend'], 81.9)
+
+    def test_incremental(self):
+        '''
+        Test that adding entries gives the same results as calculating everything
+        '''
+        entries = self.get_entries([80, 82, 79, 85, 84, 90, 88, 87, 86, 91] * 5)
+        trend = WeightTrend(entries[:20])
+        for date, weight in entries[20:]:
+            trend.add(date, weight)
+        self.assertEqual(trend.last_point, WeightTrend(entries).last_point)
+
+        # Only the entries of the last 30 days are kept
+        self.assertEqual(len(trend.windows[30]), 30)
+
+    def test_cache(self):
+        '''
+        Test that new entries are added to the cached trend
+        '''
+        user = User.objects.get(username='test')
+        self.assertEqual(len(get_weight_trend_points(user)), 7)
+
+        entry = WeightEntry.objects.create(user=user,
+                                           weight=80,
+                                           date=datetime.date(2014, 1, 1))
+        with self.assertNumQueries(0):
+            trend, points = get_weight_trend(user)
+        self.assertEqual(trend.last_date, entry.date)
+        self.assertEqual(len(points), 8)
+        self.assertEqual(points[-1], trend.last_point)
+
+        # The appended points are the same as the calculated ones
+        cache.delete(cache_mapper.get_weight_trend_key(user.pk))
+        self.assertEqual(get_weight_trend_points(user), points)
+
+        # Older entries need a new calculation
+        WeightEntry.objects.create(user=user, weight=80, date=datetime.date(2000, 1, 1))
+        with self.assertNumQueries(1):
+            self.assertEqual(len(get_weight_trend_points(user)), 9)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_weight_trend(user)[0].last_date, entry.date)
+
+    def test_api(self):
+        '''
+        Test the trend API
+        '''
+        self.user_login('test')
+        response = self.client.get(reverse('weight:trend'))
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode('utf8'))
+        self.assertEqual(len(data), 7)
+        self.assertEqual(sorted(data[0].keys()),
+                         ['avg_30', 'avg_7', 'date', 'trend', 'weekly_change', 'weight'])
+
+        response = self.client.get(reverse('weight:trend'), {'date_min': '2013-01-01'})
+        self.assertLess(len(json.loads(response.content.decode('utf8'))), 7)
+
+    def test_last_entries_amount(self):
+        '''
+        Test that the number of last entries can be changed
+        '''
+        user = User.objects.get(username='test')
+        self.assertEqual(len(get_last_entries(user)), 5)
+        self.assertEqual(len(get_last_entries(user, 3)), 3)
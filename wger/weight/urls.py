@@ -50,4 +50,10 @@ urlpatterns = [
     url(r'^api/get_weight_data/$', # JS
         views.get_weight_data,
         name='weight-data'),
+    url(r'^api/trend/(?P<username>[\w.@+-]+)$',
+        views.get_weight_trend,
+        name='trend'),
+    url(r'^api/trend/$',
+        views.get_weight_trend,
+        name='trend'),
 ]
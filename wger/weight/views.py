@@ -40,12 +40,16 @@ from formtools.preview import FormPreview
 from wger.weight.forms import WeightForm
 from wger.weight.models import WeightEntry
 from wger.weight import helpers
+from wger.utils.cache import reset_weight_rollups
 from wger.utils.helpers import check_access
 from wger.utils.generic_views import WgerFormMixin
 
 
 logger = logging.getLogger(__name__)
 
+MAX_CHART_POINTS = 1000
+'''Maximum number of weight entries sent to the chart'''
+
 
 class WeightAddView(WgerFormMixin, CreateView):
     '''
@@ -165,29 +169,73 @@ def overview(request, username=None):
 def get_weight_data(request, username=None):
     '''
     Process the data to pass it to the JS libraries to generate an SVG image
+
+    Long histories are downsampled to the number of points passed in the 'points'
+    parameter (MAX_CHART_POINTS at most). With the 'resolution' parameter set to
+    'week' or 'month' the averages, minimums and maximums per period are returned
+    instead.
     '''
 
     is_owner, user = check_access(request.user, username)
 
-    date_min = request.GET.get('date_min', False)
-    date_max = request.GET.get('date_max', True)
-
-    if date_min and date_max:
-        weights = WeightEntry.objects.filter(user=user,
-                                             date__range=(date_min, date_max))
-    else:
-        weights = WeightEntry.objects.filter(user=user)
+    date_min = request.GET.get('date_min')
+    date_max = request.GET.get('date_max')
+
+    # Weekly or monthly values
+    resolution = request.GET.get('resolution')
+    if resolution in ('week', 'month'):
+        chart_data = []
+        for bucket in helpers.get_weight_rollups(user)[resolution]:
+            if date_min and bucket['date'].isoformat() < date_min:
+                continue
+            if date_max and bucket['date'].isoformat() > date_max:
+                continue
+            chart_data.append({'date': bucket['date'],
+                               'weight': bucket['avg'],
+                               'min': bucket['min'],
+                               'max': bucket['max'],
+                               'count': bucket['count']})
+        return Response(chart_data)
+
+    weights = WeightEntry.objects.filter(user=user)
+    if date_min:
+        weights = weights.filter(date__gte=date_min)
+    if date_max:
+        weights = weights.filter(date__lte=date_max)
+
+    # Never send more points than the chart can show
+    try:
+        points = min(max(int(request.GET.get('points')), 3), MAX_CHART_POINTS)
+    except (TypeError, ValueError):
+        points = MAX_CHART_POINTS
 
     chart_data = []
-
-    for i in weights:
-        chart_data.append({'date': i.date,
-                           'weight': i.weight})
+    entries = list(weights.values_list('date', 'weight'))
+    for date, weight in helpers.downsample_entries(entries, points):
+        chart_data.append({'date': date,
+                           'weight': weight})
 
     # Return the results to the client
     return Response(chart_data)
 
 
+@api_view(['GET'])
+def get_weight_trend(request, username=None):
+    '''
+    Returns the trend analysis of the user's weight entries
+
+    See helpers.WeightTrend for the calculated values, the entries can be limited
+    with the 'date_min' parameter.
+    '''
+    is_owner, user = check_access(request.user, username)
+    points = helpers.get_weight_trend_points(user)
+
+    date_min = request.GET.get('date_min')
+    if date_min:
+        points = [point for point in points if point['date'].isoformat() >= date_min]
+    return Response(points)
+
+
 class WeightCsvImportFormPreview(FormPreview):
     preview_template = 'import_csv_preview.html'
     form_template = 'import_csv_form.html'
@@ -210,5 +258,8 @@ class WeightCsvImportFormPreview(FormPreview):
     def done(self, request, cleaned_data):
         weight_list, error_list = helpers.parse_weight_csv(request, cleaned_data)
         WeightEntry.objects.bulk_create(weight_list)
+        helpers.update_last_weight_entries([request.user])
+        reset_weight_rollups([request.user.pk])
+        helpers.update_weight_rollups(request.user.pk)
         return HttpResponseRedirect(reverse('weight:overview',
                                             kwargs={'username': request.user.username}))